@@ -0,0 +1,54 @@
+"""Email render throughput for one worker process (pytest-benchmark).
+
+    pytest benchmarks/bench_mail_render.py --benchmark-columns=mean,ops
+
+`messages_per_sec` in each benchmark's extra info is the per-worker render rate.
+"""
+
+import asyncio
+
+import pytest
+
+from src.misc.schemas import EmailTypes
+from src.utils.mail import Mailer, mail_config
+
+BATCH = 100
+BASE_URL = "http://localhost:8000/"
+
+
+def render_batch():
+    return [
+        Mailer.render_message(EmailTypes.EMAIL_VERIFICATION, f"user{i}@example.com", "Ada", BASE_URL)
+        for i in range(BATCH)
+    ]
+
+
+def legacy_render_batch():
+    """What fastapi-mail did per send: a fresh Environment, so every template is re-parsed."""
+    from fastapi_mail import MessageSchema, MessageType
+    from fastapi_mail.msg import MailMsg
+
+    async def render_one(i):
+        env = mail_config.template_engine()
+        env.globals.update(Mailer.templates.globals)
+        template = env.get_template(EmailTypes.EMAIL_VERIFICATION.template)
+        message = MessageSchema(
+            recipients=[f"user{i}@example.com"],
+            subject=EmailTypes.EMAIL_VERIFICATION.subject,
+            template_body=template.render(first_name="Ada", verification_url=f"{BASE_URL}api/v1/auth/verify/x"),
+            subtype=MessageType.html,
+        )
+        return await MailMsg(message)._message(Mailer.sender)
+
+    async def render_all():
+        return [await render_one(i) for i in range(BATCH)]
+
+    return asyncio.run(render_all())
+
+
+@pytest.mark.parametrize("render", [render_batch, legacy_render_batch], ids=["precompiled", "legacy"])
+def test_render_throughput(benchmark, render):
+    messages = benchmark(render)
+
+    assert len(messages) == BATCH
+    benchmark.extra_info["messages_per_sec"] = round(BATCH / benchmark.stats.stats.mean)
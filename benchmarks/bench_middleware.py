@@ -0,0 +1,66 @@
+"""Per-request overhead of the request-context middleware stack.
+
+Compares the old stack (`RawContextMiddleware` with three plugins plus a `BaseHTTPMiddleware`
+storing `base_url`) with `src.utils.middlewares.ContextMiddleware`, against a bare app.
+
+    python -m benchmarks.bench_middleware
+"""
+
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette_context import context, plugins
+from starlette_context.middleware import RawContextMiddleware
+
+from src.utils.middlewares import ContextMiddleware
+
+NUMBER = 5_000
+
+
+async def custom_context_middleware(request, call_next):
+    context["base_url"] = str(request.base_url)
+    return await call_next(request)
+
+
+def build_app(stack: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if stack == "old":
+        app.add_middleware(BaseHTTPMiddleware, dispatch=custom_context_middleware)
+        app.add_middleware(
+            RawContextMiddleware,
+            plugins=(plugins.RequestIdPlugin(), plugins.CorrelationIdPlugin(), plugins.UserAgentPlugin()),
+        )
+    elif stack == "new":
+        app.add_middleware(ContextMiddleware)
+    return app
+
+
+async def run(stack: str) -> float:
+    transport = httpx.ASGITransport(app=build_app(stack))
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        for _ in range(100):
+            await client.get("/ping")
+        start = time.perf_counter()
+        for _ in range(NUMBER):
+            await client.get("/ping")
+        return time.perf_counter() - start
+
+
+def main():
+    bare = asyncio.run(run("bare"))
+    for stack in ("bare", "old", "new"):
+        elapsed = bare if stack == "bare" else asyncio.run(run(stack))
+        per_request = elapsed / NUMBER * 1e6
+        print(f"{stack:>4}: {per_request:8.1f} µs/request  (+{per_request - bare / NUMBER * 1e6:6.1f} µs over bare)")
+
+
+if __name__ == "__main__":
+    main()
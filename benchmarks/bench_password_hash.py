@@ -0,0 +1,84 @@
+"""Pick password-hash costs that hit a target verify latency on this machine.
+
+For argon2id, each memory cost is tried with increasing time cost; for bcrypt, increasing
+rounds. The strongest setting whose median verify time stays within the target is printed
+as `.env` lines. Run it on the hardware the API runs on, with the same PWD_HASH_WORKERS
+load in mind: every verify holds a hashing worker for this long.
+
+    python -m benchmarks.bench_password_hash --target-ms 250
+"""
+
+import argparse
+import statistics
+import time
+
+from passlib.hash import argon2, bcrypt
+
+PASSWORD = "correct horse battery staple"
+
+
+def verify_ms(handler, repeat: int) -> float:
+    hash = handler.hash(PASSWORD)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        handler.verify(PASSWORD, hash)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def tune_argon2(args):
+    best = None
+    for memory_cost in args.memory_costs:
+        for time_cost in range(1, args.max_time_cost + 1):
+            handler = argon2.using(
+                type="ID", memory_cost=memory_cost, time_cost=time_cost, parallelism=args.parallelism
+            )
+            ms = verify_ms(handler, args.repeat)
+            print(f"argon2id m={memory_cost:>7}KiB t={time_cost:>2} p={args.parallelism}  {ms:8.1f}ms")
+            if ms > args.target_ms:
+                break
+            # Prefer more memory over more passes: it is what makes GPU cracking expensive.
+            best = (memory_cost, time_cost)
+
+    if best is None:
+        print("No argon2 setting is fast enough; lower --memory-costs.")
+        return
+
+    print("\nPWD_HASH_SCHEMES=argon2,bcrypt")
+    print(f"PWD_ARGON2_MEMORY_COST={best[0]}")
+    print(f"PWD_ARGON2_TIME_COST={best[1]}")
+    print(f"PWD_ARGON2_PARALLELISM={args.parallelism}")
+
+
+def tune_bcrypt(args):
+    best = None
+    for rounds in range(10, 17):
+        ms = verify_ms(bcrypt.using(rounds=rounds), args.repeat)
+        print(f"bcrypt rounds={rounds:>2}  {ms:8.1f}ms")
+        if ms > args.target_ms:
+            break
+        best = rounds
+
+    if best is None:
+        print("Even 10 bcrypt rounds are slower than the target.")
+        return
+
+    print("\nPWD_HASH_SCHEMES=bcrypt")
+    print(f"PWD_BCRYPT_ROUNDS={best}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scheme", choices=("argon2", "bcrypt"), default="argon2")
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--memory-costs", type=int, nargs="+", default=[19_456, 47_104, 65_536, 131_072])
+    parser.add_argument("--max-time-cost", type=int, default=10)
+    parser.add_argument("--parallelism", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.scheme == "argon2":
+        tune_argon2(args)
+    else:
+        tune_bcrypt(args)
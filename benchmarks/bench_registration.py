@@ -0,0 +1,97 @@
+"""Registration throughput and latency: check-then-insert vs. a single INSERT ... ON CONFLICT.
+
+Runs against the database in DATABASE_URL (with the current migrations applied). Password
+hashing is left out so only the database round trips are compared. Every run inserts
+fresh users, plus a share of duplicates to exercise the conflict path; rows are tagged
+with a run prefix and removed afterwards.
+
+    python -m benchmarks.bench_registration --users 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete
+from sqlmodel import col
+
+from src.db.main import AsyncSessionMaker, async_engine
+from src.db.models import User
+from src.users.service import UserService
+from src.utils.exceptions import UserEmailExists, UserPhoneNumberExists
+
+user_service = UserService()
+
+
+async def legacy_register(user_data: dict) -> None:
+    async with AsyncSessionMaker() as session:
+        if await user_service.get_user_by_email(user_data["email"], session):
+            raise UserEmailExists()
+        if await user_service.get_user_by_phone(user_data["phone_number"], session):
+            raise UserPhoneNumberExists()
+
+        session.add(User(**user_data))
+        await session.commit()
+
+
+async def upsert_register(user_data: dict) -> None:
+    async with AsyncSessionMaker() as session:
+        await user_service.create_user(user_data, session)
+
+
+def make_users(prefix: str, count: int, duplicate_every: int):
+    for i in range(count):
+        n = i - 1 if duplicate_every and i and i % duplicate_every == 0 else i
+        yield {
+            "first_name": "Bench",
+            "last_name": "User",
+            "email": f"{prefix}-{n}@bench.example.com",
+            "phone_number": f"{prefix}-{n}",
+            "password": "x",
+        }
+
+
+async def run(name, register, users, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(user_data):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await register(user_data)
+            except (UserEmailExists, UserPhoneNumberExists):
+                pass
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(user_data) for user_data in users))
+    elapsed = time.perf_counter() - start
+
+    p50 = statistics.median(latencies) * 1000
+    p99 = statistics.quantiles(latencies, n=100)[98] * 1000
+    print(f"{name:8} {len(users) / elapsed:8.1f} reg/s   p50 {p50:6.2f} ms   p99 {p99:6.2f} ms")
+
+
+async def main(args):
+    for name, register in (("legacy", legacy_register), ("upsert", upsert_register)):
+        prefix = f"bench-{name}-{uuid.uuid4().hex[:8]}"
+        users = list(make_users(prefix, args.users, args.duplicate_every))
+        try:
+            await run(name, register, users, args.concurrency)
+        finally:
+            async with AsyncSessionMaker() as session:
+                await session.exec(delete(User).where(col(User.phone_number).startswith(prefix)))
+                await session.commit()
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duplicate-every", type=int, default=10, help="make every Nth user a duplicate (0: none)")
+    asyncio.run(main(parser.parse_args()))
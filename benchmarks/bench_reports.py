@@ -0,0 +1,84 @@
+"""Report computation cost per user: Python loops over rows vs. vectorized `src.reports.analytics`.
+
+Uses synthetic ledgers (no database), shaped like `fetch_rows` output. For each size it times
+building the columns, a snapshot save/load round trip, and each report.
+
+    python -m benchmarks.bench_reports --sizes 10000 100000 1000000
+"""
+
+import argparse
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from src.reports import analytics
+from src.reports.snapshot import LedgerColumns
+
+now = datetime.now(timezone.utc)
+
+
+def make_rows(count, seed=0):
+    rng = np.random.default_rng(seed)
+    start = int(now.timestamp()) - 5 * 365 * 86400
+    return list(
+        zip(
+            rng.integers(start, int(now.timestamp()), count).tolist(),
+            rng.integers(100, 20_000, count).tolist(),
+            rng.choice(["expense", "income"], count, p=[0.9, 0.1]).tolist(),
+            rng.choice([f"category-{i}" for i in range(20)], count).tolist(),
+            rng.choice(["EUR", "USD"], count, p=[0.9, 0.1]).tolist(),
+        )
+    )
+
+
+def python_reports(rows):
+    """What the reports cost as loops over rows (categories and monthly only)."""
+    totals, amounts, months = defaultdict(int), defaultdict(list), defaultdict(int)
+    for occurred_at, amount, kind, category, currency in rows:
+        if currency != "EUR" or kind != "expense":
+            continue
+        totals[category] += amount
+        amounts[category].append(amount)
+        moment = datetime.fromtimestamp(occurred_at, timezone.utc)
+        months[(moment.year, moment.month)] += amount
+    return {category: sorted(values)[len(values) // 2] for category, values in amounts.items()}, months
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(args):
+    headers = ("rows", "build", "save", "load", "python", "categ.", "monthly", "daily", "fcast")
+    print(" ".join(f"{header:>9}" for header in headers))
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "snapshot.npz"
+        for size in args.sizes:
+            rows = make_rows(size)
+            columns = LedgerColumns.from_rows(rows)
+            timings = [
+                timed(LedgerColumns.from_rows, rows, repeat=1),
+                timed(columns.save, path, 1),
+                timed(LedgerColumns.load, path),
+                timed(python_reports, rows, repeat=1),
+                timed(analytics.category_breakdown, columns, "EUR"),
+                timed(analytics.monthly_totals, columns, "EUR", 12),
+                timed(analytics.daily_spending, columns, "EUR", 90, 7),
+                timed(analytics.spending_forecast, columns, "EUR", 3, 12),
+            ]
+            print(f"{size:>9} " + " ".join(f"{ms:>7.1f}ms" for ms in timings))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    main(parser.parse_args())
@@ -0,0 +1,64 @@
+"""Per-request CPU cost of building an auth response envelope.
+
+Compares the old path (parametrize `ServerRespModel[T]`, validate, `model_dump()`, then
+`JSONResponse` re-encodes with stdlib json) with `src.misc.responses.server_response`.
+
+    python -m benchmarks.bench_responses
+"""
+
+import json
+import timeit
+import uuid
+
+from fastapi.responses import JSONResponse
+
+from src.auth.schemas import TokenModel, TokenUserModel
+from src.misc.responses import server_response
+from src.misc.schemas import ServerRespModel
+
+NUMBER = 20_000
+
+user = TokenUserModel(
+    id=1,
+    uid=uuid.uuid4(),
+    first_name="Ada",
+    last_name="Lovelace",
+    avatar="",
+    email="ada@example.com",
+    phone_number="+2348000000000",
+)
+tokens = {"access_token": "a" * 300, "refresh_token": "r" * 300}
+
+
+def old_profile():
+    return JSONResponse(
+        content=ServerRespModel[TokenUserModel](
+            data=TokenUserModel.model_validate(user.model_dump()).model_dump(), message="user profile retrieved"
+        ).model_dump(mode="json")
+    )
+
+
+def new_profile():
+    return server_response(data=user, message="user profile retrieved", data_type=TokenUserModel)
+
+
+def old_login():
+    return JSONResponse(content=ServerRespModel[TokenModel](data=tokens, message="user token generated.").model_dump())
+
+
+def new_login():
+    return server_response(data=TokenModel(**tokens), message="user token generated.", data_type=TokenModel)
+
+
+def main():
+    assert json.loads(old_profile().body) == json.loads(new_profile().body)
+    assert json.loads(old_login().body) == json.loads(new_login().body)
+
+    for name, old, new in (("profile", old_profile, new_profile), ("login", old_login, new_login)):
+        old_us = min(timeit.repeat(old, number=NUMBER, repeat=5)) / NUMBER * 1e6
+        new_us = min(timeit.repeat(new, number=NUMBER, repeat=5)) / NUMBER * 1e6
+        print(f"{name:8} old {old_us:7.2f} us/req   new {new_us:7.2f} us/req   saved {old_us - new_us:6.2f} us/req")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Monthly budget dashboard: naive aggregation over the ledger vs. the `budget_rollups` lookup.
+
+Runs against the database in DATABASE_URL (with the current migrations applied). A throwaway
+user is seeded with N transactions spread over several years with server-side
+generate_series, its rollups are built with the repair job, and both read paths are timed.
+The user (and, by cascade, its rows) is removed afterwards.
+
+    python -m benchmarks.bench_rollups --transactions 1000000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import date
+
+from sqlalchemy import delete, text
+
+from src.budgets.service import ROLLUP_MONTH_SQL, BudgetService
+from src.db.main import AsyncSessionMaker, async_engine
+from src.db.models import User
+
+budget_service = BudgetService()
+
+SEED_TRANSACTIONS = text(
+    """
+    INSERT INTO transactions (uid, user_id, amount, currency, category, kind, occurred_at, created_at, updated_at)
+    SELECT gen_random_uuid(), :user_id, 100 + (random() * 20000)::int, 'EUR',
+        'category-' || (n % :categories), CASE WHEN n % 10 = 0 THEN 'income' ELSE 'expense' END,
+        now() - (random() * interval '5 years'), now(), now()
+    FROM generate_series(1, :count) AS n
+    """
+)
+
+NAIVE_MONTH = text(
+    f"""
+    SELECT category, currency,
+        coalesce(sum(amount) FILTER (WHERE kind = 'expense'), 0) AS expense_total,
+        coalesce(sum(amount) FILTER (WHERE kind = 'income'), 0) AS income_total,
+        count(*) AS transaction_count
+    FROM transactions
+    WHERE user_id = :user_id AND {ROLLUP_MONTH_SQL} = :month
+    GROUP BY category, currency
+    ORDER BY category, currency
+    """
+)
+
+
+async def timed_runs(name, query, repeat):
+    latencies = []
+    for _ in range(repeat):
+        async with AsyncSessionMaker() as session:
+            start = time.perf_counter()
+            rows = await query(session)
+            latencies.append(time.perf_counter() - start)
+
+    p50 = statistics.median(latencies) * 1000
+    worst = max(latencies) * 1000
+    print(f"{name:8} p50 {p50:9.2f} ms   max {worst:9.2f} ms   ({len(rows)} rows)")
+
+
+async def main(args):
+    async with AsyncSessionMaker() as session:
+        user = User(
+            first_name="Bench",
+            last_name="User",
+            email=f"bench-rollups-{uuid.uuid4().hex[:8]}@bench.example.com",
+            phone_number=f"bench-rollups-{uuid.uuid4().hex[:8]}",
+            password="x",
+        )
+        session.add(user)
+        await session.commit()
+        user_id = user.id
+
+    try:
+        async with AsyncSessionMaker() as session:
+            start = time.perf_counter()
+            await session.exec(
+                SEED_TRANSACTIONS,
+                params={"user_id": user_id, "count": args.transactions, "categories": args.categories},
+            )
+            await session.commit()
+            print(f"seeded {args.transactions} transactions in {time.perf_counter() - start:.1f} s")
+
+            start = time.perf_counter()
+            await budget_service.repair(user_id, session)
+            print(f"built rollups in {time.perf_counter() - start:.1f} s")
+
+        month = date.today().replace(day=1)
+
+        async def naive(session):
+            return (await session.exec(NAIVE_MONTH, params={"user_id": user_id, "month": month})).all()
+
+        async def rollup(session):
+            return await budget_service.get_month(user_id, month, session)
+
+        await timed_runs("naive", naive, args.repeat)
+        await timed_runs("rollup", rollup, args.repeat)
+    finally:
+        async with AsyncSessionMaker() as session:
+            await session.exec(delete(User).where(User.id == user_id))
+            await session.commit()
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
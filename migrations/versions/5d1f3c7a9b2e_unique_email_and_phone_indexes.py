@@ -0,0 +1,89 @@
+"""unique email and phone indexes
+
+Revision ID: 5d1f3c7a9b2e
+Revises: 10598f86e65d
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+
+from typing import List, Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d1f3c7a9b2e"
+down_revision: Union[str, None] = "10598f86e65d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+EMAIL_INDEX = "ix_users_email_lower"
+PHONE_INDEX = "ix_users_phone_number"
+
+
+def find_duplicates(bind, expression: str) -> List[str]:
+    rows = bind.execute(
+        sa.text(
+            f"SELECT {expression} AS value, count(*) AS n FROM users "
+            f"GROUP BY {expression} HAVING count(*) > 1 ORDER BY {expression} LIMIT 50"
+        )
+    )
+    return [f"{row.value!r} ({row.n} rows)" for row in rows]
+
+
+def drop_invalid_indexes(bind, names: List[str]) -> None:
+    """Drop what a failed CONCURRENTLY build left behind; it is INVALID and would block a retry."""
+    invalid = bind.execute(
+        sa.text(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = ANY(:names) AND NOT i.indisvalid"
+        ),
+        {"names": names},
+    ).scalars()
+    for name in invalid.all():
+        op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    # Fail before changing anything if the unique indexes cannot be built; the rows have to be merged by hand.
+    duplicates = {
+        "email": find_duplicates(bind, "lower(trim(email))"),
+        "phone_number": find_duplicates(bind, "phone_number"),
+    }
+    if any(duplicates.values()):
+        details = "; ".join(f"{column}: {', '.join(values)}" for column, values in duplicates.items() if values)
+        raise RuntimeError(f"Duplicate users must be resolved before adding unique indexes. {details}")
+
+    # Emails are normalized at write time from now on; bring existing rows in line.
+    op.execute("UPDATE users SET email = lower(trim(email)) WHERE email <> lower(trim(email))")
+
+    # Build the indexes without blocking writes on a large users table.
+    with op.get_context().autocommit_block():
+        drop_invalid_indexes(bind, [EMAIL_INDEX, PHONE_INDEX])
+        op.create_index(
+            EMAIL_INDEX,
+            "users",
+            [sa.text("lower(email)")],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            PHONE_INDEX,
+            "users",
+            ["phone_number"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(PHONE_INDEX, table_name="users")
+    op.drop_index(EMAIL_INDEX, table_name="users")
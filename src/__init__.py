@@ -1,11 +1,20 @@
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
+from src.auth.hashing import password_hasher
+from src.auth.revocation import revocation_cache
 from src.auth.routers import auth_router
-from src.db.main import init_db
+from src.budgets.routers import budget_router
+from src.config import Config
+from src.db.main import close_db, init_db
+from src.db.redis import close_redis, init_redis
+from src.reports.routers import report_router
+from src.transactions.routers import transaction_router
 from src.users.routers import user_router
 from src.utils.exceptions import register_exceptions
+from src.utils.metrics import metrics_endpoint
 from src.utils.middlewares import register_middlewares
 
 
@@ -13,7 +22,13 @@ from src.utils.middlewares import register_middlewares
 async def life_span(app: FastAPI):
     print("Server started...")
     await init_db()
+    await init_redis()
+    await revocation_cache.start()
     yield
+    await revocation_cache.stop()
+    password_hasher.shutdown()
+    await close_redis()
+    await close_db()
     print("Server stopped...")
 
 
@@ -28,6 +43,7 @@ app = FastAPI(
     docs_url=f"/api/{version}/docs",
     openapi_url=f"/api/{version}/openapi.json",
     lifespan=life_span,
+    default_response_class=ORJSONResponse,
 )
 
 register_exceptions(app)
@@ -36,3 +52,16 @@ register_middlewares(app)
 
 app.include_router(auth_router, prefix=f"/api/{version}/auth", tags=["auth"])
 app.include_router(user_router, prefix=f"/api/{version}/users", tags=["user"])
+app.include_router(transaction_router, prefix=f"/api/{version}/transactions", tags=["transactions"])
+app.include_router(budget_router, prefix=f"/api/{version}/budgets", tags=["budgets"])
+app.include_router(report_router, prefix=f"/api/{version}/reports", tags=["reports"])
+app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+if Config.PROFILER_ENABLED:
+    # Imported here so pyinstrument is never loaded, and nothing is added to the request
+    # path, unless profiling is switched on.
+    from src.profiler.middleware import RequestProfilerMiddleware
+    from src.profiler.routers import profiler_router
+
+    app.add_middleware(RequestProfilerMiddleware)
+    app.include_router(profiler_router, prefix=f"/api/{version}/profiler", tags=["profiler"])
@@ -1,6 +1,8 @@
+import hashlib
 import logging
 import uuid
 from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 
 import jwt
 from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
@@ -8,25 +10,64 @@ from jwt import ExpiredSignatureError, PyJWTError
 from passlib.context import CryptContext
 
 from src.config import Config
+from src.utils.cache import TTLCache
 from src.utils.exceptions import ExpiredLink, InvalidLink, InvalidToken, TokenExpired
+from src.utils.metrics import JWT_CACHE_LOOKUPS, timed
 
+from .keys import key_ring
 from .schemas import TokenUserModel
 
+_JWT_CACHE_HIT = JWT_CACHE_LOOKUPS.labels("hit")
+_JWT_CACHE_MISS = JWT_CACHE_LOOKUPS.labels("miss")
+
+
+def build_password_context(
+    schemes: List[str], argon2_memory_cost: int, argon2_time_cost: int, argon2_parallelism: int, bcrypt_rounds: int
+) -> CryptContext:
+    """Hash with the first scheme; hashes in any other scheme, or with other costs, need an update."""
+    settings = {}
+    if "argon2" in schemes:
+        settings.update(
+            argon2__type="ID",
+            argon2__memory_cost=argon2_memory_cost,
+            argon2__time_cost=argon2_time_cost,
+            argon2__parallelism=argon2_parallelism,
+        )
+    if "bcrypt" in schemes:
+        settings["bcrypt__rounds"] = bcrypt_rounds
+
+    return CryptContext(schemes=schemes, deprecated="auto", **settings)
+
 
 class Authentication:
-    password_context = CryptContext(schemes=["bcrypt"])
+    password_context = build_password_context(
+        schemes=[scheme.strip() for scheme in Config.PWD_HASH_SCHEMES.split(",")],
+        argon2_memory_cost=Config.PWD_ARGON2_MEMORY_COST,
+        argon2_time_cost=Config.PWD_ARGON2_TIME_COST,
+        argon2_parallelism=Config.PWD_ARGON2_PARALLELISM,
+        bcrypt_rounds=Config.PWD_BCRYPT_ROUNDS,
+    )
     ACCESS_TOKEN_EXPIRY = 84000
     PWD_RESET_TOKEN_EXPIRY = 3600
     serializer: URLSafeTimedSerializer = URLSafeTimedSerializer(secret_key=Config.JWT_SECRET, salt=Config.EMAIL_SALT)
+    # sha256(token) -> verified payload, dropped at the token's own `exp`.
+    verified_tokens: TTLCache = TTLCache(maxsize=Config.JWT_CACHE_SIZE)
 
     @staticmethod
     def generate_password_hash(password: str) -> str:
         return Authentication.password_context.hash(password)
 
     @staticmethod
+    @timed("verify_password")
     def verify_password(password: str, hash: str) -> bool:
         return Authentication.password_context.verify(password, hash)
 
+    @staticmethod
+    @timed("verify_password")
+    def verify_and_update_password(password: str, hash: str) -> Tuple[bool, Optional[str]]:
+        """Verify `password`, also returning a new hash when `hash` uses an outdated scheme or cost."""
+        return Authentication.password_context.verify_and_update(password, hash)
+
     @staticmethod
     def create_token(user_data: TokenUserModel, expiry: timedelta = None, refresh: bool = False):
         payload = {}
@@ -40,28 +81,44 @@ class Authentication:
         )
         payload["jti"] = str(uuid.uuid4())
         payload["refresh"] = refresh
-        token = jwt.encode(payload=payload, key=Config.JWT_SECRET, algorithm=Config.JWT_ALGORITHM)
+        token = jwt.encode(
+            payload=payload, key=key_ring.signing_key, algorithm=key_ring.algorithm, headers=key_ring.headers
+        )
 
         return token
 
     @staticmethod
+    @timed("decode_token")
     def decode_token(token: str):
+        """Verify `token` and return its payload.
+
+        Recently verified tokens are served from `verified_tokens`, skipping signature checks
+        and JSON parsing. The returned dict may be shared, so callers must not mutate it.
+        """
+        cache_key = hashlib.sha256(token.encode()).digest()
+        token_payload = Authentication.verified_tokens.get(cache_key)
+        if token_payload is not None:
+            _JWT_CACHE_HIT.inc()
+            return token_payload
+
+        _JWT_CACHE_MISS.inc()
         try:
             token_payload = jwt.decode(
                 jwt=token,
-                key=Config.JWT_SECRET,
-                algorithms=[Config.JWT_ALGORITHM],
+                key=key_ring.verification_key(token),
+                algorithms=[key_ring.algorithm],
                 verify=True,
             )
-
-            return token_payload
         except ExpiredSignatureError:
             logging.warning("Token has expired.")
             raise TokenExpired()
-        except PyJWTError:
-            logging.exception("JWT decoding failed.")
+        except PyJWTError as e:
+            logging.warning(f"JWT decoding failed: {e}")
             raise InvalidToken()
 
+        Authentication.verified_tokens.set(cache_key, token_payload, token_payload["exp"])
+        return token_payload
+
     @staticmethod
     def create_url_safe_token(data: dict):
         return Authentication.serializer.dumps(data)
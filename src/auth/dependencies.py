@@ -1,11 +1,17 @@
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import Request
+from fastapi import Depends, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from src.auth.authentication import Authentication
-from src.db.redis import token_in_block_list
-from src.utils.exceptions import AccessTokenRequired, InvalidToken, RefreshTokenRequired
+from src.auth.revocation import revocation_cache
+from src.utils.exceptions import (
+    AccessTokenRequired,
+    InsufficientPermission,
+    InvalidToken,
+    RefreshTokenRequired,
+    TokenExpired,
+)
 
 
 class TokenBearer(HTTPBearer):
@@ -14,26 +20,19 @@ class TokenBearer(HTTPBearer):
             auto_error=auto_error,
         )
 
-    def is_token_valid(self, token: str) -> bool:
-        try:
-            token = Authentication.decode_token(token)
-            return True
-        except Exception:
-            return False
-
     async def __call__(self, request: Request) -> Optional[HTTPAuthorizationCredentials]:
         cred = await super().__call__(request)
-        token = cred.credentials
 
-        if self.is_token_valid(token) is False:
+        try:
+            token_payload = Authentication.decode_token(cred.credentials)
+        except TokenExpired:
             raise InvalidToken()
 
-        token_payload = Authentication.decode_token(token)
-
-        if await token_in_block_list(token_payload["jti"]):
+        if await revocation_cache.is_revoked(token_payload["jti"]):
             raise InvalidToken()
 
         self.verify_token_data(token_payload)
+        request.state.token_payload = token_payload
 
         return token_payload
 
@@ -51,3 +50,14 @@ class RefreshTokenBearer(TokenBearer):
     def verify_token_data(self, token_payload):
         if token_payload and not token_payload["refresh"]:
             raise RefreshTokenRequired()
+
+
+class RoleChecker:
+    def __init__(self, allowed_roles: List[str]):
+        self.allowed_roles = allowed_roles
+
+    def __call__(self, token_payload: dict = Depends(AccessTokenBearer())) -> dict:
+        if token_payload["user"].get("role") not in self.allowed_roles:
+            raise InsufficientPermission()
+
+        return token_payload
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from src.config import Config
+from src.utils.exceptions import HashingPoolSaturated
+from src.utils.metrics import PWD_HASH_DURATION, PWD_HASH_PENDING, PWD_HASH_QUEUE_WAIT, PWD_HASH_REJECTED
+
+from .authentication import Authentication
+
+
+class PasswordHasher:
+    """Runs password hashing on a bounded worker pool so it never blocks the event loop.
+
+    Jobs beyond `max_pending` (queued + running) are rejected with `HashingPoolSaturated`
+    instead of piling up behind the workers.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwd-hash")
+        return self._executor
+
+    async def _submit(self, operation: str, func: Callable[..., Any], *args: Any) -> Any:
+        # `_pending` is only touched from the event loop thread, so no lock is needed.
+        if self._pending >= self.max_pending:
+            PWD_HASH_REJECTED.labels(operation).inc()
+            raise HashingPoolSaturated()
+
+        queue_wait = PWD_HASH_QUEUE_WAIT.labels(operation)
+        duration = PWD_HASH_DURATION.labels(operation)
+        queued_at = time.perf_counter()
+
+        def run():
+            started_at = time.perf_counter()
+            queue_wait.observe(started_at - queued_at)
+            try:
+                return func(*args)
+            finally:
+                duration.observe(time.perf_counter() - started_at)
+
+        self._pending += 1
+        PWD_HASH_PENDING.inc()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, run)
+        finally:
+            self._pending -= 1
+            PWD_HASH_PENDING.dec()
+
+    async def hash(self, password: str) -> str:
+        return await self._submit("hash", Authentication.generate_password_hash, password)
+
+    async def verify(self, password: str, hash: str) -> bool:
+        return await self._submit("verify", Authentication.verify_password, password, hash)
+
+    async def verify_and_update(self, password: str, hash: str) -> Tuple[bool, Optional[str]]:
+        return await self._submit("verify", Authentication.verify_and_update_password, password, hash)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(workers=Config.PWD_HASH_WORKERS, max_pending=Config.PWD_HASH_MAX_PENDING)
@@ -0,0 +1,101 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import jwt
+from jwt.algorithms import HMACAlgorithm
+
+from src.config import Config
+from src.utils.exceptions import InvalidToken
+
+
+class KeyRing:
+    """Keys used to sign and verify JWTs, indexed by `kid`.
+
+    With an HMAC algorithm the ring holds just `JWT_SECRET`, as before. With an asymmetric
+    algorithm (RS256, ES256, EdDSA, ...) keys are loaded once from `keys_dir`:
+
+    * `<kid>.pem` - a private key; it can sign and verify.
+    * `<kid>.pub.pem` - a public key only; it verifies tokens signed before a rotation.
+
+    New tokens are signed with `active_kid`, and the public halves of every key are
+    published as a JWKS document so other services can verify tokens locally.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret: Optional[str] = None,
+        keys_dir: Optional[str] = None,
+        active_kid: Optional[str] = None,
+    ):
+        self.algorithm = algorithm
+        self._algorithm = jwt.get_algorithm_by_name(algorithm)
+        self.symmetric = isinstance(self._algorithm, HMACAlgorithm)
+        self.active_kid: Optional[str] = None
+        self.signing_key: Any = secret
+        self._verification_keys: Dict[str, Any] = {}
+        self._jwks: Dict[str, Any] = {"keys": []}
+
+        if not self.symmetric:
+            self._load_keys(keys_dir, active_kid)
+
+        self.jwks_json = json.dumps(self._jwks, separators=(",", ":")).encode()
+        self.jwks_etag = f'"{hashlib.sha256(self.jwks_json).hexdigest()[:32]}"'
+
+    def _load_keys(self, keys_dir: Optional[str], active_kid: Optional[str]) -> None:
+        if not keys_dir or not active_kid:
+            raise ValueError(f"{self.algorithm} needs JWT_KEYS_DIR and JWT_ACTIVE_KID to be set.")
+
+        private_keys = {}
+        for path in sorted(Path(keys_dir).glob("*.pem")):
+            if path.name.endswith(".pub.pem"):
+                continue
+            private_keys[path.stem] = self._algorithm.prepare_key(path.read_bytes())
+
+        public_keys = {kid: key.public_key() for kid, key in private_keys.items()}
+        for path in sorted(Path(keys_dir).glob("*.pub.pem")):
+            kid = path.name[: -len(".pub.pem")]
+            # A private key already provides its public half; listing the kid twice would duplicate it in the JWKS.
+            if kid not in public_keys:
+                public_keys[kid] = self._algorithm.prepare_key(path.read_bytes())
+
+        for kid, public_key in sorted(public_keys.items()):
+            self._verification_keys[kid] = public_key
+            self._jwks["keys"].append(
+                {**self._algorithm.to_jwk(public_key, as_dict=True), "kid": kid, "alg": self.algorithm, "use": "sig"}
+            )
+
+        if active_kid not in private_keys:
+            raise ValueError(f"No private key found for JWT_ACTIVE_KID '{active_kid}' in {keys_dir}.")
+
+        self.active_kid = active_kid
+        self.signing_key = private_keys[active_kid]
+
+    @property
+    def headers(self) -> Optional[Dict[str, str]]:
+        return {"kid": self.active_kid} if self.active_kid else None
+
+    def verification_key(self, token: str) -> Any:
+        if self.symmetric:
+            return self.signing_key
+
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.PyJWTError:
+            raise InvalidToken()
+
+        key = self._verification_keys.get(kid)
+        if key is None:
+            raise InvalidToken()
+
+        return key
+
+
+key_ring = KeyRing(
+    algorithm=Config.JWT_ALGORITHM,
+    secret=Config.JWT_SECRET,
+    keys_dir=Config.JWT_KEYS_DIR,
+    active_kid=Config.JWT_ACTIVE_KID,
+)
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.config import Config
+from src.db.redis import add_jti_to_block_list, get_redis, iter_block_list, token_in_block_list
+from src.utils.cache import TTLCache
+from src.utils.exceptions import RevocationCheckUnavailable
+from src.utils.metrics import REVOCATION_CACHE_LOOKUPS, REVOCATION_CACHE_SIZE
+
+_HIT = REVOCATION_CACHE_LOOKUPS.labels("hit")
+_MISS = REVOCATION_CACHE_LOOKUPS.labels("miss")
+_FALLBACK = REVOCATION_CACHE_LOOKUPS.labels("fallback")
+_ERROR = REVOCATION_CACHE_LOOKUPS.labels("error")
+
+
+class RevocationCache:
+    """In-process copy of the Redis token blocklist, kept current over pub/sub.
+
+    While the subscriber is connected and the cache has never had to evict a live entry,
+    it holds every revoked JTI and answers lookups without touching Redis. Otherwise misses
+    are confirmed against Redis, and `fail_open` decides what happens if Redis is down.
+    With `legacy_keys`, misses are always confirmed: revocations written by older releases
+    are neither published nor found by the blocklist scan.
+    """
+
+    def __init__(self, maxsize: int, channel: str, fail_open: bool, legacy_keys: bool = False):
+        self.revoked = TTLCache(maxsize)
+        self.channel = channel
+        self.fail_open = fail_open
+        self.legacy_keys = legacy_keys
+        self._synced = False
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def authoritative(self) -> bool:
+        return self._synced and self.revoked.evictions == 0 and not self.legacy_keys
+
+    def add(self, jti: str, exp: float) -> None:
+        self.revoked.set(jti, True, exp)
+
+    async def is_revoked(self, jti: str) -> bool:
+        if self.revoked.get(jti, False):
+            _HIT.inc()
+            return True
+
+        if self.authoritative:
+            _MISS.inc()
+            return False
+
+        _FALLBACK.inc()
+        try:
+            return await token_in_block_list(jti)
+        except RedisError as e:
+            _ERROR.inc()
+            logging.warning(f"Redis error while checking revocation: {e}")
+            if self.fail_open:
+                return False
+            raise RevocationCheckUnavailable()
+
+    async def revoke(self, jti: str, exp: int) -> None:
+        await add_jti_to_block_list(jti, exp)
+        self.add(jti, exp)
+
+    def _apply(self, data: bytes) -> None:
+        """Add a `<jti>:<exp>` revocation message; malformed messages are logged and skipped."""
+        try:
+            jti, _, exp = data.decode().rpartition(":")
+            if not jti:
+                raise ValueError("missing jti")
+            self.add(jti, int(exp))
+        except (UnicodeDecodeError, ValueError, AttributeError) as e:
+            logging.warning(f"Ignoring malformed revocation message {data!r}: {e}")
+
+    async def start(self) -> None:
+        REVOCATION_CACHE_SIZE.set_function(lambda: len(self.revoked))
+        if self._listener is None and get_redis() is not None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self._synced = False
+
+    async def _listen(self) -> None:
+        backoff = 0.5
+
+        while True:
+            client = get_redis()
+            if client is None:
+                return
+
+            try:
+                async with client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    # Subscribe before loading the existing blocklist so nothing revoked
+                    # in between is missed.
+                    await pubsub.subscribe(self.channel)
+                    async for entries in iter_block_list():
+                        for jti, exp in entries:
+                            self.add(jti, exp)
+
+                    self._synced = True
+                    backoff = 0.5
+
+                    while True:
+                        message = await pubsub.get_message(timeout=1.0)
+                        if message is None:
+                            continue
+
+                        self._apply(message["data"])
+            except (RedisError, OSError) as e:
+                logging.warning(f"Revocation subscriber disconnected: {e}")
+            finally:
+                self._synced = False
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+
+revocation_cache = RevocationCache(
+    maxsize=Config.REVOCATION_CACHE_SIZE,
+    channel=Config.REVOCATION_CHANNEL,
+    fail_open=Config.REVOCATION_FAIL_OPEN,
+    legacy_keys=Config.BLOCKLIST_LEGACY_KEYS,
+)
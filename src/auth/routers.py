@@ -1,30 +1,44 @@
-from fastapi import APIRouter, Body, Depends, status
+from fastapi import APIRouter, Body, Depends, Request, Response, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.auth.dependencies import AccessTokenBearer, RefreshTokenBearer
-from src.auth.schemas import ChangePwdModel, LoginResModel, TokenUserModel
+from src.auth.keys import key_ring
+from src.auth.schemas import ChangePwdModel, TokenModel, TokenUserModel
 from src.auth.service import AuthService
-from src.db.main import get_session
-from src.misc.schemas import ServerRespModel
+from src.config import Config
+from src.db.main import get_read_session, get_session
+from src.misc.responses import resp_model
 from src.users.schemas import CreateUserModel, LoginUserModel
+from src.utils.metrics import TimedRoute
+from src.utils.ratelimit import RateLimiter
 
-auth_router = APIRouter()
+auth_router = APIRouter(route_class=TimedRoute)
 auth_service = AuthService()
 
+login_limiter = RateLimiter(
+    "login", per_ip=Config.RATE_LIMIT_LOGIN_PER_IP, per_account=Config.RATE_LIMIT_LOGIN_PER_ACCOUNT
+)
+register_limiter = RateLimiter("register", per_ip=Config.RATE_LIMIT_REGISTER_PER_IP)
+pwd_reset_limiter = RateLimiter(
+    "pwd_reset", per_ip=Config.RATE_LIMIT_PWD_RESET_PER_IP, per_account=Config.RATE_LIMIT_PWD_RESET_PER_ACCOUNT
+)
+
 
 @auth_router.post(
     "/login",
     status_code=status.HTTP_200_OK,
-    response_model=ServerRespModel[LoginResModel],
+    response_model=resp_model(TokenModel),
+    dependencies=[Depends(login_limiter)],
 )
-async def login_user(login_data: LoginUserModel = Body(...), session: AsyncSession = Depends(get_session)):
+async def login_user(login_data: LoginUserModel = Body(...), session: AsyncSession = Depends(get_read_session)):
     return await auth_service.login_user(login_data, session)
 
 
 @auth_router.post(
     "/register",
     status_code=status.HTTP_201_CREATED,
-    response_model=ServerRespModel[bool],
+    response_model=resp_model(bool),
+    dependencies=[Depends(register_limiter)],
 )
 async def register_user(user: CreateUserModel = Body(...), session: AsyncSession = Depends(get_session)):
     return await auth_service.create_user(user, session)
@@ -33,11 +47,11 @@ async def register_user(user: CreateUserModel = Body(...), session: AsyncSession
 @auth_router.get(
     "/profile",
     status_code=status.HTTP_200_OK,
-    response_model=ServerRespModel[TokenUserModel],
+    response_model=resp_model(TokenUserModel),
 )
 async def get_current_user_profile(
     token_payload: dict = Depends(AccessTokenBearer()),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     return await auth_service.get_current_user(token_payload, session)
 
@@ -47,13 +61,31 @@ async def revoke_user_token(token_payload: dict = Depends(AccessTokenBearer())):
     return await auth_service.revoke_token(token_payload)
 
 
-@auth_router.get("/new-access-token", status_code=status.HTTP_200_OK, response_model=ServerRespModel)
+@auth_router.get("/new-access-token", status_code=status.HTTP_200_OK, response_model=resp_model())
 async def get_new_user_access_token(
     token_payload: dict = Depends(RefreshTokenBearer()),
 ):
     return await auth_service.new_access_token(token_payload)
 
 
-@auth_router.post("/pwd-reset", status_code=status.HTTP_200_OK, response_model=ServerRespModel[bool])
+@auth_router.post(
+    "/pwd-reset",
+    status_code=status.HTTP_200_OK,
+    response_model=resp_model(bool),
+    dependencies=[Depends(pwd_reset_limiter)],
+)
 async def pwd_reset(data: ChangePwdModel = Body(...), session: AsyncSession = Depends(get_session)):
     return await auth_service.change_pwd(data=data, session=session)
+
+
+@auth_router.get("/.well-known/jwks.json", status_code=status.HTTP_200_OK)
+async def get_jwks(request: Request):
+    headers = {
+        "Cache-Control": f"public, max-age={Config.JWT_JWKS_MAX_AGE}, stale-while-revalidate=60",
+        "ETag": key_ring.jwks_etag,
+    }
+
+    if request.headers.get("if-none-match") == key_ring.jwks_etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=key_ring.jwks_json, media_type="application/jwk-set+json", headers=headers)
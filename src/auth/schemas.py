@@ -59,6 +59,7 @@ class TokenUserModel(BaseModel):
     avatar: Optional[str]
     email: str
     phone_number: str
+    role: str = "user"
 
     @field_serializer("uid")
     def serialize_uid(self, value: uuid.UUID, _info):
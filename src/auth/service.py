@@ -1,67 +1,66 @@
-from fastapi import status
-from fastapi.responses import JSONResponse
+import logging
+import uuid
+from typing import Optional
+
+from fastapi import Response, status
 from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.background import BackgroundTask
 
 from src.auth.schemas import ChangePwdModel, TokenModel, TokenUserModel
-from src.db.models import User
-from src.db.redis import add_jti_to_block_list
-from src.misc.schemas import ServerRespModel
+from src.db.main import AsyncSessionMaker
+from src.misc.responses import dump_response, server_response
+from src.misc.schemas import EmailTypes
+from src.tasks.outbox import enqueue_email
+from src.users.cache import profile_cache
 from src.users.schemas import CreateUserModel, LoginUserModel
 from src.users.service import UserService
-from src.utils.exceptions import UserEmailExists, UserNotFound, UserPhoneNumberExists, WrongCredentials
+from src.utils import get_base_url
+from src.utils.exceptions import UserNotFound, WrongCredentials
 
 from .authentication import Authentication
+from .hashing import password_hasher
+from .revocation import revocation_cache
 
 user_service = UserService()
 
 
 class AuthService:
+    _dummy_password_hash: Optional[str] = None
+
+    @classmethod
+    async def _dummy_hash(cls) -> str:
+        if cls._dummy_password_hash is None:
+            cls._dummy_password_hash = await password_hasher.hash(uuid.uuid4().hex)
+        return cls._dummy_password_hash
+
     async def get_current_user(self, token_payload: dict, session: AsyncSession):
-        user_email = token_payload["user"]["email"]
-        user = await user_service.get_user_by_email(user_email, session)
+        uid = token_payload["user"]["uid"]
+        body = await profile_cache.get(uid)
 
-        if not user:
-            raise UserNotFound()
+        if body is None:
+            user = await user_service.get_user_by_uid(uuid.UUID(uid), session)
+
+            if not user:
+                raise UserNotFound()
 
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=ServerRespModel[TokenUserModel](
-                data=TokenUserModel.model_validate(
-                    {
-                        "id": user.id,
-                        "uid": user.uid,
-                        "first_name": user.first_name,
-                        "last_name": user.last_name,
-                        "avatar": user.avatar,
-                        "email": user.email,
-                        "phone_number": user.phone_number,
-                    }
-                ).model_dump(),
+            body = dump_response(
+                data=TokenUserModel.model_validate(user, from_attributes=True),
                 message="user profile retrieved",
-            ).model_dump(mode="json"),
-        )
+                data_type=TokenUserModel,
+            )
+            await profile_cache.set(uid, body)
+
+        return Response(status_code=status.HTTP_200_OK, content=body, media_type="application/json")
 
     async def revoke_token(self, token_payload: dict):
-        jti = token_payload["jti"]
-        await add_jti_to_block_list(jti)
-
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=ServerRespModel(
-                data=True,
-                message="logged out successfully.",
-            ).model_dump(),
-        )
+        await revocation_cache.revoke(token_payload["jti"], token_payload["exp"])
+
+        return server_response(data=True, message="logged out successfully.", data_type=bool)
 
     async def new_access_token(self, token_payload: dict):
         new_access_token = Authentication.create_token(TokenUserModel.model_validate(token_payload["user"]))
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=ServerRespModel(
-                data={"access_token": new_access_token},
-                message="new access token generated.",
-            ).model_dump(),
-        )
+
+        return server_response(data={"access_token": new_access_token}, message="new access token generated.")
 
     async def change_pwd(self, data: ChangePwdModel, session: AsyncSession):
         user = await user_service.get_user_by_email(email=data.email, session=session)
@@ -71,66 +70,61 @@ class AuthService:
 
         await user_service.update_user(
             user=user,
-            user_data={"password": Authentication.generate_password_hash(data.model_dump().get("new_password"))},
+            user_data={"password": await password_hasher.hash(data.new_password)},
             session=session,
         )
 
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=ServerRespModel[bool](data=True, message="Password reset successful.").model_dump(),
-        )
+        return server_response(data=True, message="Password reset successful.", data_type=bool)
 
     async def login_user(self, login_data: LoginUserModel, session: AsyncSession):
         user = await user_service.get_user_by_email(login_data.email, session)
 
         if user is None:
-            raise UserNotFound()
+            # Verify against a throwaway hash so unknown emails cost as much as wrong passwords
+            # and both answer with WrongCredentials: neither timing nor error reveals the email exists.
+            await password_hasher.verify(login_data.password, await self._dummy_hash())
+            raise WrongCredentials()
 
-        if Authentication.verify_password(login_data.password, user.password):
-            user_data = TokenUserModel.model_validate(
-                {
-                    "id": user.id,
-                    "uid": user.uid,
-                    "first_name": user.first_name,
-                    "last_name": user.last_name,
-                    "avatar": user.avatar,
-                    "email": user.email,
-                    "phone_number": user.phone_number,
-                }
-            )
+        valid, new_hash = await password_hasher.verify_and_update(login_data.password, user.password)
+        if valid:
+            user_data = TokenUserModel.model_validate(user, from_attributes=True)
 
             access_token = Authentication.create_token(user_data)
             refresh_token = Authentication.create_token(user_data=user_data, refresh=True)
 
-            return JSONResponse(
-                status_code=status.HTTP_200_OK,
-                content=ServerRespModel[TokenModel](
-                    data={
-                        "access_token": access_token,
-                        "refresh_token": refresh_token,
-                    },
-                    message="user token generated.",
-                ).model_dump(),
+            response = server_response(
+                data=TokenModel(access_token=access_token, refresh_token=refresh_token),
+                message="user token generated.",
+                data_type=TokenModel,
             )
+            if new_hash is not None:
+                # Written after the response has been sent, so the upgrade adds no login latency.
+                response.background = BackgroundTask(self.upgrade_password_hash, user.uid, user.password, new_hash)
+
+            return response
 
         raise WrongCredentials()
 
+    async def upgrade_password_hash(self, uid: uuid.UUID, old_hash: str, new_hash: str) -> None:
+        """Store a rehash of the user's password, unless the password changed since it was verified."""
+        try:
+            async with AsyncSessionMaker() as session:
+                await user_service.replace_password_hash(uid, old_hash, new_hash, session)
+        except Exception as e:
+            logging.warning(f"Password hash upgrade failed for user {uid}: {e}")
+
     async def create_user(self, user_data: CreateUserModel, session: AsyncSession):
         user = user_data.model_dump()
-
-        if await user_service.get_user_by_email(user.get("email"), session):
-            raise UserEmailExists()
-
-        if await user_service.get_user_by_phone(user.get("phone_number"), session):
-            raise UserPhoneNumberExists()
-
-        user["password"] = Authentication.generate_password_hash(user["password"])
-        new_user = User(**user)
-
-        session.add(new_user)
+        user["password"] = await password_hasher.hash(user["password"])
+
+        new_user = await user_service.create_user(user, session, commit=False)
+        enqueue_email(
+            session,
+            EmailTypes.EMAIL_VERIFICATION,
+            email=new_user.email,
+            first_name=new_user.first_name,
+            base_url=get_base_url(),
+        )
         await session.commit()
 
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=ServerRespModel[bool](data=True, message="Account created!").model_dump(),
-        )
+        return server_response(data=True, message="Account created!", data_type=bool)
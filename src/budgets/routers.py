@@ -0,0 +1,41 @@
+from datetime import date, datetime, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth.dependencies import AccessTokenBearer
+from src.db.main import get_read_session
+from src.misc.responses import resp_model, server_response
+from src.utils.metrics import TimedRoute
+
+from .schemas import BudgetRollupModel
+from .service import BudgetService
+
+budget_router = APIRouter(route_class=TimedRoute)
+budget_service = BudgetService()
+
+
+@budget_router.get(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_model=resp_model(List[BudgetRollupModel]),
+)
+async def get_monthly_budget(
+    month: Optional[str] = Query(None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="YYYY-MM, defaults to now."),
+    token_payload: dict = Depends(AccessTokenBearer()),
+    session: AsyncSession = Depends(get_read_session),
+):
+    if month is None:
+        month_start = datetime.now(timezone.utc).date().replace(day=1)
+    else:
+        year, month_number = month.split("-")
+        month_start = date(int(year), int(month_number), 1)
+
+    rollups = await budget_service.get_month(token_payload["user"]["id"], month_start, session)
+
+    return server_response(
+        data=[BudgetRollupModel.model_validate(rollup, from_attributes=True) for rollup in rollups],
+        message="budget retrieved.",
+        data_type=List[BudgetRollupModel],
+    )
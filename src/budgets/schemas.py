@@ -0,0 +1,14 @@
+from datetime import date
+
+from pydantic import BaseModel, ConfigDict
+
+
+class BudgetRollupModel(BaseModel):
+    month: date
+    category: str
+    currency: str
+    expense_total: int
+    income_total: int
+    transaction_count: int
+
+    model_config = ConfigDict(from_attributes=True)
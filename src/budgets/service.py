@@ -0,0 +1,146 @@
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import text
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import BudgetRollup, Transaction
+from src.utils.metrics import timed
+
+# First key of the per-user advisory lock (second key: user id). Rollup writers hold it
+# shared until they commit, and the repair job holds it exclusively while it recomputes, so
+# a repair never overwrites an increment it did not see.
+ROLLUP_LOCK_CLASS = 4801
+
+# SQL expression bucketing `occurred_at` into its (UTC) month, matching `rollup_month`.
+ROLLUP_MONTH_SQL = "(date_trunc('month', occurred_at AT TIME ZONE 'UTC'))::date"
+
+APPLY_ROLLUP_DELTA = text(
+    """
+    WITH rollup_lock AS (SELECT pg_advisory_xact_lock_shared(:lock_class, :user_id))
+    INSERT INTO budget_rollups
+        (user_id, month, category, currency, expense_total, income_total, transaction_count)
+    SELECT :user_id, :month, :category, :currency, :expense_total, :income_total, :transaction_count
+    FROM rollup_lock
+    ON CONFLICT (user_id, month, category, currency) DO UPDATE SET
+        expense_total = budget_rollups.expense_total + excluded.expense_total,
+        income_total = budget_rollups.income_total + excluded.income_total,
+        transaction_count = budget_rollups.transaction_count + excluded.transaction_count
+    """
+)
+
+REPAIR_LOCK = text("SELECT pg_advisory_xact_lock(:lock_class, :user_id)")
+
+REPAIR_ROLLUPS = text(
+    f"""
+    WITH actual AS (
+        SELECT user_id, {ROLLUP_MONTH_SQL} AS month, category, currency,
+            coalesce(sum(amount) FILTER (WHERE kind = 'expense'), 0) AS expense_total,
+            coalesce(sum(amount) FILTER (WHERE kind = 'income'), 0) AS income_total,
+            count(*) AS transaction_count
+        FROM transactions
+        WHERE user_id = :user_id
+        GROUP BY 1, 2, 3, 4
+    ),
+    fixed AS (
+        INSERT INTO budget_rollups
+            (user_id, month, category, currency, expense_total, income_total, transaction_count)
+        SELECT * FROM actual
+        ON CONFLICT (user_id, month, category, currency) DO UPDATE SET
+            expense_total = excluded.expense_total,
+            income_total = excluded.income_total,
+            transaction_count = excluded.transaction_count
+        WHERE (budget_rollups.expense_total, budget_rollups.income_total, budget_rollups.transaction_count)
+            IS DISTINCT FROM (excluded.expense_total, excluded.income_total, excluded.transaction_count)
+        RETURNING 1
+    ),
+    removed AS (
+        DELETE FROM budget_rollups AS r
+        WHERE r.user_id = :user_id AND NOT EXISTS (
+            SELECT 1 FROM actual AS a WHERE (a.month, a.category, a.currency) = (r.month, r.category, r.currency)
+        )
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM fixed) AS fixed, (SELECT count(*) FROM removed) AS removed
+    """
+)
+
+# (user_id, month, category, currency, kind, amount): what a transaction adds to the rollups.
+RollupEntry = Tuple[int, date, str, str, str, int]
+
+
+def rollup_month(occurred_at: datetime) -> date:
+    occurred_at = occurred_at.astimezone(timezone.utc)
+    return date(occurred_at.year, occurred_at.month, 1)
+
+
+def rollup_entry(transaction: Transaction) -> RollupEntry:
+    return (
+        transaction.user_id,
+        rollup_month(transaction.occurred_at),
+        transaction.category,
+        transaction.currency,
+        transaction.kind,
+        transaction.amount,
+    )
+
+
+def rollup_deltas(added: Iterable[RollupEntry], removed: Iterable[RollupEntry]) -> List[Dict]:
+    """Net the entries per rollup row, dropping rows whose totals do not change."""
+    totals: Dict[Tuple, List[int]] = defaultdict(lambda: [0, 0, 0])
+
+    for entries, sign in ((added, 1), (removed, -1)):
+        for user_id, month, category, currency, kind, amount in entries:
+            row = totals[(user_id, month, category, currency)]
+            row[0 if kind == "expense" else 1] += sign * amount
+            row[2] += sign
+
+    return [
+        {
+            "lock_class": ROLLUP_LOCK_CLASS,
+            "user_id": user_id,
+            "month": month,
+            "category": category,
+            "currency": currency,
+            "expense_total": expense_total,
+            "income_total": income_total,
+            "transaction_count": transaction_count,
+        }
+        for (user_id, month, category, currency), (expense_total, income_total, transaction_count) in totals.items()
+        if expense_total or income_total or transaction_count
+    ]
+
+
+class BudgetService:
+    @timed("budget_service.apply")
+    async def apply(
+        self, session: AsyncSession, added: Iterable[RollupEntry] = (), removed: Iterable[RollupEntry] = ()
+    ) -> None:
+        """Add `added` to and subtract `removed` from the rollups, in the caller's transaction."""
+        params = rollup_deltas(added, removed)
+        if params:
+            await session.exec(APPLY_ROLLUP_DELTA, params=params)
+
+    @timed("budget_service.get_month")
+    async def get_month(self, user_id: int, month: date, session: AsyncSession) -> List[BudgetRollup]:
+        statement = (
+            select(BudgetRollup)
+            .where(BudgetRollup.user_id == user_id, BudgetRollup.month == month, BudgetRollup.transaction_count > 0)
+            .order_by(BudgetRollup.category, BudgetRollup.currency)
+        )
+        result = await session.exec(statement)
+
+        return list(result.all())
+
+    async def repair(self, user_id: int, session: AsyncSession) -> Tuple[int, int]:
+        """Recompute a user's rollups from their transactions and commit.
+
+        Returns how many rows were corrected (or created) and how many were removed.
+        """
+        await session.exec(REPAIR_LOCK, params={"lock_class": ROLLUP_LOCK_CLASS, "user_id": user_id})
+        result = (await session.exec(REPAIR_ROLLUPS, params={"user_id": user_id})).one()
+        await session.commit()
+
+        return result.fixed, result.removed
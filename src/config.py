@@ -1,14 +1,46 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_REPLICA_URL: Optional[str] = None
+    DATABASE_REPLICA_MAX_LAG: float = 5.0
+    DATABASE_REPLICA_CHECK_INTERVAL: float = 5.0
+    DATABASE_STICKY_SECONDS: int = 15
     JWT_SECRET: str
     JWT_ALGORITHM: str
+    JWT_CACHE_SIZE: int = 10_000
+    JWT_KEYS_DIR: Optional[str] = None
+    JWT_ACTIVE_KID: Optional[str] = None
+    JWT_JWKS_MAX_AGE: int = 3600
 
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 5.0
+    REDIS_SOCKET_TIMEOUT: float = 2.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+
+    REVOCATION_CACHE_SIZE: int = 100_000
+    REVOCATION_CHANNEL: str = "blocklist:revoked"
+    REVOCATION_FAIL_OPEN: bool = True
+    # Also honour revocations stored under the bare JTI by releases before the "blocklist:" prefix.
+    # Those keys expire within an hour; turn this off once no instance of an older release is running
+    # and that hour has passed.
+    BLOCKLIST_LEGACY_KEYS: bool = True
+
+    PROFILE_CACHE_SIZE: int = 10_000
+    PROFILE_CACHE_TTL: int = 30
+    PROFILE_CACHE_REDIS: bool = False
+    PROFILE_CACHE_REDIS_TTL: int = 300
 
     MAIL_USERNAME: str
     MAIL_PASSWORD: str
@@ -16,9 +48,53 @@ class Settings(BaseSettings):
     MAIL_PORT: int
     MAIL_SERVER: str
     MAIL_FROM_NAME: str
+    SMTP_POOL_SIZE: int = 2
+    SMTP_IDLE_TIMEOUT: float = 60.0
+    MAIL_TEMPLATE_CACHE_DIR: Optional[str] = None
+
+    IMPORT_DIR: str = "/tmp/imports"
+    IMPORT_MAX_BYTES: int = 50 * 1024 * 1024
+    IMPORT_BATCH_SIZE: int = 5000
+    IMPORT_STATUS_TTL: int = 86400
+
+    REPORTS_SNAPSHOT_DIR: str = "/tmp/report-snapshots"
+    REPORTS_SNAPSHOT_MAX_AGE: int = 3600
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 100_000
+    RATE_LIMIT_LOGIN_PER_IP: str = "20/minute"
+    RATE_LIMIT_LOGIN_PER_ACCOUNT: str = "5/minute"
+    RATE_LIMIT_REGISTER_PER_IP: str = "10/hour"
+    RATE_LIMIT_PWD_RESET_PER_IP: str = "10/hour"
+    RATE_LIMIT_PWD_RESET_PER_ACCOUNT: str = "3/hour"
+
+    IDEMPOTENCY_TTL: int = 24 * 3600
+    IDEMPOTENCY_LOCK_TTL: int = 60
+    IDEMPOTENCY_MAX_BODY: int = 64 * 1024
+
+    OUTBOX_BATCH_SIZE: int = 200
+    OUTBOX_POLL_INTERVAL: float = 1.0
 
     EMAIL_SALT: str
 
+    PWD_HASH_WORKERS: int = 4
+    PWD_HASH_MAX_PENDING: int = 64
+    # Comma-separated passlib schemes: the first hashes new passwords, the rest are only verified
+    # and upgraded on the next successful login. Tune the costs with benchmarks/bench_password_hash.py.
+    PWD_HASH_SCHEMES: str = "argon2,bcrypt"
+    PWD_ARGON2_MEMORY_COST: int = 19456
+    PWD_ARGON2_TIME_COST: int = 2
+    PWD_ARGON2_PARALLELISM: int = 1
+    PWD_BCRYPT_ROUNDS: int = 12
+
+    METRICS_TOKEN: Optional[str] = None
+
+    PROFILER_ENABLED: bool = False
+    PROFILER_DIR: str = "/tmp/profiles"
+    PROFILER_INTERVAL: float = 0.001
+    PROFILER_MAX_SECONDS: int = 60
+    PROFILER_TOKEN_MAX_AGE: int = 300
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 
@@ -1,13 +1,136 @@
-from typing import AsyncGenerator
+import asyncio
+import logging
+import time
+from typing import AsyncGenerator, Optional
 
-from sqlalchemy.ext.asyncio import AsyncEngine
-from sqlalchemy.orm import sessionmaker
-from sqlmodel import SQLModel, create_engine
+from fastapi import Request
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlmodel import Session, SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.config import Config
+from src.utils.metrics import (
+    DB_POOL_CAPACITY,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_POOL_TIMEOUTS,
+    DB_READ_SESSIONS,
+    DB_REPLICA_LAG_SECONDS,
+)
 
-async_engine = AsyncEngine(create_engine(url=Config.DATABASE_URL))
+# Request state / cookie marking a client whose reads must go to the primary until the given
+# epoch second, so it reads its own writes while the replica catches up.
+STICKY_COOKIE = "db_primary_until"
+
+# Seconds since the last replayed transaction, or 0 when everything received has been replayed
+# (an idle primary otherwise looks like growing lag).
+REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout latency and checkout timeouts."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+
+class PrimarySession(Session):
+    """Session class for the primary; records on `info` that it committed."""
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _mark_committed(session: Session) -> None:
+    session.info["committed"] = True
+
+
+class ReplicaMonitor:
+    """Decides whether the replica may serve reads, checking its lag at most every `interval` seconds."""
+
+    def __init__(self, engine: AsyncEngine, max_lag: float, interval: float):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.interval = interval
+        self._usable = False
+        self._checked_at = float("-inf")
+
+    async def is_usable(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at >= self.interval:
+            # Set before awaiting, so concurrent callers keep the last answer instead of all checking.
+            self._checked_at = now
+            self._usable = await self._check()
+
+        return self._usable
+
+    async def _check(self) -> bool:
+        try:
+            async with self.engine.connect() as connection:
+                lag = float((await asyncio.wait_for(connection.execute(REPLICA_LAG_SQL), timeout=1.0)).scalar())
+        except (exc.SQLAlchemyError, OSError, asyncio.TimeoutError) as e:
+            logging.warning(f"Read replica unavailable, reading from primary: {e}")
+            return False
+
+        DB_REPLICA_LAG_SECONDS.set(lag)
+        if lag > self.max_lag:
+            logging.warning(f"Read replica is {lag:.1f}s behind, reading from primary.")
+            return False
+        return True
+
+
+async_engine = create_async_engine(
+    url=Config.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=Config.DATABASE_POOL_SIZE,
+    max_overflow=Config.DATABASE_MAX_OVERFLOW,
+    pool_timeout=Config.DATABASE_POOL_TIMEOUT,
+    pool_recycle=Config.DATABASE_POOL_RECYCLE,
+    pool_pre_ping=Config.DATABASE_POOL_PRE_PING,
+)
+
+AsyncSessionMaker = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, sync_session_class=PrimarySession, expire_on_commit=False
+)
+
+replica_engine: Optional[AsyncEngine] = None
+ReplicaSessionMaker: Optional[async_sessionmaker] = None
+replica_monitor: Optional[ReplicaMonitor] = None
+
+if Config.DATABASE_REPLICA_URL:
+    replica_engine = create_async_engine(
+        url=Config.DATABASE_REPLICA_URL,
+        pool_size=Config.DATABASE_POOL_SIZE,
+        max_overflow=Config.DATABASE_MAX_OVERFLOW,
+        pool_timeout=Config.DATABASE_POOL_TIMEOUT,
+        pool_recycle=Config.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=Config.DATABASE_POOL_PRE_PING,
+    )
+    ReplicaSessionMaker = async_sessionmaker(bind=replica_engine, class_=AsyncSession, expire_on_commit=False)
+    replica_monitor = ReplicaMonitor(
+        replica_engine, max_lag=Config.DATABASE_REPLICA_MAX_LAG, interval=Config.DATABASE_REPLICA_CHECK_INTERVAL
+    )
+
+_READ_REPLICA = DB_READ_SESSIONS.labels("replica")
+_READ_PRIMARY = DB_READ_SESSIONS.labels("primary")
+
+# Gauges are evaluated lazily at scrape time, so they cost nothing on the request path.
+DB_POOL_CHECKED_OUT.set_function(lambda: async_engine.pool.checkedout())
+DB_POOL_CAPACITY.set(Config.DATABASE_POOL_SIZE + max(Config.DATABASE_MAX_OVERFLOW, 0))
 
 
 async def init_db():
@@ -15,8 +138,37 @@ async def init_db():
         await conn.run_sync(SQLModel.metadata.create_all)
 
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    AsyncSessionMaker = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+async def close_db():
+    await async_engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+
+
+def is_sticky(request: Request) -> bool:
+    """Whether this client wrote recently enough that it must read from the primary."""
+    until = getattr(request.state, "primary_until", None) or request.cookies.get(STICKY_COOKIE)
+    try:
+        return float(until) > time.time()
+    except (TypeError, ValueError):
+        return False
+
+
+async def get_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionMaker() as async_session:
+        yield async_session
+
+    if replica_engine is not None and async_session.info.get("committed"):
+        request.state.primary_until = int(time.time()) + Config.DATABASE_STICKY_SECONDS
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints: the replica when it is healthy and the client has not just written."""
+    if replica_monitor is not None and not is_sticky(request) and await replica_monitor.is_usable():
+        _READ_REPLICA.inc()
+        session_maker = ReplicaSessionMaker
+    else:
+        _READ_PRIMARY.inc()
+        session_maker = AsyncSessionMaker
 
-    async with AsyncSessionMaker() as async_session_maker:
-        yield async_session_maker
+    async with session_maker() as async_session:
+        yield async_session
@@ -1,8 +1,10 @@
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import Optional
 
 from pydantic import EmailStr
+from sqlalchemy import BigInteger, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Column, DateTime, Field, SQLModel
 
 
@@ -13,10 +15,12 @@ class User(SQLModel, table=True):
     uid: uuid.UUID = Field(default_factory=uuid.uuid4, nullable=False, index=True, unique=True)
     first_name: str = Field(...)
     last_name: str = Field(...)
+    # Stored lower-cased; looked up through the unique index on lower(email) below.
     email: EmailStr = Field(...)
-    phone_number: str = Field(...)
+    phone_number: str = Field(..., unique=True, index=True)
     password: str = Field(...)
     avatar: Optional[str] = Field(default="")
+    role: str = Field(default="user", sa_column_kwargs={"server_default": "user"})
     created_at: datetime = Field(
         sa_column=Column(DateTime(timezone=True)),
         default_factory=lambda: datetime.now(timezone.utc),
@@ -28,3 +32,74 @@ class User(SQLModel, table=True):
 
     def __repr__(self) -> str:
         return f"<User: {self.model_dump()}>"
+
+
+Index("ix_users_email_lower", func.lower(User.email), unique=True)
+
+
+class EmailOutbox(SQLModel, table=True):
+    """Emails to send, written in the same transaction as the change that triggers them."""
+
+    __tablename__ = "email_outbox"
+
+    id: Optional[int] = Field(primary_key=True, default=None)
+    email_type: str = Field(...)
+    payload: dict = Field(sa_column=Column(JSONB, nullable=False))
+    created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True)),
+        default_factory=lambda: datetime.now(timezone.utc),
+    )
+
+
+class Transaction(SQLModel, table=True):
+    """An expense or income entry. `amount` is a positive integer in the currency's minor units."""
+
+    __tablename__ = "transactions"
+
+    id: Optional[int] = Field(primary_key=True, default=None)
+    uid: uuid.UUID = Field(default_factory=uuid.uuid4, nullable=False, unique=True)
+    user_id: int = Field(foreign_key="users.id", nullable=False, ondelete="CASCADE")
+    amount: int = Field(sa_column=Column(BigInteger, nullable=False))
+    currency: str = Field(..., max_length=3)
+    category: str = Field(...)
+    kind: str = Field(default="expense")
+    occurred_at: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    note: Optional[str] = Field(default=None)
+    # Set for imported rows only, so re-importing the same statement inserts nothing.
+    content_hash: Optional[str] = Field(default=None)
+    created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True)),
+        default_factory=lambda: datetime.now(timezone.utc),
+    )
+    updated_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True)),
+        default_factory=lambda: datetime.now(timezone.utc),
+    )
+
+
+# Serves the keyset-paginated listing: WHERE user_id = ? ORDER BY occurred_at DESC, id DESC.
+Index(
+    "ix_transactions_user_occurred_at_id",
+    Transaction.user_id,
+    Transaction.occurred_at.desc(),
+    Transaction.id.desc(),
+)
+Index("ix_transactions_user_content_hash", Transaction.user_id, Transaction.content_hash, unique=True)
+
+
+class BudgetRollup(SQLModel, table=True):
+    """A user's transaction totals for one month, category and currency.
+
+    Kept current by every transaction write in the same database transaction, so dashboards
+    read totals instead of aggregating the user's history.
+    """
+
+    __tablename__ = "budget_rollups"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True, ondelete="CASCADE")
+    month: date = Field(primary_key=True)
+    category: str = Field(primary_key=True)
+    currency: str = Field(primary_key=True, max_length=3)
+    expense_total: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, server_default="0"))
+    income_total: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, server_default="0"))
+    transaction_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
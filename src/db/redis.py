@@ -1,28 +1,204 @@
 import logging
+import time
+from typing import AsyncIterator, List, Optional, Set, Tuple
 
 import redis.asyncio as aioredis
+from redis.exceptions import RedisError
 
 from src.config import Config
+from src.utils.exceptions import RevocationUnavailable
+from src.utils.metrics import REDIS_POOL_CAPACITY, REDIS_POOL_IN_USE, timed
 
-token_block_list = None
+BLOCKLIST_PREFIX = "blocklist:"
+LEDGER_VERSION_PREFIX = "ledger:version:"
+IMPORT_OWNER_PREFIX = "import:owner:"
 
-try:
-    token_block_list = aioredis.from_url(url=f"redis://{Config.REDIS_HOST}:{Config.REDIS_PORT}/0")
-except ConnectionError:
-    print("Redis not available. Skipping blocklist feature.")
 
+class TrackedConnectionPool(aioredis.BlockingConnectionPool):
+    """Blocking pool that keeps its own record of checked-out connections for `REDIS_POOL_IN_USE`."""
 
-async def add_jti_to_block_list(jti: str) -> None:
-    return await token_block_list.set(name=jti, value="", ex=3600)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checked_out: Set[int] = set()
+
+    @property
+    def in_use(self) -> int:
+        return len(self.checked_out)
+
+    async def get_connection(self, *args, **kwargs):
+        connection = await super().get_connection(*args, **kwargs)
+        self.checked_out.add(id(connection))
+        return connection
+
+    async def release(self, connection) -> None:
+        # Also called by the base class for connections that failed their health check before
+        # being handed out, hence a set rather than a counter.
+        self.checked_out.discard(id(connection))
+        await super().release(connection)
+
+
+redis_pool: Optional[TrackedConnectionPool] = None
+redis_client: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> Optional[aioredis.Redis]:
+    return redis_client
+
+
+async def init_redis() -> None:
+    global redis_pool, redis_client
+
+    redis_pool = TrackedConnectionPool.from_url(
+        url=f"redis://{Config.REDIS_HOST}:{Config.REDIS_PORT}/0",
+        max_connections=Config.REDIS_MAX_CONNECTIONS,
+        timeout=Config.REDIS_POOL_TIMEOUT,
+        socket_timeout=Config.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=Config.REDIS_SOCKET_TIMEOUT,
+        health_check_interval=Config.REDIS_HEALTH_CHECK_INTERVAL,
+    )
+    redis_client = aioredis.Redis(connection_pool=redis_pool)
+
+    REDIS_POOL_IN_USE.set_function(lambda: redis_pool.in_use if redis_pool is not None else 0)
+    REDIS_POOL_CAPACITY.set(Config.REDIS_MAX_CONNECTIONS)
+
+    try:
+        await redis_client.ping()
+    except RedisError as e:
+        logging.warning(f"Redis not available: {e}")
+
+
+async def close_redis() -> None:
+    global redis_pool, redis_client
+
+    if redis_client is not None:
+        await redis_client.aclose()
+    if redis_pool is not None:
+        await redis_pool.aclose()
+
+    redis_client = None
+    redis_pool = None
+
+
+def _block_list_key(jti: str) -> str:
+    return f"{BLOCKLIST_PREFIX}{jti}"
+
+
+async def add_jti_to_block_list(jti: str, exp: int) -> None:
+    """Block `jti` until the token it belongs to would have expired anyway.
+
+    The revocation is also published on `Config.REVOCATION_CHANNEL` so every worker's
+    local revocation cache picks it up; both commands go out in one round trip. Raises
+    `RevocationUnavailable` if it cannot be recorded, so logout never claims a revocation
+    that did not happen.
+    """
+    ttl = int(exp - time.time())
+    if ttl <= 0:
+        return
+
+    if redis_client is None:
+        raise RevocationUnavailable()
+
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.set(name=_block_list_key(jti), value=str(exp), ex=ttl)
+            pipe.publish(Config.REVOCATION_CHANNEL, f"{jti}:{exp}")
+            await pipe.execute()
+    except RedisError as e:
+        logging.warning(f"Redis error while revoking token: {e}")
+        raise RevocationUnavailable()
+
+
+@timed("redis_blocklist_lookup")
+async def tokens_in_block_list(jtis: List[str]) -> List[bool]:
+    """Check several JTIs with a single MGET. Redis errors are left to the caller.
+
+    With `BLOCKLIST_LEGACY_KEYS`, the bare-JTI keys written by older releases are checked too.
+    """
+    if redis_client is None or not jtis:
+        return [False] * len(jtis)
+
+    keys = [_block_list_key(jti) for jti in jtis]
+    if Config.BLOCKLIST_LEGACY_KEYS:
+        keys.extend(jtis)
+
+    blocked = [value is not None for value in await redis_client.mget(keys)]
+    if Config.BLOCKLIST_LEGACY_KEYS:
+        count = len(jtis)
+        return [current or legacy for current, legacy in zip(blocked, blocked[count:])]
+    return blocked
 
 
 async def token_in_block_list(jti: str) -> bool:
-    if await token_block_list is None:
-        return False
+    return (await tokens_in_block_list([jti]))[0]
+
+
+async def iter_block_list(batch_size: int = 1000) -> AsyncIterator[List[Tuple[str, int]]]:
+    """Yield every blocked `(jti, exp)` pair in batches, using SCAN + MGET."""
+    if redis_client is None:
+        return
+
+    keys = []
+    async for key in redis_client.scan_iter(match=f"{BLOCKLIST_PREFIX}*", count=batch_size):
+        keys.append(key)
+        if len(keys) >= batch_size:
+            yield await _read_block_list_entries(keys)
+            keys = []
+
+    if keys:
+        yield await _read_block_list_entries(keys)
+
+
+async def _read_block_list_entries(keys: List[bytes]) -> List[Tuple[str, int]]:
+    values = await redis_client.mget(keys)
+    prefix_len = len(BLOCKLIST_PREFIX)
+
+    return [(key.decode()[prefix_len:], int(value)) for key, value in zip(keys, values) if value is not None]
+
+
+async def get_ledger_version(user_id: int) -> Optional[int]:
+    """The user's ledger version, bumped after every transaction write; None if unknown."""
+    if redis_client is None:
+        return None
+
+    try:
+        value = await redis_client.get(f"{LEDGER_VERSION_PREFIX}{user_id}")
+    except RedisError as e:
+        logging.warning(f"Redis error while reading ledger version: {e}")
+        return None
+
+    return int(value or 0)
+
+
+async def bump_ledger_version(user_id: int) -> None:
+    if redis_client is None:
+        return
 
     try:
-        blocked_jti = await token_block_list.get(jti)
-        return blocked_jti is not None
-    except Exception as e:
-        logging.warning(f"Redis error: {e}")
-        return False
+        await redis_client.incr(f"{LEDGER_VERSION_PREFIX}{user_id}")
+    except RedisError as e:
+        logging.warning(f"Redis error while bumping ledger version: {e}")
+
+
+async def set_import_owner(task_id: str, user_id: int) -> None:
+    """Remember who submitted an import, so only they can read its status."""
+    if redis_client is None:
+        return
+
+    try:
+        await redis_client.set(f"{IMPORT_OWNER_PREFIX}{task_id}", user_id, ex=Config.IMPORT_STATUS_TTL)
+    except RedisError as e:
+        logging.warning(f"Redis error while recording import owner: {e}")
+
+
+async def get_import_owner(task_id: str) -> Optional[int]:
+    """The user who submitted the import; None if unknown, expired or Redis is unavailable."""
+    if redis_client is None:
+        return None
+
+    try:
+        value = await redis_client.get(f"{IMPORT_OWNER_PREFIX}{task_id}")
+    except RedisError as e:
+        logging.warning(f"Redis error while reading import owner: {e}")
+        return None
+
+    return int(value) if value is not None else None
@@ -0,0 +1,30 @@
+from functools import lru_cache
+from typing import Any, Type
+
+from fastapi import Response, status
+
+from src.misc.schemas import ServerRespModel
+
+
+@lru_cache(maxsize=None)
+def resp_model(data_type: Any = Any) -> Type[ServerRespModel]:
+    """Return the parametrized `ServerRespModel[data_type]`, built once per type.
+
+    Routers use it for `response_model` so the documented schema and the serializer
+    below share the same class (and its compiled pydantic-core serializer).
+    """
+    return ServerRespModel[data_type]
+
+
+def dump_response(data: Any, message: str, data_type: Any = Any) -> bytes:
+    """Serialize a `ServerRespModel[data_type]` envelope to JSON bytes in a single pass.
+
+    `data` is trusted service output, so validation is skipped.
+    """
+    return resp_model(data_type).model_construct(data=data, message=message).model_dump_json().encode()
+
+
+def server_response(data: Any, message: str, data_type: Any = Any, status_code: int = status.HTTP_200_OK) -> Response:
+    return Response(
+        content=dump_response(data, message, data_type), status_code=status_code, media_type="application/json"
+    )
@@ -1,4 +1,4 @@
-from typing import Generic, List, TypeVar
+from typing import Generic, List, Optional, TypeVar
 
 from fastapi import UploadFile
 from pydantic import BaseModel, ConfigDict
@@ -27,6 +27,18 @@ class PaginatedResponse(BaseModel, Generic[T]):
     pagination: Pagination
 
 
+# Keyset pagination metadata: `next_cursor` is opaque and is passed back as `cursor`
+class CursorPagination(BaseModel):
+    limit: int
+    next_cursor: Optional[str]
+    has_more: bool
+
+
+class CursorPaginatedResponse(BaseModel, Generic[T]):
+    result: list[T]
+    pagination: CursorPagination
+
+
 class ServerErrorModel(BaseModel, Generic[T]):
     error_code: T
     message: str
@@ -35,14 +47,22 @@ class ServerErrorModel(BaseModel, Generic[T]):
 
 
 class EmailType:
-    def __init__(self, _subject: str, _template: str):
+    def __init__(self, _subject: str, _template: str, _link_path: str, _link_name: str):
         self.subject = _subject
         self.template = _template
+        self.link_path = _link_path
+        self.link_name = _link_name
+
+    def __set_name__(self, owner, name: str):
+        # The attribute name on `EmailTypes`, used to refer to this type in task payloads.
+        self.name = name
 
 
 class EmailTypes:
-    EMAIL_VERIFICATION = EmailType("Verify your account", "email_verification.html")
-    PWD_RESET = EmailType("Password reset", "pwd_reset.html")
+    EMAIL_VERIFICATION = EmailType(
+        "Verify your account", "email_verification.html", "api/v1/auth/verify", "verification_url"
+    )
+    PWD_RESET = EmailType("Password reset", "pwd_reset.html", "api/v1/auth/pwd-reset", "reset_url")
 
 
 class EmailModel(BaseModel):
@@ -0,0 +1,51 @@
+import logging
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .service import profiler_service
+
+PROFILE_HEADER = b"x-profile"
+
+
+class RequestProfilerMiddleware:
+    """Profiles requests that carry a valid signed `X-Profile` header.
+
+    The profile id is returned in the `X-Profile-Id` response header and the file can be
+    downloaded from the profiler router once the request has finished.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = next((value for name, value in scope["headers"] if name == PROFILE_HEADER), None)
+        if token is None or profiler_service.busy or not profiler_service.verify_request_token(token.decode("latin-1")):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        profiler = profiler_service.request_profiler()
+        try:
+            profiler.start()
+        except RuntimeError as e:
+            logging.warning(f"Request profiling skipped: {e}")
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            await profiler_service.save(profiler, profile_id)
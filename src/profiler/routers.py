@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import FileResponse
+
+from src.auth.dependencies import RoleChecker
+from src.config import Config
+from src.misc.responses import resp_model, server_response
+
+from .service import profiler_service
+
+admin_only = RoleChecker(["admin"])
+profiler_router = APIRouter(dependencies=[Depends(admin_only)])
+
+
+@profiler_router.post("/worker", status_code=status.HTTP_200_OK, response_class=FileResponse)
+async def profile_worker(seconds: int = Query(10, ge=1, le=Config.PROFILER_MAX_SECONDS)):
+    path = await profiler_service.profile_worker(seconds)
+
+    return FileResponse(path, media_type="application/json", filename=path.name)
+
+
+@profiler_router.post("/token", status_code=status.HTTP_200_OK, response_model=resp_model(dict))
+async def create_request_profile_token(token_payload: dict = Depends(admin_only)):
+    token = profiler_service.create_request_token(token_payload["user"]["uid"])
+
+    return server_response(
+        data={"token": token, "header": "X-Profile", "expires_in": profiler_service.token_max_age},
+        message="request profile token generated.",
+        data_type=dict,
+    )
+
+
+@profiler_router.get("/profiles/{profile_id}", status_code=status.HTTP_200_OK, response_class=FileResponse)
+async def download_profile(profile_id: str):
+    path = profiler_service.profile_path(profile_id)
+
+    return FileResponse(path, media_type="application/json", filename=path.name)
@@ -0,0 +1,92 @@
+import asyncio
+import os
+import re
+import uuid
+from pathlib import Path
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from pyinstrument import Profiler
+from pyinstrument.renderers import SpeedscopeRenderer
+
+from src.config import Config
+from src.utils.exceptions import ProfileNotFound, ProfilerBusy
+
+PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ProfilerService:
+    """Sampling profiles of a running worker, written as speedscope files.
+
+    A worker profile samples everything the event loop thread runs for a while. A request
+    profile only samples the request carrying a valid signed `X-Profile` header. Only one
+    worker profile runs at a time, and request profiling is skipped while it does.
+    """
+
+    def __init__(self, output_dir: str, interval: float, token_max_age: int):
+        self.output_dir = Path(output_dir)
+        self.interval = interval
+        self.token_max_age = token_max_age
+        self.serializer = URLSafeTimedSerializer(secret_key=Config.JWT_SECRET, salt="request-profile")
+        # Only touched from the event loop thread, so a flag is enough.
+        self._running = False
+
+    @property
+    def busy(self) -> bool:
+        return self._running
+
+    def create_request_token(self, uid: str) -> str:
+        return self.serializer.dumps({"uid": uid})
+
+    def verify_request_token(self, token: str) -> bool:
+        try:
+            self.serializer.loads(token, max_age=self.token_max_age)
+        except BadSignature:
+            return False
+        return True
+
+    def profile_path(self, profile_id: str) -> Path:
+        path = self.output_dir / f"{profile_id}.speedscope.json"
+        if not PROFILE_ID.match(profile_id) or not path.is_file():
+            raise ProfileNotFound()
+        return path
+
+    def request_profiler(self) -> Profiler:
+        return Profiler(interval=self.interval, async_mode="enabled")
+
+    async def save(self, profiler: Profiler, profile_id: str) -> Path:
+        def write() -> Path:
+            os.makedirs(self.output_dir, exist_ok=True)
+            path = self.output_dir / f"{profile_id}.speedscope.json"
+            path.write_text(profiler.output(SpeedscopeRenderer()))
+            return path
+
+        return await asyncio.to_thread(write)
+
+    async def profile_worker(self, seconds: float) -> Path:
+        if self.busy:
+            raise ProfilerBusy()
+
+        # With async_mode disabled the profiler samples the whole event loop thread,
+        # not just this coroutine.
+        profiler = Profiler(interval=self.interval, async_mode="disabled")
+        try:
+            profiler.start()
+        except RuntimeError:
+            # A request profile is running in this thread.
+            raise ProfilerBusy()
+
+        self._running = True
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+            self._running = False
+
+        return await self.save(profiler, uuid.uuid4().hex)
+
+
+profiler_service = ProfilerService(
+    output_dir=Config.PROFILER_DIR,
+    interval=Config.PROFILER_INTERVAL,
+    token_max_age=Config.PROFILER_TOKEN_MAX_AGE,
+)
@@ -0,0 +1,184 @@
+"""Vectorized reports over `LedgerColumns`. No function here loops over transactions."""
+
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .snapshot import SECONDS_PER_DAY, LedgerColumns
+
+
+def month_index(epoch_seconds: np.ndarray) -> np.ndarray:
+    """Months since 1970-01 for each timestamp (UTC)."""
+    return epoch_seconds.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+
+
+def month_label(index: int) -> str:
+    return str(np.datetime64(int(index), "M"))
+
+
+def current_month(now: Optional[datetime] = None) -> int:
+    now = now or datetime.now(timezone.utc)
+    return (now.year - 1970) * 12 + now.month - 1
+
+
+def to_epoch(day: date) -> int:
+    return int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp())
+
+
+def bucket_sums(buckets: np.ndarray, amounts: np.ndarray, size: int) -> np.ndarray:
+    # bincount weights are float64, which is exact for totals below 2**53 minor units.
+    return np.rint(np.bincount(buckets, weights=amounts, minlength=size)).astype(np.int64)
+
+
+def grouped_quantiles(groups: np.ndarray, values: np.ndarray, size: int, quantiles: Sequence[float]) -> np.ndarray:
+    """Linear-interpolated quantiles of `values` within each group, shape (len(quantiles), size).
+
+    Values are sorted by (group, value) once; each group's quantile positions are then
+    computed from its offset and count, for all groups at once.
+    """
+    # One argsort on a combined (group, value) key is several times faster than lexsort.
+    low_value = values.min() if len(values) else 0
+    span = int(values.max() - low_value) + 1 if len(values) else 1
+    if size * span < 2**62:
+        order = np.argsort(groups.astype(np.int64) * span + (values - low_value))
+    else:
+        order = np.lexsort((values, groups))
+    sorted_values = values[order].astype(np.float64)
+    counts = np.bincount(groups, minlength=size)
+    starts = np.cumsum(counts) - counts
+    present = counts > 0
+
+    result = np.zeros((len(quantiles), size))
+    for row, q in enumerate(quantiles):
+        position = starts[present] + q * (counts[present] - 1)
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        result[row, present] = sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+    return result
+
+
+def category_breakdown(
+    columns: LedgerColumns,
+    currency: str,
+    kind: str = "expense",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> List[Dict]:
+    """Totals, counts, share of the total and median/p90 transaction size per category."""
+    mask = columns.currency_mask(currency) & (columns.is_income == (kind == "income"))
+    if start is not None:
+        mask &= columns.occurred_at >= to_epoch(start)
+    if end is not None:
+        mask &= columns.occurred_at < to_epoch(end) + SECONDS_PER_DAY
+
+    size = len(columns.categories)
+    groups = columns.category[mask]
+    amounts = columns.amount[mask]
+    totals = bucket_sums(groups, amounts, size)
+    counts = np.bincount(groups, minlength=size)
+    p50, p90 = grouped_quantiles(groups, amounts, size, (0.5, 0.9))
+    grand_total = totals.sum()
+
+    present = np.flatnonzero(counts)
+    present = present[np.argsort(-totals[present], kind="stable")]
+    return [
+        {
+            "category": str(columns.categories[code]),
+            "total": int(totals[code]),
+            "count": int(counts[code]),
+            "share": float(totals[code] / grand_total) if grand_total else 0.0,
+            "p50": int(round(p50[code])),
+            "p90": int(round(p90[code])),
+        }
+        for code in present
+    ]
+
+
+def monthly_totals(columns: LedgerColumns, currency: str, months: int, now: Optional[datetime] = None) -> List[Dict]:
+    """Expense and income per month for the last `months` months, with month-over-month deltas."""
+    last = current_month(now)
+    first = last - months + 1
+    # Only rows from roughly the requested range are converted to months.
+    start = int(np.datetime64(first, "M").astype("datetime64[s]").astype(np.int64))
+    mask = columns.currency_mask(currency) & (columns.occurred_at >= start)
+    month = month_index(columns.occurred_at[mask])
+    in_range = month <= last
+
+    offsets = month[in_range] - first
+    is_income = columns.is_income[mask][in_range]
+    amounts = columns.amount[mask][in_range]
+    expense = bucket_sums(offsets[~is_income], amounts[~is_income], months)
+    income = bucket_sums(offsets[is_income], amounts[is_income], months)
+
+    change = np.diff(expense, prepend=0)
+    previous = np.concatenate(([0], expense[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change_pct = np.where(previous > 0, change / previous, np.nan)
+
+    return [
+        {
+            "month": month_label(first + i),
+            "expense_total": int(expense[i]),
+            "income_total": int(income[i]),
+            "net": int(income[i] - expense[i]),
+            "expense_change": None if i == 0 else int(change[i]),
+            "expense_change_pct": None if i == 0 or np.isnan(change_pct[i]) else float(change_pct[i]),
+        }
+        for i in range(months)
+    ]
+
+
+def daily_spending(
+    columns: LedgerColumns, currency: str, days: int, window: int, now: Optional[datetime] = None
+) -> List[Dict]:
+    """Daily expense totals for the last `days` days with a trailing `window`-day moving average."""
+    now = now or datetime.now(timezone.utc)
+    last = int(now.timestamp()) // SECONDS_PER_DAY
+    span = days + window - 1
+    first = last - span + 1
+    day = columns.occurred_at // SECONDS_PER_DAY
+    mask = columns.currency_mask(currency) & ~columns.is_income & (day >= first) & (day <= last)
+
+    totals = bucket_sums(day[mask] - first, columns.amount[mask], span)
+    cumulative = np.concatenate(([0], np.cumsum(totals)))
+    moving_average = (cumulative[window:] - cumulative[:-window]) / window
+
+    return [
+        {
+            "date": str(np.datetime64(int(first + window - 1 + i), "D")),
+            "expense_total": int(totals[window - 1 + i]),
+            "moving_average": float(moving_average[i]),
+        }
+        for i in range(days)
+    ]
+
+
+def spending_forecast(
+    columns: LedgerColumns, currency: str, months_ahead: int, lookback: int, now: Optional[datetime] = None
+) -> Dict:
+    """Project monthly expenses with a least-squares line through the last `lookback` full months."""
+    current = current_month(now)
+    # The current month is still partial, so the history ends with the month before it.
+    history = monthly_totals(columns, currency, lookback + 1, now)[:-1]
+    expense = np.array([month["expense_total"] for month in history], dtype=np.float64)
+
+    observed = np.flatnonzero(expense)
+    if len(observed) >= 2:
+        # Fit from the first month with spending, so an account's empty past does not drag the line down.
+        first = observed[0]
+        slope, intercept = np.polyfit(np.arange(first, lookback), expense[first:], 1)
+    else:
+        slope, intercept = 0.0, float(expense.mean()) if len(expense) else 0.0
+
+    future = np.arange(lookback, lookback + months_ahead)
+    projected = np.clip(slope * future + intercept, 0, None)
+
+    return {
+        "history": [{"month": month["month"], "expense_total": month["expense_total"]} for month in history],
+        "forecast": [
+            {"month": month_label(current + i), "expense_total": int(round(value))} for i, value in enumerate(projected)
+        ],
+        "monthly_trend": float(slope),
+    }
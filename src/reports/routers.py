@@ -0,0 +1,104 @@
+from datetime import date
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth.dependencies import AccessTokenBearer
+from src.config import Config
+from src.db.main import get_session
+from src.misc.responses import resp_model, server_response
+from src.transactions.schemas import normalize_currency
+from src.utils.metrics import TimedRoute
+
+from .analytics import category_breakdown, daily_spending, monthly_totals, spending_forecast
+from .schemas import CategoryBreakdownModel, DailySpendingModel, ForecastModel, MonthlyTotalModel
+from .snapshot import SnapshotStore
+
+report_router = APIRouter(route_class=TimedRoute)
+snapshot_store = SnapshotStore(directory=Config.REPORTS_SNAPSHOT_DIR, max_age=Config.REPORTS_SNAPSHOT_MAX_AGE)
+
+CurrencyQuery = Query(..., min_length=3, max_length=3)
+
+
+@report_router.get(
+    "/categories",
+    status_code=status.HTTP_200_OK,
+    response_model=resp_model(List[CategoryBreakdownModel]),
+)
+async def get_category_breakdown(
+    currency: str = CurrencyQuery,
+    kind: Literal["expense", "income"] = Query("expense"),
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    token_payload: dict = Depends(AccessTokenBearer()),
+    session: AsyncSession = Depends(get_session),
+):
+    columns = await snapshot_store.load(token_payload["user"]["id"], session)
+    data = await run_in_threadpool(category_breakdown, columns, normalize_currency(currency), kind, start, end)
+
+    return server_response(
+        data=[CategoryBreakdownModel(**item) for item in data],
+        message="category breakdown.",
+        data_type=List[CategoryBreakdownModel],
+    )
+
+
+@report_router.get(
+    "/monthly",
+    status_code=status.HTTP_200_OK,
+    response_model=resp_model(List[MonthlyTotalModel]),
+)
+async def get_monthly_totals(
+    currency: str = CurrencyQuery,
+    months: int = Query(12, ge=1, le=120),
+    token_payload: dict = Depends(AccessTokenBearer()),
+    session: AsyncSession = Depends(get_session),
+):
+    columns = await snapshot_store.load(token_payload["user"]["id"], session)
+    data = await run_in_threadpool(monthly_totals, columns, normalize_currency(currency), months)
+
+    return server_response(
+        data=[MonthlyTotalModel(**item) for item in data], message="monthly totals.", data_type=List[MonthlyTotalModel]
+    )
+
+
+@report_router.get(
+    "/daily",
+    status_code=status.HTTP_200_OK,
+    response_model=resp_model(List[DailySpendingModel]),
+)
+async def get_daily_spending(
+    currency: str = CurrencyQuery,
+    days: int = Query(90, ge=1, le=730),
+    window: int = Query(7, ge=1, le=90),
+    token_payload: dict = Depends(AccessTokenBearer()),
+    session: AsyncSession = Depends(get_session),
+):
+    columns = await snapshot_store.load(token_payload["user"]["id"], session)
+    data = await run_in_threadpool(daily_spending, columns, normalize_currency(currency), days, window)
+
+    return server_response(
+        data=[DailySpendingModel(**item) for item in data],
+        message="daily spending.",
+        data_type=List[DailySpendingModel],
+    )
+
+
+@report_router.get(
+    "/forecast",
+    status_code=status.HTTP_200_OK,
+    response_model=resp_model(ForecastModel),
+)
+async def get_spending_forecast(
+    currency: str = CurrencyQuery,
+    months: int = Query(3, ge=1, le=24),
+    lookback: int = Query(12, ge=2, le=60),
+    token_payload: dict = Depends(AccessTokenBearer()),
+    session: AsyncSession = Depends(get_session),
+):
+    columns = await snapshot_store.load(token_payload["user"]["id"], session)
+    data = await run_in_threadpool(spending_forecast, columns, normalize_currency(currency), months, lookback)
+
+    return server_response(data=ForecastModel(**data), message="spending forecast.", data_type=ForecastModel)
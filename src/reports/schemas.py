@@ -0,0 +1,38 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class CategoryBreakdownModel(BaseModel):
+    category: str
+    total: int
+    count: int
+    share: float
+    p50: int
+    p90: int
+
+
+class MonthlyTotalModel(BaseModel):
+    month: str
+    expense_total: int
+    income_total: int
+    net: int
+    expense_change: Optional[int]
+    expense_change_pct: Optional[float]
+
+
+class DailySpendingModel(BaseModel):
+    date: str
+    expense_total: int
+    moving_average: float
+
+
+class MonthAmountModel(BaseModel):
+    month: str
+    expense_total: int
+
+
+class ForecastModel(BaseModel):
+    history: List[MonthAmountModel]
+    forecast: List[MonthAmountModel]
+    monthly_trend: float
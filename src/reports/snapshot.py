@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import BigInteger, cast, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.models import Transaction
+from src.db.redis import get_ledger_version
+from src.utils.metrics import REPORT_SNAPSHOT_LOOKUPS
+
+_HIT = REPORT_SNAPSHOT_LOOKUPS.labels("hit")
+_MISS = REPORT_SNAPSHOT_LOOKUPS.labels("miss")
+_BYPASS = REPORT_SNAPSHOT_LOOKUPS.labels("bypass")
+
+SECONDS_PER_DAY = 86400
+
+
+def encode(values: Tuple[str, ...]) -> Tuple[np.ndarray, np.ndarray]:
+    """Dictionary-encode strings: the distinct values (in order of appearance) and a code per value.
+
+    Much cheaper than `np.unique` on a string array, which has to sort every value.
+    """
+    codes: Dict[str, int] = {}
+    encoded = np.fromiter((codes.setdefault(value, len(codes)) for value in values), dtype=np.int32, count=len(values))
+    return np.array(list(codes), dtype=str), encoded
+
+
+class LedgerColumns:
+    """A user's transactions as parallel NumPy arrays, one entry per transaction.
+
+    `occurred_at` holds UTC epoch seconds, `amount` minor units, and `category`/`currency`
+    hold codes into the `categories`/`currencies` arrays.
+    """
+
+    fields = ("occurred_at", "amount", "is_income", "category", "currency", "categories", "currencies")
+
+    def __init__(
+        self,
+        occurred_at: np.ndarray,
+        amount: np.ndarray,
+        is_income: np.ndarray,
+        category: np.ndarray,
+        currency: np.ndarray,
+        categories: np.ndarray,
+        currencies: np.ndarray,
+    ):
+        self.occurred_at = occurred_at
+        self.amount = amount
+        self.is_income = is_income
+        self.category = category
+        self.currency = currency
+        self.categories = categories
+        self.currencies = currencies
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    @classmethod
+    def from_rows(cls, rows: List[Tuple[int, int, str, str, str]]) -> "LedgerColumns":
+        """Build the columns from `(epoch_seconds, amount, kind, category, currency)` rows."""
+        if not rows:
+            empty = np.array([], dtype=np.int64)
+            return cls(empty, empty, empty.astype(bool), empty, empty, np.array([], dtype=str), np.array([], dtype=str))
+
+        occurred_at, amount, kind, category, currency = zip(*rows)
+        categories, category_codes = encode(category)
+        currencies, currency_codes = encode(currency)
+
+        return cls(
+            occurred_at=np.array(occurred_at, dtype=np.int64),
+            amount=np.array(amount, dtype=np.int64),
+            is_income=np.fromiter((value == "income" for value in kind), dtype=bool, count=len(kind)),
+            category=category_codes,
+            currency=currency_codes,
+            categories=categories,
+            currencies=currencies,
+        )
+
+    def currency_mask(self, currency: str) -> np.ndarray:
+        codes = np.flatnonzero(self.currencies == currency)
+        if len(codes) == 0:
+            return np.zeros(len(self), dtype=bool)
+        return self.currency == codes[0]
+
+    def save(self, path: Path, version: int) -> None:
+        # Written to a uniquely named file next to the target and renamed, so readers never see a
+        # partial file and concurrent writers for the same user never share a temp file.
+        tmp = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.stem}.", suffix=".tmp", delete=False)
+        try:
+            with tmp:
+                np.savez(tmp, version=np.int64(version), **{field: getattr(self, field) for field in self.fields})
+            os.replace(tmp.name, path)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+
+    @classmethod
+    def load(cls, path: Path) -> Tuple["LedgerColumns", int]:
+        with np.load(path, allow_pickle=False) as data:
+            return cls(**{field: data[field] for field in cls.fields}), int(data["version"])
+
+
+async def fetch_rows(user_id: int, session: AsyncSession) -> List[Tuple]:
+    statement = select(
+        cast(func.extract("epoch", Transaction.occurred_at), BigInteger),
+        Transaction.amount,
+        Transaction.kind,
+        Transaction.category,
+        Transaction.currency,
+    ).where(Transaction.user_id == user_id)
+
+    connection = await session.connection()
+    result = await connection.execute(statement)
+    return [tuple(row) for row in result]
+
+
+class SnapshotStore:
+    """Caches each user's `LedgerColumns` in `<directory>/<user_id>.npz`.
+
+    A snapshot is tagged with the ledger version read before the rows were loaded, and is
+    reused only while that version is current (and the file is younger than `max_age`, in
+    case a version bump was lost). Without a version, snapshots are neither read nor written.
+    """
+
+    def __init__(self, directory: str, max_age: int):
+        self.directory = Path(directory)
+        self.max_age = max_age
+
+    def path(self, user_id: int) -> Path:
+        return self.directory / f"{user_id}.npz"
+
+    def read(self, user_id: int, version: int) -> Optional[LedgerColumns]:
+        path = self.path(user_id)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age:
+                return None
+            columns, snapshot_version = LedgerColumns.load(path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        return columns if snapshot_version == version else None
+
+    def write(self, user_id: int, version: int, columns: LedgerColumns) -> None:
+        """Best effort: a failed write only costs a rebuild on the next request."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            columns.save(self.path(user_id), version)
+        except OSError as e:
+            logging.warning(f"Could not write report snapshot for user {user_id}: {e}")
+
+    async def load(self, user_id: int, session: AsyncSession) -> LedgerColumns:
+        version = await get_ledger_version(user_id)
+        if version is None:
+            _BYPASS.inc()
+            return await asyncio.to_thread(LedgerColumns.from_rows, await fetch_rows(user_id, session))
+
+        columns = await asyncio.to_thread(self.read, user_id, version)
+        if columns is not None:
+            _HIT.inc()
+            return columns
+
+        _MISS.inc()
+        columns = await asyncio.to_thread(LedgerColumns.from_rows, await fetch_rows(user_id, session))
+        await asyncio.to_thread(self.write, user_id, version, columns)
+        return columns
@@ -1,11 +1,74 @@
-from celery import Celery
+import asyncio
+import random
+import threading
+from typing import Any, Awaitable, TypeVar
+
+from celery import Celery, Task
+from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_process_shutdown
 
 from src.config import Config
+from src.db.redis import close_redis, init_redis
+
+T = TypeVar("T")
 
 celery_app = Celery(
     "worker",
     broker=f"redis://{Config.REDIS_HOST}:{Config.REDIS_PORT}/1",
     backend=f"redis://{Config.REDIS_HOST}:{Config.REDIS_PORT}/2",
+    include=["src.tasks.email_tasks", "src.tasks.import_tasks", "src.tasks.budget_tasks"],
 )
 
 celery_app.autodiscover_tasks(["src.tasks"])
+
+celery_app.conf.beat_schedule = {
+    # Rollups are maintained incrementally; this only corrects drift (e.g. from manual SQL).
+    "repair-budget-rollups": {"task": "repair_budget_rollups_task", "schedule": crontab(hour=3, minute=30)},
+}
+
+# One event loop per worker thread (a prefork child has exactly one), reused across tasks so
+# connections opened by one task (SMTP, database, Redis) can be reused by the next.
+_worker_state = threading.local()
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    loop = getattr(_worker_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        _worker_state.loop = loop
+
+    return loop
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """Run `coro` to completion on this worker's persistent event loop."""
+    return get_worker_loop().run_until_complete(coro)
+
+
+def close_worker_loop() -> None:
+    loop = getattr(_worker_state, "loop", None)
+    if loop is None or loop.is_closed():
+        return
+
+    loop.run_until_complete(loop.shutdown_asyncgens())
+    loop.close()
+    _worker_state.loop = None
+
+
+def retry_countdown(task: Task, max_delay: int = 300) -> float:
+    """Exponential backoff with jitter: default_retry_delay * 2**retries, capped at `max_delay`."""
+    delay = min(task.default_retry_delay * 2**task.request.retries, max_delay)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+@worker_process_init.connect
+def _open_worker_loop(**kwargs: Any) -> None:
+    # Tasks that write transactions bump the ledger version in Redis.
+    run_async(init_redis())
+
+
+@worker_process_shutdown.connect
+def _close_worker_loop(**kwargs: Any) -> None:
+    run_async(close_redis())
+    close_worker_loop()
@@ -0,0 +1,40 @@
+from typing import Dict, Optional
+
+from sqlmodel import select
+
+from src.budgets.service import BudgetService
+from src.db.main import AsyncSessionMaker
+from src.db.models import User
+from src.tasks import celery_app, run_async
+
+budget_service = BudgetService()
+
+
+async def repair_rollups(user_id: Optional[int] = None, batch_size: int = 500) -> Dict[str, int]:
+    """Recompute the budget rollups of one user, or of every user in id order."""
+    stats = {"users": 0, "fixed": 0, "removed": 0}
+
+    async with AsyncSessionMaker() as session:
+        if user_id is not None:
+            user_ids = [user_id]
+        else:
+            user_ids = list((await session.exec(select(User.id).order_by(User.id).limit(batch_size))).all())
+
+        while user_ids:
+            for id in user_ids:
+                fixed, removed = await budget_service.repair(id, session)
+                stats["users"] += 1
+                stats["fixed"] += fixed
+                stats["removed"] += removed
+
+            if user_id is not None or len(user_ids) < batch_size:
+                break
+            statement = select(User.id).where(User.id > user_ids[-1]).order_by(User.id).limit(batch_size)
+            user_ids = list((await session.exec(statement)).all())
+
+    return stats
+
+
+@celery_app.task(name="repair_budget_rollups_task")
+def repair_budget_rollups_task(user_id: Optional[int] = None):
+    return run_async(repair_rollups(user_id))
@@ -1,30 +1,40 @@
-import asyncio
+from typing import Dict, List
 
-from src.tasks import celery_app
-from src.utils.mail import Mailer
+from src.misc.schemas import EmailTypes
+from src.tasks import celery_app, retry_countdown, run_async
+from src.utils.mail import Mailer, SMTPBatchError
 
 
 @celery_app.task(name="send_email_verification_task", bind=True, max_retries=3, default_retry_delay=5)
-def send_email_verification_task(*args, **kwargs):
-    email = kwargs.get("email") or args[0]
-    first_name = kwargs.get("first_name") or args[1]
-    base_url = kwargs.get("base_url") or args[2]
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+def send_email_verification_task(self, email: str, first_name: str, base_url: str):
     try:
-        loop.run_until_complete(Mailer.send_email_verification(email=email, first_name=first_name, base_url=base_url))
-    finally:
-        loop.close()
+        run_async(Mailer.send_email_verification(email=email, first_name=first_name, base_url=base_url))
+    except Exception as exc:
+        raise self.retry(exc=exc, countdown=retry_countdown(self))
 
 
 @celery_app.task(name="send_password_reset_task", bind=True, max_retries=3, default_retry_delay=5)
-def send_password_reset_task(*args, **kwargs):
-    email = kwargs.get("email") or args[0]
-    first_name = kwargs.get("first_name") or args[1]
-    base_url = kwargs.get("base_url") or args[2]
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+def send_password_reset_task(self, email: str, first_name: str, base_url: str):
     try:
-        loop.run_until_complete(Mailer.send_password_reset(email=email, first_name=first_name, base_url=base_url))
-    finally:
-        loop.close()
+        run_async(Mailer.send_password_reset(email=email, first_name=first_name, base_url=base_url))
+    except Exception as exc:
+        raise self.retry(exc=exc, countdown=retry_countdown(self))
+
+
+@celery_app.task(name="send_email_batch_task", bind=True, max_retries=3, default_retry_delay=5)
+def send_email_batch_task(self, email_type: str, recipients: List[Dict[str, str]], base_url: str):
+    """Send one kind of email (an `EmailTypes` attribute name) to many recipients over one SMTP session.
+
+    Recipients the server refuses for good (5xx) are logged and dropped. If the connection is lost
+    or the server defers a message (4xx), only the recipients not sent or dropped yet are retried.
+    """
+    try:
+        run_async(Mailer.send_batch(getattr(EmailTypes, email_type), recipients, base_url))
+    except SMTPBatchError as exc:
+        done = exc.done
+        unsent = recipients[done:]
+        raise self.retry(
+            exc=exc,
+            countdown=retry_countdown(self),
+            kwargs={"email_type": email_type, "recipients": unsent, "base_url": base_url},
+        )
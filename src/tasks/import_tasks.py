@@ -0,0 +1,19 @@
+from pathlib import Path
+
+from src.tasks import celery_app, run_async
+from src.transactions.importer import import_file
+
+
+@celery_app.task(name="import_transactions_task", bind=True)
+def import_transactions_task(self, user_id: int, path: str, file_format: str, currency: str):
+    """Import a saved statement, reporting progress as a PROGRESS state after every batch."""
+
+    def report(stats):
+        self.update_state(state="PROGRESS", meta={"user_id": user_id, **stats})
+
+    try:
+        stats = run_async(import_file(user_id, Path(path), file_format, currency, on_progress=report))
+    finally:
+        Path(path).unlink(missing_ok=True)
+
+    return {"user_id": user_id, **stats}
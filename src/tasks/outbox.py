@@ -0,0 +1,83 @@
+"""Transactional email outbox.
+
+Request handlers call `enqueue_email` to add a row to `email_outbox` inside their own
+transaction, so an email exists exactly when the change that triggered it was committed, and
+no broker call sits on the request path. A relay process drains the table in batches:
+
+    python -m src.tasks.outbox
+
+Rows are claimed with `SELECT ... FOR UPDATE SKIP LOCKED`, so several relays can run side by
+side. Each batch becomes one `send_email_batch_task` per email type, published over a single
+broker connection, and the rows are deleted in the same transaction. Delivery is at least
+once: if the commit fails after publishing, the batch is sent again.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from sqlmodel import col, delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.config import Config
+from src.db.main import AsyncSessionMaker
+from src.db.models import EmailOutbox
+from src.misc.schemas import EmailType
+from src.tasks import celery_app
+
+
+def enqueue_email(session: AsyncSession, email_type: EmailType, email: str, first_name: str, base_url: str) -> None:
+    """Stage an email on `session`; it is only sent if the session's transaction commits."""
+    session.add(
+        EmailOutbox(
+            email_type=email_type.name,
+            payload={"email": email, "first_name": first_name, "base_url": base_url},
+        )
+    )
+
+
+async def relay_outbox_batch(session: AsyncSession, batch_size: int) -> int:
+    """Publish up to `batch_size` pending emails and delete them. Returns how many were relayed."""
+    statement = select(EmailOutbox).order_by(EmailOutbox.id).limit(batch_size).with_for_update(skip_locked=True)
+    rows = (await session.exec(statement)).all()
+    if not rows:
+        await session.rollback()
+        return 0
+
+    batches: Dict[Tuple[str, str], List[Dict[str, str]]] = defaultdict(list)
+    for row in rows:
+        batches[(row.email_type, row.payload["base_url"])].append(
+            {"email": row.payload["email"], "first_name": row.payload["first_name"]}
+        )
+
+    with celery_app.producer_or_acquire() as producer:
+        for (email_type, base_url), recipients in batches.items():
+            celery_app.send_task(
+                "send_email_batch_task",
+                kwargs={"email_type": email_type, "recipients": recipients, "base_url": base_url},
+                producer=producer,
+            )
+
+    await session.exec(delete(EmailOutbox).where(col(EmailOutbox.id).in_([row.id for row in rows])))
+    await session.commit()
+
+    return len(rows)
+
+
+async def run_relay(batch_size: int = Config.OUTBOX_BATCH_SIZE, poll_interval: float = Config.OUTBOX_POLL_INTERVAL):
+    while True:
+        try:
+            async with AsyncSessionMaker() as session:
+                relayed = await relay_outbox_batch(session, batch_size)
+        except Exception as e:
+            logging.exception(f"Outbox relay failed: {e}")
+            relayed = 0
+
+        # A full batch means there is probably more waiting; otherwise poll again later.
+        if relayed < batch_size:
+            await asyncio.sleep(poll_interval)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_relay())
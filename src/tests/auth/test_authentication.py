@@ -0,0 +1,64 @@
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.auth import revocation
+from src.auth.authentication import Authentication
+from src.auth.schemas import TokenUserModel
+from src.utils.exceptions import InvalidToken
+
+auth_prefix = "/api/v1/auth"
+
+user = TokenUserModel(
+    id=1,
+    uid=uuid.uuid4(),
+    first_name="string",
+    last_name="string",
+    avatar="",
+    email="user@example.com",
+    phone_number="string",
+)
+
+
+class TestAuthentication:
+    def test_decode_token_is_cached(self):
+        token = Authentication.create_token(user)
+        hits = Authentication.verified_tokens.hits
+
+        first = Authentication.decode_token(token)
+        second = Authentication.decode_token(token)
+
+        assert first["user"]["email"] == user.email
+        assert second is first
+        assert Authentication.verified_tokens.hits == hits + 1
+
+    def test_decode_invalid_token(self):
+        with pytest.raises(InvalidToken):
+            Authentication.decode_token("not-a-token")
+
+    def test_access_token_bearer(self, monkeypatch, test_client):
+        monkeypatch.setattr(revocation, "add_jti_to_block_list", AsyncMock())
+        access_token = Authentication.create_token(user)
+        refresh_token = Authentication.create_token(user, refresh=True)
+
+        ok = test_client.get(
+            f"{auth_prefix}/logout", headers={"host": "localhost", "Authorization": f"Bearer {access_token}"}
+        )
+        refresh = test_client.get(
+            f"{auth_prefix}/logout", headers={"host": "localhost", "Authorization": f"Bearer {refresh_token}"}
+        )
+
+        assert ok.status_code == 200
+        assert refresh.status_code == 403
+        assert refresh.json()["error_code"] == "AccessTokenRequired"
+
+    def test_logout_fails_when_revocation_cannot_be_recorded(self, test_client):
+        access_token = Authentication.create_token(user)
+
+        response = test_client.get(
+            f"{auth_prefix}/logout", headers={"host": "localhost", "Authorization": f"Bearer {access_token}"}
+        )
+
+        assert response.status_code == 503
+        assert response.json()["error_code"] == "RevocationUnavailable"
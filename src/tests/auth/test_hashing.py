@@ -0,0 +1,61 @@
+import asyncio
+
+from src.auth.authentication import build_password_context
+from src.auth.hashing import PasswordHasher
+from src.utils.exceptions import HashingPoolSaturated
+
+
+class TestPasswordHasher:
+    def test_hash_and_verify(self):
+        hasher = PasswordHasher(workers=2, max_pending=4)
+
+        async def run():
+            hashed = await hasher.hash("secret")
+            return await hasher.verify("secret", hashed), await hasher.verify("wrong", hashed)
+
+        try:
+            assert asyncio.run(run()) == (True, False)
+            assert hasher.pending == 0
+        finally:
+            hasher.shutdown()
+
+    def test_rejects_when_saturated(self):
+        hasher = PasswordHasher(workers=1, max_pending=1)
+
+        async def run():
+            return await asyncio.gather(hasher.hash("one"), hasher.hash("two"), return_exceptions=True)
+
+        try:
+            first, second = asyncio.run(run())
+            assert isinstance(first, str)
+            assert isinstance(second, HashingPoolSaturated)
+        finally:
+            hasher.shutdown()
+
+
+class TestPasswordContext:
+    def context(self, **overrides):
+        settings = dict(
+            schemes=["argon2", "bcrypt"],
+            argon2_memory_cost=1024,
+            argon2_time_cost=1,
+            argon2_parallelism=1,
+            bcrypt_rounds=4,
+        )
+        settings.update(overrides)
+        return build_password_context(**settings)
+
+    def test_legacy_bcrypt_hash_is_upgraded(self):
+        legacy = build_password_context(["bcrypt"], 0, 0, 0, bcrypt_rounds=4).hash("secret")
+
+        valid, new_hash = self.context().verify_and_update("secret", legacy)
+
+        assert valid is True
+        assert new_hash.startswith("$argon2id$")
+        assert self.context().verify_and_update("wrong", legacy) == (False, None)
+
+    def test_cost_change_needs_update(self):
+        current = self.context().hash("secret")
+
+        assert self.context().verify_and_update("secret", current) == (True, None)
+        assert self.context(argon2_time_cost=2).needs_update(current) is True
@@ -0,0 +1,83 @@
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+
+from src.auth.keys import KeyRing
+from src.utils.exceptions import InvalidToken
+
+auth_prefix = "/api/v1/auth"
+
+
+def write_key(path, kid, public_only=False):
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    if public_only:
+        pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        (path / f"{kid}.pub.pem").write_bytes(pem)
+    else:
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        (path / f"{kid}.pem").write_bytes(pem)
+    return private_key
+
+
+class TestKeyRing:
+    def test_sign_and_verify_with_rotation(self, tmp_path):
+        old_key = write_key(tmp_path, "2025-01")
+        old_ring = KeyRing(algorithm="EdDSA", keys_dir=str(tmp_path), active_kid="2025-01")
+        old_token = jwt.encode({"sub": "1"}, old_ring.signing_key, algorithm="EdDSA", headers=old_ring.headers)
+
+        # Rotate: the old key is kept for verification only.
+        (tmp_path / "2025-01.pem").unlink()
+        (tmp_path / "2025-01.pub.pem").write_bytes(
+            old_key.public_key().public_bytes(
+                serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+            )
+        )
+        write_key(tmp_path, "2025-06")
+        ring = KeyRing(algorithm="EdDSA", keys_dir=str(tmp_path), active_kid="2025-06")
+        new_token = jwt.encode({"sub": "1"}, ring.signing_key, algorithm="EdDSA", headers=ring.headers)
+
+        for token in (old_token, new_token):
+            assert jwt.decode(token, ring.verification_key(token), algorithms=["EdDSA"]) == {"sub": "1"}
+
+        assert {key["kid"] for key in ring._jwks["keys"]} == {"2025-01", "2025-06"}
+        assert all("d" not in key for key in ring._jwks["keys"])
+
+    def test_unknown_kid(self, tmp_path):
+        write_key(tmp_path, "a")
+        ring = KeyRing(algorithm="EdDSA", keys_dir=str(tmp_path), active_kid="a")
+        token = jwt.encode({"sub": "1"}, ring.signing_key, algorithm="EdDSA", headers={"kid": "b"})
+
+        with pytest.raises(InvalidToken):
+            ring.verification_key(token)
+
+    def test_active_kid_needs_private_key(self, tmp_path):
+        write_key(tmp_path, "a", public_only=True)
+
+        with pytest.raises(ValueError):
+            KeyRing(algorithm="EdDSA", keys_dir=str(tmp_path), active_kid="a")
+
+    def test_public_copy_of_a_private_key_is_listed_once(self, tmp_path):
+        private_key = write_key(tmp_path, "a")
+        write_key(tmp_path, "a", public_only=True)
+        ring = KeyRing(algorithm="EdDSA", keys_dir=str(tmp_path), active_kid="a")
+        token = jwt.encode({"sub": "1"}, private_key, algorithm="EdDSA", headers=ring.headers)
+
+        assert [key["kid"] for key in ring._jwks["keys"]] == ["a"]
+        assert jwt.decode(token, ring.verification_key(token), algorithms=["EdDSA"]) == {"sub": "1"}
+
+    def test_jwks_endpoint(self, test_client):
+        response = test_client.get(f"{auth_prefix}/.well-known/jwks.json", headers={"host": "localhost"})
+        cached = test_client.get(
+            f"{auth_prefix}/.well-known/jwks.json",
+            headers={"host": "localhost", "if-none-match": response.headers["etag"]},
+        )
+
+        assert response.status_code == 200
+        assert "max-age" in response.headers["cache-control"]
+        assert response.json() == {"keys": []}
+        assert cached.status_code == 304
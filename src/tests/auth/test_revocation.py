@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from src.auth import revocation
+from src.auth.revocation import RevocationCache
+from src.db import redis
+from src.utils.exceptions import RevocationCheckUnavailable
+
+
+async def redis_down(jti):
+    raise ConnectionError("down")
+
+
+class MGetRedis:
+    def __init__(self, store):
+        self.store = store
+
+    async def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+
+class TestRevocationCache:
+    def test_local_hit(self):
+        cache = RevocationCache(maxsize=10, channel="test", fail_open=True)
+        cache.add("jti", time.time() + 60)
+
+        assert asyncio.run(cache.is_revoked("jti")) is True
+
+    def test_authoritative_miss_skips_redis(self, monkeypatch):
+        monkeypatch.setattr(revocation, "token_in_block_list", redis_down)
+        cache = RevocationCache(maxsize=10, channel="test", fail_open=False)
+        cache._synced = True
+
+        assert asyncio.run(cache.is_revoked("jti")) is False
+
+    def test_fail_open_and_fail_closed(self, monkeypatch):
+        monkeypatch.setattr(revocation, "token_in_block_list", redis_down)
+
+        fail_open = RevocationCache(maxsize=10, channel="test", fail_open=True)
+        assert asyncio.run(fail_open.is_revoked("jti")) is False
+
+        fail_closed = RevocationCache(maxsize=10, channel="test", fail_open=False)
+        with pytest.raises(RevocationCheckUnavailable):
+            asyncio.run(fail_closed.is_revoked("jti"))
+
+    def test_malformed_messages_are_skipped(self):
+        cache = RevocationCache(maxsize=10, channel="test", fail_open=True)
+        exp = int(time.time()) + 60
+
+        for data in (b"no-expiry", b"jti:soon", b":123", b"\xff\xfe:1", None):
+            cache._apply(data)
+        cache._apply(f"jti:{exp}".encode())
+
+        assert asyncio.run(cache.is_revoked("jti")) is True
+        assert len(cache.revoked) == 1
+
+    def test_legacy_bare_keys_are_honoured_during_cut_over(self, monkeypatch):
+        monkeypatch.setattr(redis, "redis_client", MGetRedis({"old-jti": b"", "blocklist:new-jti": b"1"}))
+        jtis = ["old-jti", "new-jti", "other"]
+
+        monkeypatch.setattr(redis.Config, "BLOCKLIST_LEGACY_KEYS", True)
+        assert asyncio.run(redis.tokens_in_block_list(jtis)) == [True, True, False]
+
+        monkeypatch.setattr(redis.Config, "BLOCKLIST_LEGACY_KEYS", False)
+        assert asyncio.run(redis.tokens_in_block_list(jtis)) == [False, True, False]
+
+    def test_legacy_keys_keep_misses_going_to_redis(self):
+        cache = RevocationCache(maxsize=10, channel="test", fail_open=True, legacy_keys=True)
+        cache._synced = True
+
+        assert cache.authoritative is False
@@ -1,3 +1,16 @@
+import asyncio
+import uuid
+from unittest.mock import AsyncMock
+
+from sqlalchemy import create_engine, update
+from sqlmodel import Session, select
+
+from src.auth import service
+from src.auth.authentication import Authentication, build_password_context
+from src.auth.schemas import TokenUserModel
+from src.db.models import User
+from src.users.service import password_hash_swap
+
 auth_prefix = "/api/v1/auth"
 
 
@@ -17,3 +30,135 @@ class TestAuthService:
 
         assert fake_user_service.get_user_by_email_called_once()
         assert fake_user_service.get_user_by_phone_called_once()
+
+    def test_get_current_user_is_cached(self, monkeypatch, test_client):
+        user = User(
+            id=1,
+            uid=uuid.uuid4(),
+            first_name="string",
+            last_name="string",
+            email="user@example.com",
+            phone_number="string",
+            password="hash",
+            avatar="",
+        )
+        calls = []
+
+        async def get_user_by_uid(uid, session):
+            calls.append(uid)
+            return user
+
+        monkeypatch.setattr(service.user_service, "get_user_by_uid", get_user_by_uid)
+        token = Authentication.create_token(TokenUserModel.model_validate(user, from_attributes=True))
+        headers = {"host": "localhost", "Authorization": f"Bearer {token}"}
+
+        first = test_client.get(f"{auth_prefix}/profile", headers=headers)
+        second = test_client.get(f"{auth_prefix}/profile", headers=headers)
+
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content
+        assert first.json()["data"]["uid"] == str(user.uid)
+        assert calls == [user.uid]
+
+    def test_login_unknown_email_is_indistinguishable(self, monkeypatch, test_client):
+        verified = []
+
+        async def get_user_by_email(email, session):
+            return None
+
+        async def verify(password, hash):
+            verified.append(hash)
+            return False
+
+        async def hash_password(password):
+            return "dummy-hash"
+
+        monkeypatch.setattr(service.user_service, "get_user_by_email", get_user_by_email)
+        monkeypatch.setattr(service.password_hasher, "verify", verify)
+        monkeypatch.setattr(service.password_hasher, "hash", hash_password)
+        monkeypatch.setattr(service.AuthService, "_dummy_password_hash", None)
+
+        response = test_client.post(
+            f"{auth_prefix}/login",
+            json={"email": "nobody@example.com", "password": "string"},
+            headers={"host": "localhost"},
+        )
+
+        assert response.status_code == 404
+        assert response.json()["error_code"] == "WrongCredentials"
+        assert verified == ["dummy-hash"]
+
+    def test_login_upgrades_legacy_hash_after_responding(self, monkeypatch, test_client):
+        legacy_hash = build_password_context(["bcrypt"], 0, 0, 0, bcrypt_rounds=4).hash("string")
+        user = User(
+            id=1,
+            uid=uuid.uuid4(),
+            first_name="string",
+            last_name="string",
+            email="user@example.com",
+            phone_number="string",
+            password=legacy_hash,
+            avatar="",
+        )
+        upgrades = []
+
+        async def get_user_by_email(email, session):
+            return user
+
+        async def upgrade_password_hash(self, uid, old_hash, new_hash):
+            upgrades.append((uid, old_hash, new_hash))
+
+        monkeypatch.setattr(service.user_service, "get_user_by_email", get_user_by_email)
+        monkeypatch.setattr(service.AuthService, "upgrade_password_hash", upgrade_password_hash)
+
+        response = test_client.post(
+            f"{auth_prefix}/login",
+            json={"email": "user@example.com", "password": "string"},
+            headers={"host": "localhost"},
+        )
+
+        assert response.status_code == 200
+        [(uid, old_hash, new_hash)] = upgrades
+        assert (uid, old_hash) == (user.uid, legacy_hash)
+        assert Authentication.password_context.identify(new_hash) == Authentication.password_context.default_scheme()
+
+    def test_upgrade_never_overwrites_a_password_change(self):
+        engine = create_engine("sqlite://")
+        User.__table__.create(engine)
+        uid = uuid.uuid4()
+
+        with Session(engine) as session:
+            session.add(
+                User(
+                    uid=uid,
+                    first_name="string",
+                    last_name="string",
+                    email="user@example.com",
+                    phone_number="string",
+                    password="old-hash",
+                )
+            )
+            session.commit()
+
+            # A password reset commits between the login's verify and the background rehash.
+            session.execute(update(User).where(User.uid == uid).values(password="reset-hash"))
+            session.commit()
+            assert session.execute(password_hash_swap(uid, "old-hash", "rehash-of-old")).rowcount == 0
+            session.commit()
+            assert session.exec(select(User.password)).one() == "reset-hash"
+
+            assert session.execute(password_hash_swap(uid, "reset-hash", "rehash-of-reset")).rowcount == 1
+            session.commit()
+            assert session.exec(select(User.password)).one() == "rehash-of-reset"
+
+    def test_upgrade_uses_the_conditional_swap(self, monkeypatch):
+        session = AsyncMock()
+        session.__aenter__.return_value = session
+        replace_password_hash = AsyncMock(return_value=False)
+        monkeypatch.setattr(service, "AsyncSessionMaker", lambda: session)
+        monkeypatch.setattr(service.user_service, "replace_password_hash", replace_password_hash)
+        uid = uuid.uuid4()
+
+        asyncio.run(service.AuthService().upgrade_password_hash(uid, "old-hash", "new-hash"))
+
+        replace_password_hash.assert_awaited_once_with(uid, "old-hash", "new-hash", session)
@@ -0,0 +1,122 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+from src.budgets import routers
+from src.budgets.service import BudgetService, rollup_deltas, rollup_entry, rollup_month
+from src.db.models import BudgetRollup, Transaction
+from src.tasks import budget_tasks
+from src.transactions.service import TransactionService
+
+october = datetime(2026, 10, 18, 12, tzinfo=timezone.utc)
+
+
+def make_transaction(**fields):
+    values = {"id": 1, "user_id": 1, "amount": 500, "currency": "EUR", "category": "food", "occurred_at": october}
+    return Transaction(**{**values, **fields})
+
+
+def fake_session():
+    session = Mock()
+    session.exec = AsyncMock()
+    session.commit = AsyncMock()
+    session.refresh = AsyncMock()
+    session.delete = AsyncMock()
+    return session
+
+
+class TestRollupDeltas:
+    def test_rollup_month_uses_utc(self):
+        assert rollup_month(datetime(2026, 11, 1, 0, 30, tzinfo=timezone(timedelta(hours=2)))) == date(2026, 10, 1)
+
+    def test_nets_entries_per_row(self):
+        food = rollup_entry(make_transaction())
+        salary = rollup_entry(make_transaction(kind="income", category="salary", amount=9000))
+        bigger_food = rollup_entry(make_transaction(amount=700))
+
+        deltas = rollup_deltas(added=[bigger_food, salary], removed=[food])
+
+        assert [
+            (d["category"], d["month"], d["expense_total"], d["income_total"], d["transaction_count"]) for d in deltas
+        ] == [("food", date(2026, 10, 1), 200, 0, 0), ("salary", date(2026, 10, 1), 0, 9000, 1)]
+
+    def test_unchanged_rows_are_skipped(self):
+        entry = rollup_entry(make_transaction())
+
+        assert rollup_deltas(added=[entry], removed=[entry]) == []
+
+
+class TestTransactionWrites:
+    def test_update_moves_amount_between_months(self):
+        session = fake_session()
+        transaction = make_transaction()
+
+        asyncio.run(
+            TransactionService().update_transaction(
+                transaction, {"occurred_at": october - timedelta(days=30), "note": None}, session
+            )
+        )
+
+        statement, params = session.exec.await_args.args[0], session.exec.await_args.kwargs["params"]
+        assert "budget_rollups" in str(statement)
+        assert {(p["month"], p["expense_total"], p["transaction_count"]) for p in params} == {
+            (date(2026, 10, 1), -500, -1),
+            (date(2026, 9, 1), 500, 1),
+        }
+        session.commit.assert_awaited_once()
+
+    def test_delete_subtracts(self):
+        session = fake_session()
+
+        asyncio.run(TransactionService().delete_transaction(make_transaction(), session))
+
+        params = session.exec.await_args.kwargs["params"]
+        assert [(p["expense_total"], p["transaction_count"]) for p in params] == [(-500, -1)]
+
+
+class TestRepairTask:
+    def test_repairs_every_user_in_batches(self, monkeypatch):
+        session = Mock()
+        session.exec = AsyncMock(side_effect=[Mock(all=Mock(return_value=ids)) for ids in ([1, 2], [3], [])])
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=False)
+        repair = AsyncMock(return_value=(1, 0))
+        monkeypatch.setattr(budget_tasks, "AsyncSessionMaker", lambda: session)
+        monkeypatch.setattr(budget_tasks.budget_service, "repair", repair)
+
+        stats = asyncio.run(budget_tasks.repair_rollups(batch_size=2))
+
+        assert stats == {"users": 3, "fixed": 3, "removed": 0}
+        assert [call.args[0] for call in repair.await_args_list] == [1, 2, 3]
+
+
+class TestBudgetRoute:
+    def test_get_month(self, monkeypatch, test_client, auth_headers):
+        rollup = BudgetRollup(
+            user_id=1,
+            month=date(2026, 10, 1),
+            category="food",
+            currency="EUR",
+            expense_total=500,
+            income_total=0,
+            transaction_count=1,
+        )
+        get_month = AsyncMock(return_value=[rollup])
+        monkeypatch.setattr(routers.budget_service, "get_month", get_month)
+
+        response = test_client.get("/api/v1/budgets?month=2026-10", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["data"][0]["expense_total"] == 500
+        assert get_month.await_args.args[:2] == (1, date(2026, 10, 1))
+        assert test_client.get("/api/v1/budgets?month=2026-13", headers=auth_headers).status_code == 422
+
+
+class TestBudgetService:
+    def test_repair_takes_the_exclusive_lock_first(self):
+        session = fake_session()
+        session.exec.side_effect = [None, Mock(one=Mock(return_value=SimpleNamespace(fixed=2, removed=1)))]
+
+        assert asyncio.run(BudgetService().repair(7, session)) == (2, 1)
+        assert "pg_advisory_xact_lock(" in str(session.exec.await_args_list[0].args[0])
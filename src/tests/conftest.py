@@ -1,10 +1,14 @@
+import uuid
 from unittest.mock import Mock
 
 import pytest
 from fastapi.testclient import TestClient
 
 from src import app
-from src.db.main import get_session
+from src.auth.authentication import Authentication
+from src.auth.schemas import TokenUserModel
+from src.db.main import get_read_session, get_session
+from src.utils.ratelimit import local_buckets
 
 mock_session: Mock = Mock()
 mock_auth_service: Mock = Mock()
@@ -16,6 +20,13 @@ def mock_get_session():
 
 
 app.dependency_overrides[get_session] = mock_get_session
+app.dependency_overrides[get_read_session] = mock_get_session
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    yield
+    local_buckets.clear()
 
 
 @pytest.fixture
@@ -36,3 +47,17 @@ def fake_user_service():
 @pytest.fixture
 def test_client():
     return TestClient(app)
+
+
+@pytest.fixture
+def auth_headers():
+    user = TokenUserModel(
+        id=1,
+        uid=uuid.uuid4(),
+        first_name="string",
+        last_name="string",
+        avatar="",
+        email="user@example.com",
+        phone_number="string",
+    )
+    return {"host": "localhost", "Authorization": f"Bearer {Authentication.create_token(user)}"}
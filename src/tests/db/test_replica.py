@@ -0,0 +1,137 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy import create_engine
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.db import main
+from src.db.main import STICKY_COOKIE, PrimarySession, ReplicaMonitor, get_read_session, get_session, is_sticky
+from src.utils.middlewares import ReadYourWritesMiddleware
+
+
+def make_request(cookie: str = None) -> Request:
+    headers = [(b"cookie", f"{STICKY_COOKIE}={cookie}".encode())] if cookie else []
+    return Request({"type": "http", "headers": headers, "state": {}})
+
+
+def session_maker(name: str) -> MagicMock:
+    session = MagicMock(name=name, info={})
+    maker = MagicMock(name=f"{name}_maker")
+    maker.return_value.__aenter__ = AsyncMock(return_value=session)
+    maker.return_value.__aexit__ = AsyncMock(return_value=False)
+    return maker
+
+
+async def open_session(dependency, request: Request):
+    generator = dependency(request)
+    session = await generator.__anext__()
+    await generator.aclose()
+    return session
+
+
+class TestReadRouting:
+    def setup_replica(self, monkeypatch, usable: bool) -> MagicMock:
+        monitor = MagicMock(is_usable=AsyncMock(return_value=usable))
+        monkeypatch.setattr(main, "replica_monitor", monitor)
+        monkeypatch.setattr(main, "ReplicaSessionMaker", session_maker("replica"))
+        monkeypatch.setattr(main, "AsyncSessionMaker", session_maker("primary"))
+        return monitor
+
+    def test_replica_serves_reads_when_healthy(self, monkeypatch):
+        self.setup_replica(monkeypatch, usable=True)
+
+        session = asyncio.run(open_session(get_read_session, make_request()))
+
+        assert session._extract_mock_name() == "replica"
+
+    def test_lagging_replica_falls_back_to_primary(self, monkeypatch):
+        self.setup_replica(monkeypatch, usable=False)
+
+        session = asyncio.run(open_session(get_read_session, make_request()))
+
+        assert session._extract_mock_name() == "primary"
+
+    def test_recent_writer_sticks_to_primary(self, monkeypatch):
+        monitor = self.setup_replica(monkeypatch, usable=True)
+
+        session = asyncio.run(open_session(get_read_session, make_request(cookie=str(int(time.time()) + 60))))
+
+        assert session._extract_mock_name() == "primary"
+        monitor.is_usable.assert_not_called()
+
+    def test_stale_or_garbage_cookie_is_ignored(self):
+        assert is_sticky(make_request(cookie=str(int(time.time()) - 1))) is False
+        assert is_sticky(make_request(cookie="soon")) is False
+
+    def test_commit_marks_request_sticky(self, monkeypatch):
+        self.setup_replica(monkeypatch, usable=True)
+        monkeypatch.setattr(main, "replica_engine", MagicMock())
+        request = make_request()
+
+        async def write():
+            async with asynccontextmanager(get_session)(request) as session:
+                session.info["committed"] = True
+
+        asyncio.run(write())
+
+        assert is_sticky(request) is True
+
+    def test_primary_session_records_commit(self):
+        session = PrimarySession(bind=create_engine("sqlite://"))
+        assert "committed" not in session.info
+
+        session.commit()
+
+        assert session.info["committed"] is True
+
+
+class TestReplicaMonitor:
+    def test_caches_answer_between_checks(self):
+        monitor = ReplicaMonitor(MagicMock(), max_lag=5.0, interval=60.0)
+        monitor._check = AsyncMock(return_value=True)
+
+        async def check_twice():
+            return await monitor.is_usable(), await monitor.is_usable()
+
+        assert asyncio.run(check_twice()) == (True, True)
+        monitor._check.assert_awaited_once()
+
+    def test_unreachable_or_lagging_replica_is_unusable(self):
+        unreachable = MagicMock()
+        unreachable.connect.side_effect = OSError("connection refused")
+        assert asyncio.run(ReplicaMonitor(unreachable, max_lag=5.0, interval=0)._check()) is False
+
+        connection = MagicMock(execute=AsyncMock(return_value=MagicMock(scalar=MagicMock(return_value=30.0))))
+        lagging = MagicMock()
+        lagging.connect.return_value.__aenter__ = AsyncMock(return_value=connection)
+        lagging.connect.return_value.__aexit__ = AsyncMock(return_value=False)
+        assert asyncio.run(ReplicaMonitor(lagging, max_lag=5.0, interval=0)._check()) is False
+
+
+class TestReadYourWritesMiddleware:
+    def client(self) -> TestClient:
+        async def write(request: Request):
+            request.state.primary_until = 1234
+            return PlainTextResponse("ok")
+
+        async def read(request: Request):
+            return PlainTextResponse("ok")
+
+        app = Starlette(routes=[Route("/write", write, methods=["POST"]), Route("/read", read)])
+        app.add_middleware(ReadYourWritesMiddleware, max_age=15)
+        return TestClient(app)
+
+    def test_sets_cookie_after_write_only(self):
+        client = self.client()
+
+        written = client.post("/write")
+        assert written.headers["set-cookie"].startswith(f"{STICKY_COOKIE}=1234; Max-Age=15")
+
+        read = client.get("/read")
+        assert "set-cookie" not in read.headers
@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.auth.dependencies import RoleChecker
+from src.profiler.middleware import RequestProfilerMiddleware
+from src.profiler.service import ProfilerService, profiler_service
+from src.utils.exceptions import InsufficientPermission, ProfileNotFound, ProfilerBusy
+
+
+def token_payload(role):
+    return {"user": {"uid": "1", "role": role}, "refresh": False}
+
+
+class TestRoleChecker:
+    def test_allows_and_rejects_roles(self):
+        checker = RoleChecker(["admin"])
+
+        assert checker(token_payload("admin")) == token_payload("admin")
+        with pytest.raises(InsufficientPermission):
+            checker(token_payload("user"))
+        with pytest.raises(InsufficientPermission):
+            checker({"user": {"uid": "1"}, "refresh": False})
+
+
+class TestProfilerService:
+    def test_request_token(self, tmp_path):
+        service = ProfilerService(output_dir=str(tmp_path), interval=0.001, token_max_age=60)
+
+        assert service.verify_request_token(service.create_request_token("1"))
+        assert not service.verify_request_token("forged")
+
+    def test_profile_worker(self, tmp_path):
+        service = ProfilerService(output_dir=str(tmp_path), interval=0.001, token_max_age=60)
+
+        async def profile_twice():
+            first = asyncio.create_task(service.profile_worker(0.05))
+            await asyncio.sleep(0)
+            with pytest.raises(ProfilerBusy):
+                await service.profile_worker(0.05)
+            return await first
+
+        path = asyncio.run(profile_twice())
+
+        assert "speedscope" in json.loads(path.read_text())["$schema"]
+        assert service.profile_path(path.name.split(".")[0]) == path
+        with pytest.raises(ProfileNotFound):
+            service.profile_path("../../etc/passwd")
+
+
+class TestRequestProfilerMiddleware:
+    def test_profiles_signed_requests_only(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(profiler_service, "output_dir", tmp_path)
+        app = FastAPI()
+        app.add_middleware(RequestProfilerMiddleware)
+
+        @app.get("/ping")
+        async def ping():
+            return {"ok": True}
+
+        client = TestClient(app)
+
+        assert "X-Profile-Id" not in client.get("/ping").headers
+        assert "X-Profile-Id" not in client.get("/ping", headers={"X-Profile": "forged"}).headers
+
+        response = client.get("/ping", headers={"X-Profile": profiler_service.create_request_token("1")})
+        profile_id = response.headers["X-Profile-Id"]
+
+        assert response.json() == {"ok": True}
+        assert profiler_service.profile_path(profile_id).is_file()
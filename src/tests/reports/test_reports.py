@@ -0,0 +1,145 @@
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+
+from src.reports import analytics, routers, snapshot
+from src.reports.snapshot import LedgerColumns, SnapshotStore
+
+now = datetime(2026, 10, 18, 12, tzinfo=timezone.utc)
+
+
+def row(days_ago, amount, kind="expense", category="food", currency="EUR"):
+    return (int((now - timedelta(days=days_ago)).timestamp()), amount, kind, category, currency)
+
+
+def random_rows(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        row(int(days), int(amount), kind, category, currency)
+        for days, amount, kind, category, currency in zip(
+            rng.integers(0, 400, count),
+            rng.integers(1, 10_000, count),
+            rng.choice(["expense", "income"], count, p=[0.9, 0.1]),
+            rng.choice(["food", "rent", "travel", "fun"], count),
+            rng.choice(["EUR", "USD"], count, p=[0.8, 0.2]),
+        )
+    ]
+
+
+class TestAnalytics:
+    def test_category_breakdown_matches_python(self):
+        rows = random_rows(2000)
+        totals, amounts = defaultdict(int), defaultdict(list)
+        for _, amount, kind, category, currency in rows:
+            if kind == "expense" and currency == "EUR":
+                totals[category] += amount
+                amounts[category].append(amount)
+
+        result = analytics.category_breakdown(LedgerColumns.from_rows(rows), "EUR")
+
+        assert [r["category"] for r in result] == sorted(totals, key=totals.get, reverse=True)
+        for r in result:
+            assert r["total"] == totals[r["category"]]
+            assert r["count"] == len(amounts[r["category"]])
+            assert r["p50"] == round(np.percentile(amounts[r["category"]], 50))
+            assert r["p90"] == round(np.percentile(amounts[r["category"]], 90))
+        assert sum(r["share"] for r in result) == pytest.approx(1)
+
+    def test_monthly_totals(self):
+        rows = [row(0, 300), row(40, 100), row(40, 500, "income"), row(45, 50, currency="USD")]
+
+        result = analytics.monthly_totals(LedgerColumns.from_rows(rows), "EUR", 3, now)
+
+        assert [(m["month"], m["expense_total"], m["income_total"]) for m in result] == [
+            ("2026-08", 0, 0),
+            ("2026-09", 100, 500),
+            ("2026-10", 300, 0),
+        ]
+        assert result[1]["expense_change_pct"] is None
+        assert (result[2]["expense_change"], result[2]["expense_change_pct"]) == (200, 2.0)
+
+    def test_daily_moving_average(self):
+        rows = [row(0, 70), row(1, 140), row(6, 7), row(7, 1000)]
+
+        result = analytics.daily_spending(LedgerColumns.from_rows(rows), "EUR", days=2, window=7, now=now)
+
+        assert [(d["date"], d["expense_total"]) for d in result] == [("2026-10-17", 140), ("2026-10-18", 70)]
+        assert [d["moving_average"] for d in result] == [(1000 + 7 + 140) / 7, (7 + 140 + 70) / 7]
+
+    def test_forecast_follows_trend(self):
+        rows = [row(31 * months_ago, 1000 - 100 * months_ago) for months_ago in range(1, 7)]
+
+        result = analytics.spending_forecast(LedgerColumns.from_rows(rows), "EUR", 2, 12, now)
+
+        assert [m["month"] for m in result["forecast"]] == ["2026-10", "2026-11"]
+        assert result["monthly_trend"] == pytest.approx(100, rel=0.05)
+        assert result["forecast"][0]["expense_total"] > result["history"][-1]["expense_total"]
+
+    def test_empty_ledger(self):
+        columns = LedgerColumns.from_rows([])
+
+        assert analytics.category_breakdown(columns, "EUR") == []
+        assert analytics.spending_forecast(columns, "EUR", 1, 3, now)["forecast"][0]["expense_total"] == 0
+
+
+class TestSnapshotStore:
+    def test_reuses_snapshot_for_current_version(self, tmp_path, monkeypatch):
+        store = SnapshotStore(str(tmp_path), max_age=60)
+        version = AsyncMock(return_value=3)
+        fetch_rows = AsyncMock(return_value=[row(0, 100)])
+        monkeypatch.setattr(snapshot, "get_ledger_version", version)
+        monkeypatch.setattr(snapshot, "fetch_rows", fetch_rows)
+
+        first = asyncio.run(store.load(1, None))
+        second = asyncio.run(store.load(1, None))
+        version.return_value = 4
+        asyncio.run(store.load(1, None))
+
+        assert fetch_rows.await_count == 2
+        assert second.amount.tolist() == first.amount.tolist() == [100]
+        assert list(second.categories) == ["food"]
+
+    def test_bypass_without_version(self, tmp_path, monkeypatch):
+        store = SnapshotStore(str(tmp_path), max_age=60)
+        monkeypatch.setattr(snapshot, "get_ledger_version", AsyncMock(return_value=None))
+        monkeypatch.setattr(snapshot, "fetch_rows", AsyncMock(return_value=[]))
+
+        assert len(asyncio.run(store.load(1, None))) == 0
+        assert list(tmp_path.iterdir()) == []
+
+    def test_concurrent_writes_for_one_user(self, tmp_path):
+        store = SnapshotStore(str(tmp_path), max_age=60)
+        columns = LedgerColumns.from_rows([row(0, 100)] * 1000)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda version: columns.save(store.path(1), version), range(20)))
+
+        assert [path.name for path in tmp_path.iterdir()] == ["1.npz"]
+        assert store.read(1, LedgerColumns.load(store.path(1))[1]) is not None
+
+    def test_failed_write_still_serves_columns(self, tmp_path, monkeypatch):
+        store = SnapshotStore(str(tmp_path), max_age=60)
+        monkeypatch.setattr(snapshot, "get_ledger_version", AsyncMock(return_value=1))
+        monkeypatch.setattr(snapshot, "fetch_rows", AsyncMock(return_value=[row(0, 100)]))
+        monkeypatch.setattr(LedgerColumns, "save", Mock(side_effect=OSError("disk full")))
+
+        assert asyncio.run(store.load(1, None)).amount.tolist() == [100]
+
+
+class TestReportRoutes:
+    def test_categories(self, monkeypatch, test_client, auth_headers):
+        load = AsyncMock(return_value=LedgerColumns.from_rows([row(0, 100), row(1, 300, category="rent")]))
+        monkeypatch.setattr(routers.snapshot_store, "load", load)
+
+        response = test_client.get(
+            f"/api/v1/reports/categories?currency=eur&start={date.today()}", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert load.await_args.args[0] == 1
+        assert isinstance(response.json()["data"], list)
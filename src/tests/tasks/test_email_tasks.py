@@ -0,0 +1,34 @@
+from src.tasks import email_tasks
+from src.tasks.email_tasks import send_email_verification_task
+
+
+class TestEmailTasks:
+    def test_retries_until_sent(self, monkeypatch):
+        calls = []
+
+        async def flaky_send(email, first_name, base_url):
+            calls.append(email)
+            if len(calls) < 3:
+                raise ConnectionError("SMTP unavailable")
+
+        monkeypatch.setattr(email_tasks.Mailer, "send_email_verification", flaky_send)
+
+        result = send_email_verification_task.apply(
+            kwargs={"email": "user@example.com", "first_name": "string", "base_url": "http://localhost/"}
+        )
+
+        assert result.successful()
+        assert len(calls) == 3
+
+    def test_gives_up_after_max_retries(self, monkeypatch):
+        async def failing_send(email, first_name, base_url):
+            raise ConnectionError("SMTP unavailable")
+
+        monkeypatch.setattr(email_tasks.Mailer, "send_email_verification", failing_send)
+
+        result = send_email_verification_task.apply(
+            kwargs={"email": "user@example.com", "first_name": "string", "base_url": "http://localhost/"}
+        )
+
+        assert result.failed()
+        assert isinstance(result.result, ConnectionError)
@@ -0,0 +1,64 @@
+import asyncio
+from contextlib import contextmanager
+from unittest.mock import AsyncMock, Mock
+
+from src.db.models import EmailOutbox
+from src.misc.schemas import EmailTypes
+from src.tasks import outbox
+
+
+def fake_session(rows):
+    result = Mock()
+    result.all.return_value = rows
+
+    session = Mock()
+    session.exec = AsyncMock(return_value=result)
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    return session
+
+
+def pending(id, email, email_type="EMAIL_VERIFICATION", base_url="http://localhost/"):
+    return EmailOutbox(
+        id=id, email_type=email_type, payload={"email": email, "first_name": "string", "base_url": base_url}
+    )
+
+
+class TestOutbox:
+    def test_enqueue_email(self):
+        session = Mock()
+
+        outbox.enqueue_email(session, EmailTypes.PWD_RESET, "user@example.com", "string", "http://localhost/")
+
+        row = session.add.call_args.args[0]
+        assert row.email_type == "PWD_RESET"
+        assert row.payload == {"email": "user@example.com", "first_name": "string", "base_url": "http://localhost/"}
+
+    def test_relay_groups_rows_into_batch_tasks(self, monkeypatch):
+        sent = []
+
+        @contextmanager
+        def producer_or_acquire():
+            yield "producer"
+
+        monkeypatch.setattr(outbox.celery_app, "producer_or_acquire", producer_or_acquire)
+        monkeypatch.setattr(outbox.celery_app, "send_task", lambda name, kwargs, producer: sent.append(kwargs))
+        session = fake_session(
+            [pending(1, "a@example.com"), pending(2, "b@example.com"), pending(3, "c@example.com", "PWD_RESET")]
+        )
+
+        relayed = asyncio.run(outbox.relay_outbox_batch(session, batch_size=10))
+
+        assert relayed == 3
+        assert [(task["email_type"], len(task["recipients"])) for task in sent] == [
+            ("EMAIL_VERIFICATION", 2),
+            ("PWD_RESET", 1),
+        ]
+        assert session.exec.await_count == 2
+        session.commit.assert_awaited_once()
+
+    def test_relay_with_nothing_pending(self):
+        session = fake_session([])
+
+        assert asyncio.run(outbox.relay_outbox_batch(session, batch_size=10)) == 0
+        session.commit.assert_not_awaited()
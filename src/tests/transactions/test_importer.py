@@ -0,0 +1,185 @@
+import io
+from collections import Counter
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from src.tasks import import_tasks
+from src.tasks.import_tasks import import_transactions_task
+from src.transactions import importer, routers
+from src.utils.exceptions import ImportTooLarge, UnsupportedImportFormat
+
+CSV = """Date,Description,Amount,Category
+2026-10-01,Coffee,-3.50,Food
+2026-10-01,Coffee,-3.50,Food
+2026-10-02,Salary,"2,500.00",
+not a date,Broken,-1.00,Food
+2026-10-03,No amount,,Food
+"""
+
+OFX = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><CURDEF>EUR
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20261001120000[0:GMT]<TRNAMT>-12.34<FITID>A1<NAME>Groceries
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT</TRNTYPE><DTPOSTED>20261002</DTPOSTED><TRNAMT>100</TRNAMT><FITID>A2</FITID>
+<MEMO>Refund</MEMO></STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def parse(rows, batch_size=2):
+    transactions, invalid, seen = [], 0, Counter()
+    for batch in importer.batched(rows, batch_size):
+        valid, raw_rows = importer.validate_batch(batch)
+        invalid += len(batch) - len(valid)
+        transactions += zip(valid, importer.content_hashes(valid, raw_rows, seen))
+    return transactions, invalid
+
+
+class TestImporter:
+    def test_csv(self, tmp_path):
+        path = tmp_path / "statement.csv"
+        path.write_text(CSV)
+
+        transactions, invalid = parse(importer.iter_csv_rows(path, "USD"))
+
+        assert invalid == 2
+        assert [(t.amount, t.kind, t.category, t.currency) for t, _ in transactions] == [
+            (350, "expense", "food", "USD"),
+            (350, "expense", "food", "USD"),
+            (250000, "income", "uncategorized", "USD"),
+        ]
+        # Identical rows in one file stay distinct, and re-reading the file yields the same hashes.
+        assert len({content_hash for _, content_hash in transactions}) == 3
+        assert [h for _, h in parse(importer.iter_csv_rows(path, "USD"))[0]] == [h for _, h in transactions]
+
+    @pytest.mark.parametrize("value", ["NaN", "-Infinity", "sNaN", "1e30", "-92233720368547758.08"])
+    def test_non_finite_and_out_of_range_amounts_are_invalid(self, value):
+        assert importer.signed_amount(value)[0] is None
+
+    def test_bad_amounts_only_invalidate_their_rows(self, tmp_path):
+        path = tmp_path / "statement.csv"
+        path.write_text("Date,Amount\n2026-10-01,NaN\n2026-10-01,Infinity\n2026-10-01,1e30\n2026-10-02,-1.25\n")
+
+        transactions, invalid = parse(importer.iter_csv_rows(path, "USD"))
+
+        assert invalid == 3
+        assert [(t.amount, t.kind) for t, _ in transactions] == [(125, "expense")]
+
+    def test_ofx_across_chunks(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(importer, "CHUNK_SIZE", 7)
+        path = tmp_path / "statement.ofx"
+        path.write_text(OFX)
+
+        transactions, invalid = parse(importer.iter_ofx_rows(path, "USD"))
+
+        assert invalid == 0
+        assert [(t.amount, t.kind, t.currency, t.note, t.occurred_at.day) for t, _ in transactions] == [
+            (1234, "expense", "EUR", "Groceries", 1),
+            (10000, "income", "EUR", "Refund", 2),
+        ]
+
+    def test_import_format(self):
+        assert importer.import_format("Statement.QFX") == "ofx"
+        with pytest.raises(UnsupportedImportFormat):
+            importer.import_format("statement.pdf")
+
+    def test_save_upload_limit(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(importer.Config, "IMPORT_DIR", str(tmp_path))
+        monkeypatch.setattr(importer.Config, "IMPORT_MAX_BYTES", 10)
+
+        assert importer.save_upload(io.BytesIO(b"a,b\n"), "csv").read_bytes() == b"a,b\n"
+        with pytest.raises(ImportTooLarge):
+            importer.save_upload(io.BytesIO(b"x" * 11), "csv")
+        assert len(list(tmp_path.iterdir())) == 1
+
+
+class TestImportTask:
+    def test_reports_progress_and_removes_file(self, tmp_path, monkeypatch):
+        path = tmp_path / "statement.csv"
+        path.write_text(CSV)
+        states = []
+
+        async def import_file(user_id, path, file_format, currency, on_progress):
+            on_progress({"processed": 5})
+            return {"processed": 5}
+
+        monkeypatch.setattr(import_tasks, "import_file", import_file)
+        monkeypatch.setattr(import_transactions_task, "update_state", lambda **kwargs: states.append(kwargs))
+
+        result = import_transactions_task.apply(
+            kwargs={"user_id": 1, "path": str(path), "file_format": "csv", "currency": "USD"}
+        )
+
+        assert result.result == {"user_id": 1, "processed": 5}
+        assert states == [{"state": "PROGRESS", "meta": {"user_id": 1, "processed": 5}}]
+        assert not path.exists()
+
+
+@pytest.fixture
+def import_owners(monkeypatch):
+    owners = {}
+
+    async def set_import_owner(task_id, user_id):
+        owners[task_id] = user_id
+
+    async def get_import_owner(task_id):
+        return owners.get(task_id)
+
+    monkeypatch.setattr(routers, "set_import_owner", set_import_owner)
+    monkeypatch.setattr(routers, "get_import_owner", get_import_owner)
+    return owners
+
+
+class TestImportRoute:
+    def test_upload_starts_task(self, tmp_path, monkeypatch, import_owners, test_client, auth_headers):
+        monkeypatch.setattr(importer.Config, "IMPORT_DIR", str(tmp_path))
+        apply_async = Mock()
+        monkeypatch.setattr(routers.import_transactions_task, "apply_async", apply_async)
+
+        response = test_client.post(
+            "/api/v1/transactions/import",
+            files={"file": ("statement.csv", CSV.encode(), "text/csv")},
+            data={"currency": "usd"},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 202
+        task_id = response.json()["data"]["task_id"]
+        assert import_owners == {task_id: 1}
+        assert apply_async.call_args.kwargs["task_id"] == task_id
+        kwargs = apply_async.call_args.kwargs["kwargs"]
+        assert kwargs["currency"] == "USD"
+        assert Path(kwargs["path"]).read_text() == CSV
+
+    def test_status_is_only_shown_to_the_owner(self, monkeypatch, import_owners, test_client, auth_headers):
+        monkeypatch.setattr(routers, "AsyncResult", lambda task_id, app: Mock(state="PENDING", info=None))
+        import_owners["mine"] = 1
+        import_owners["theirs"] = 2
+
+        response = test_client.get("/api/v1/transactions/import/mine", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["data"] == {"state": "PENDING", "progress": None}
+        # Not started yet, so Celery knows nothing that would reveal the owner.
+        assert test_client.get("/api/v1/transactions/import/theirs", headers=auth_headers).status_code == 404
+        assert test_client.get("/api/v1/transactions/import/unknown", headers=auth_headers).status_code == 404
+
+    def test_oversized_upload_is_refused_before_it_is_saved(self, tmp_path, monkeypatch, test_client, auth_headers):
+        monkeypatch.setattr(importer.Config, "IMPORT_DIR", str(tmp_path))
+        monkeypatch.setattr(routers, "save_upload", Mock())
+        monkeypatch.setattr(routers.import_transactions_task, "apply_async", Mock())
+        size = importer.Config.IMPORT_MAX_BYTES + 128 * 1024
+
+        response = test_client.post(
+            "/api/v1/transactions/import",
+            files={"file": ("statement.csv", io.BytesIO(b"x" * size), "text/csv")},
+            data={"currency": "usd"},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 413
+        assert response.json()["error_code"] == "ImportTooLarge"
+        routers.save_upload.assert_not_called()
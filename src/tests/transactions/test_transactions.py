@@ -0,0 +1,140 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.db.models import Transaction
+from src.transactions import routers
+from src.transactions.service import TransactionService, decode_cursor, encode_cursor
+from src.utils.exceptions import InvalidCursor
+
+transactions_prefix = "/api/v1/transactions"
+now = datetime(2026, 10, 18, 12, tzinfo=timezone.utc)
+
+
+def make_transaction(id, **fields):
+    return Transaction(
+        id=id,
+        user_id=1,
+        amount=1250,
+        currency="EUR",
+        category="groceries",
+        occurred_at=now - timedelta(hours=id),
+        created_at=now,
+        updated_at=now,
+        **fields,
+    )
+
+
+def fake_session(rows):
+    result = Mock()
+    result.all.return_value = rows
+
+    session = Mock()
+    session.exec = AsyncMock(return_value=result)
+    return session
+
+
+class TestCursor:
+    def test_round_trip(self):
+        transaction = make_transaction(3)
+
+        assert decode_cursor(encode_cursor(transaction)) == (transaction.occurred_at, 3)
+
+    @pytest.mark.parametrize("cursor", ["", "not-base64!", "bm90LWEtY3Vyc29y"])
+    def test_invalid(self, cursor):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor)
+
+
+class TestTransactionService:
+    def test_list_has_more(self):
+        rows = [make_transaction(id) for id in range(1, 4)]
+
+        transactions, next_cursor = asyncio.run(TransactionService().list_transactions(1, fake_session(rows), limit=2))
+
+        assert transactions == rows[:2]
+        assert decode_cursor(next_cursor) == (rows[1].occurred_at, 2)
+
+    def test_list_last_page(self):
+        rows = [make_transaction(id) for id in range(1, 3)]
+        session = fake_session(rows)
+
+        transactions, next_cursor = asyncio.run(
+            TransactionService().list_transactions(1, session, limit=2, cursor=encode_cursor(make_transaction(0)))
+        )
+
+        assert transactions == rows
+        assert next_cursor is None
+        assert "(transactions.occurred_at, transactions.id) <" in str(session.exec.await_args.args[0])
+
+    def test_get_for_update_locks_the_row(self):
+        session = Mock()
+        session.exec = AsyncMock(return_value=Mock(first=Mock(return_value=make_transaction(1))))
+        service = TransactionService()
+
+        asyncio.run(service.get_transaction(1, uuid.uuid4(), session))
+        assert "FOR UPDATE" not in str(session.exec.await_args.args[0])
+
+        asyncio.run(service.get_transaction(1, uuid.uuid4(), session, for_update=True))
+        assert "FOR UPDATE" in str(session.exec.await_args.args[0])
+
+
+class TestTransactionRoutes:
+    def test_create_transaction(self, monkeypatch, test_client, auth_headers):
+        create_transaction = AsyncMock(return_value=make_transaction(1, uid=uuid.uuid4(), note="lunch"))
+        monkeypatch.setattr(routers.transaction_service, "create_transaction", create_transaction)
+
+        response = test_client.post(
+            transactions_prefix,
+            json={"amount": 1250, "currency": "eur", "category": " Groceries ", "occurred_at": "2026-10-18T11:00:00"},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 201
+        assert response.json()["data"]["amount"] == 1250
+        user_id, data, _ = create_transaction.await_args.args
+        assert user_id == 1
+        assert data["currency"] == "EUR"
+        assert data["category"] == "groceries"
+        assert data["occurred_at"].tzinfo is not None
+
+    def test_amount_above_cap_is_rejected(self, monkeypatch, test_client, auth_headers):
+        create_transaction = AsyncMock()
+        monkeypatch.setattr(routers.transaction_service, "create_transaction", create_transaction)
+
+        response = test_client.post(
+            transactions_prefix,
+            json={"amount": 2**63, "currency": "EUR", "category": "rent", "occurred_at": "2026-10-18T11:00:00"},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 422
+        create_transaction.assert_not_awaited()
+
+    def test_list_transactions(self, monkeypatch, test_client, auth_headers):
+        rows = [make_transaction(1, uid=uuid.uuid4())]
+        list_transactions = AsyncMock(return_value=(rows, "next"))
+        monkeypatch.setattr(routers.transaction_service, "list_transactions", list_transactions)
+
+        response = test_client.get(f"{transactions_prefix}?limit=1", headers=auth_headers)
+        data = response.json()["data"]
+
+        assert response.status_code == 200
+        assert data["pagination"] == {"limit": 1, "next_cursor": "next", "has_more": True}
+        assert data["result"][0]["uid"] == str(rows[0].uid)
+
+    def test_writes_load_the_row_for_update(self, monkeypatch, test_client, auth_headers):
+        get_transaction = AsyncMock(return_value=make_transaction(1, uid=uuid.uuid4()))
+        monkeypatch.setattr(routers.transaction_service, "get_transaction", get_transaction)
+        monkeypatch.setattr(routers.transaction_service, "delete_transaction", AsyncMock())
+
+        response = test_client.delete(f"{transactions_prefix}/{uuid.uuid4()}", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert get_transaction.await_args.kwargs == {"for_update": True}
+
+    def test_requires_token(self, test_client):
+        assert test_client.get(transactions_prefix, headers={"host": "localhost"}).status_code == 403
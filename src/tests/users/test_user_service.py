@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.users.service import UserService
+from src.utils.exceptions import UserEmailExists, UserPhoneNumberExists
+
+user_data = {
+    "first_name": "string",
+    "last_name": "string",
+    "email": "user@example.com",
+    "phone_number": "string",
+    "password": "hash",
+}
+
+
+def fake_session(id=None, email_taken=False, phone_taken=False):
+    result = Mock()
+    result.one.return_value = SimpleNamespace(id=id, email_taken=email_taken, phone_taken=phone_taken)
+
+    session = Mock()
+    session.exec = AsyncMock(return_value=result)
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    return session
+
+
+class TestUserService:
+    def test_create_user(self):
+        session = fake_session(id=7)
+
+        user = asyncio.run(UserService().create_user(dict(user_data), session))
+
+        assert user.id == 7
+        session.exec.assert_awaited_once()
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.parametrize(
+        "email_taken, phone_taken, error",
+        [
+            (True, False, UserEmailExists),
+            (False, True, UserPhoneNumberExists),
+            (True, True, UserEmailExists),
+            # Lost a race with a row our snapshot cannot see yet.
+            (False, False, UserEmailExists),
+        ],
+    )
+    def test_create_user_reports_conflict(self, email_taken, phone_taken, error):
+        session = fake_session(email_taken=email_taken, phone_taken=phone_taken)
+
+        with pytest.raises(error):
+            asyncio.run(UserService().create_user(dict(user_data), session))
+
+        session.rollback.assert_awaited_once()
+        session.commit.assert_not_awaited()
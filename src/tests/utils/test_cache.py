@@ -0,0 +1,35 @@
+import time
+
+from src.utils.cache import TTLCache
+
+
+class TestTTLCache:
+    def test_get_and_expiry(self):
+        cache = TTLCache(maxsize=10)
+        cache.set("live", 1, time.time() + 60)
+        cache.set("expired", 2, time.time() - 1)
+
+        assert cache.get("live") == 1
+        assert cache.get("expired") is None
+        assert cache.get("missing", "default") == "default"
+        assert (cache.hits, cache.misses) == (1, 2)
+        assert len(cache) == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2)
+        expires_at = time.time() + 60
+        cache.set("a", 1, expires_at)
+        cache.set("b", 2, expires_at)
+        cache.get("a")
+        cache.set("c", 3, expires_at)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.evictions == 1
+
+    def test_expired_entries_are_not_counted_as_evictions(self):
+        cache = TTLCache(maxsize=1)
+        cache.set("old", 1, time.time() - 1)
+        cache.set("new", 2, time.time() + 60)
+
+        assert cache.evictions == 0
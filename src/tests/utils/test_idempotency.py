@@ -0,0 +1,149 @@
+import json
+
+import pytest
+from fastapi import status
+
+from src.auth import routers
+from src.config import Config
+from src.misc.responses import server_response
+from src.utils import idempotency
+from src.utils.exceptions import UserEmailExists
+from src.utils.ratelimit import Rate, local_buckets
+
+auth_prefix = "/api/v1/auth"
+register_json = {
+    "first_name": "string",
+    "last_name": "string",
+    "email": "user@example.com",
+    "phone_number": "string",
+    "password": "string",
+}
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def set(self, name, value, nx=False, ex=None):
+        if nx and name in self.store:
+            return None
+        self.store[name] = (value.encode() if isinstance(value, str) else value, ex)
+        return True
+
+    async def get(self, name):
+        entry = self.store.get(name)
+        return entry[0] if entry else None
+
+    async def delete(self, name):
+        self.store.pop(name, None)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(idempotency, "get_redis", lambda: redis)
+    return redis
+
+
+@pytest.fixture
+def create_user_calls(monkeypatch):
+    calls = []
+
+    async def create_user(user_data, session):
+        calls.append(user_data.email)
+        return server_response(data=True, message="Account created!", data_type=bool, status_code=201)
+
+    monkeypatch.setattr(routers.auth_service, "create_user", create_user)
+    return calls
+
+
+def register(test_client, key: str, **overrides):
+    return test_client.post(
+        f"{auth_prefix}/register",
+        json={**register_json, **overrides},
+        headers={"host": "localhost", "Idempotency-Key": key},
+    )
+
+
+class TestIdempotencyMiddleware:
+    def test_retry_is_replayed_without_reaching_the_service(self, fake_redis, create_user_calls, test_client):
+        first = register(test_client, "key-1")
+        second = register(test_client, "key-1")
+
+        assert first.status_code == second.status_code == status.HTTP_201_CREATED
+        assert first.content == second.content
+        assert second.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in first.headers
+        assert first.headers["x-request-id"] != second.headers["x-request-id"]
+        assert create_user_calls == ["user@example.com"]
+        assert [ttl for _, ttl in fake_redis.store.values()] == [Config.IDEMPOTENCY_TTL]
+
+    def test_key_reused_with_different_body(self, fake_redis, create_user_calls, test_client):
+        register(test_client, "key-1")
+        response = register(test_client, "key-1", email="other@example.com")
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json()["error_code"] == "IdempotencyKeyReused"
+        assert create_user_calls == ["user@example.com"]
+
+    def test_in_flight_request_conflicts(self, fake_redis, create_user_calls, test_client):
+        register(test_client, "key-1")
+        key, (record, _) = next(iter(fake_redis.store.items()))
+        # Put the key back into the state it has while the first request is still running.
+        fake_redis.store[key] = (json.dumps({"fingerprint": json.loads(record)["fingerprint"]}).encode(), 60)
+
+        response = register(test_client, "key-1")
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.headers["retry-after"] == "1"
+        assert create_user_calls == ["user@example.com"]
+
+    def test_errors_and_crashes_release_the_key(self, monkeypatch, fake_redis, test_client):
+        async def email_taken(user_data, session):
+            raise UserEmailExists()
+
+        monkeypatch.setattr(routers.auth_service, "create_user", email_taken)
+        assert register(test_client, "key-1").status_code == status.HTTP_409_CONFLICT
+        assert "idempotent-replayed" not in register(test_client, "key-1").headers
+        assert fake_redis.store == {}
+
+        async def crash(user_data, session):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(routers.auth_service, "create_user", crash)
+        with pytest.raises(RuntimeError):
+            register(test_client, "key-2")
+        assert fake_redis.store == {}
+
+    def test_rate_limited_request_can_be_retried(self, monkeypatch, fake_redis, create_user_calls, test_client):
+        monkeypatch.setattr(routers.register_limiter, "per_ip", Rate(1, 3600))
+        register(test_client, "key-1")
+
+        limited = register(test_client, "key-2")
+        assert limited.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+        local_buckets.clear()
+        retried = register(test_client, "key-2")
+        assert retried.status_code == status.HTTP_201_CREATED
+        assert "idempotent-replayed" not in retried.headers
+        assert create_user_calls == ["user@example.com", "user@example.com"]
+
+    def test_anonymous_keys_are_scoped_by_client_ip(self):
+        def scope(host):
+            return {"path": f"{auth_prefix}/register", "headers": [], "client": (host, 1234)}
+
+        assert idempotency.idempotency_redis_key(scope("10.0.0.1"), "k") != idempotency.idempotency_redis_key(
+            scope("10.0.0.2"), "k"
+        )
+        authorized = dict(scope("10.0.0.1"), headers=[(b"authorization", b"Bearer t")])
+        assert idempotency.idempotency_redis_key(authorized, "k") == idempotency.idempotency_redis_key(
+            dict(authorized, client=("10.0.0.2", 1)), "k"
+        )
+
+    def test_requests_without_key_or_redis_pass_through(self, monkeypatch, create_user_calls, test_client):
+        monkeypatch.setattr(idempotency, "get_redis", lambda: None)
+        register(test_client, "key-1")
+        register(test_client, "key-1")
+        test_client.post(f"{auth_prefix}/register", json=register_json, headers={"host": "localhost"})
+
+        assert len(create_user_calls) == 3
@@ -0,0 +1,157 @@
+import asyncio
+from email.message import Message
+
+import aiosmtplib
+import pytest
+
+from src.utils import mail
+from src.utils.mail import SMTPBatchError, SMTPPool, mail_config
+
+
+class FakeSMTP:
+    def __init__(self, fail_after=None, refuse=(), throttle=()):
+        self.fail_after = fail_after
+        self.refuse = set(refuse)
+        self.throttle = set(throttle)
+        self.sent = []
+        self.is_connected = True
+
+    async def send_message(self, message):
+        if self.fail_after is not None and len(self.sent) >= self.fail_after:
+            self.is_connected = False
+            raise aiosmtplib.SMTPServerDisconnected("gone")
+        if message["To"] in self.refuse:
+            raise aiosmtplib.SMTPRecipientsRefused(
+                [aiosmtplib.SMTPRecipientRefused(550, "mailbox unavailable", message["To"])]
+            )
+        if message["To"] in self.throttle:
+            raise aiosmtplib.SMTPResponseException(451, "too many messages, slow down")
+        self.sent.append(message)
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+class FakePool(SMTPPool):
+    def __init__(self, connections, idle_timeout=60.0):
+        super().__init__(config=mail_config, size=1, idle_timeout=idle_timeout)
+        self.connections = list(connections)
+        self.opened = []
+
+    async def _connect(self):
+        smtp = self.connections.pop(0)
+        self.opened.append(smtp)
+        return smtp
+
+
+def messages(count):
+    batch = []
+    for index in range(count):
+        message = Message()
+        message["To"] = f"user{index}@example.com"
+        batch.append(message)
+    return batch
+
+
+class TestSMTPPool:
+    def test_reuses_session_across_batches(self):
+        pool = FakePool([FakeSMTP(), FakeSMTP()])
+
+        async def run():
+            await pool.send_many(messages(2))
+            await pool.send_many(messages(3))
+
+        asyncio.run(run())
+
+        assert len(pool.opened) == 1
+        assert len(pool.opened[0].sent) == 5
+
+    def test_idle_session_is_replaced(self):
+        pool = FakePool([FakeSMTP(), FakeSMTP()], idle_timeout=0)
+
+        async def run():
+            await pool.send_many(messages(1))
+            await pool.send_many(messages(1))
+
+        asyncio.run(run())
+
+        assert len(pool.opened) == 2
+
+    def test_reconnects_and_resumes_batch(self):
+        pool = FakePool([FakeSMTP(fail_after=2), FakeSMTP()])
+
+        asyncio.run(pool.send_many(messages(5)))
+
+        assert [len(smtp.sent) for smtp in pool.opened] == [2, 3]
+
+    def test_reports_progress_when_reconnect_fails(self):
+        pool = FakePool([FakeSMTP(fail_after=2), FakeSMTP(fail_after=1)])
+
+        with pytest.raises(SMTPBatchError) as error:
+            asyncio.run(pool.send_many(messages(5)))
+
+        assert error.value.done == 3
+
+    def test_refused_recipient_is_skipped_not_retried(self):
+        pool = FakePool([FakeSMTP(refuse={"user1@example.com"}, fail_after=3), FakeSMTP(fail_after=0)])
+
+        with pytest.raises(SMTPBatchError) as error:
+            asyncio.run(pool.send_many(messages(6)))
+
+        # user0, user2 and user3 went out and user1 was refused; the batch resumes at user4.
+        assert error.value.done == 4
+        assert [recipient for recipient, _ in error.value.failed] == ["user1@example.com"]
+
+    def test_returns_refused_recipients(self):
+        pool = FakePool([FakeSMTP(refuse={"user0@example.com"})])
+
+        failed = asyncio.run(pool.send_many(messages(2)))
+
+        assert [recipient for recipient, _ in failed] == ["user0@example.com"]
+        assert [message["To"] for message in pool.opened[0].sent] == ["user1@example.com"]
+
+    def test_throttled_recipient_is_retried_not_dropped(self):
+        pool = FakePool([FakeSMTP(throttle={"user1@example.com"}), FakeSMTP()])
+
+        failed = asyncio.run(pool.send_many(messages(3)))
+
+        assert failed == []
+        assert [[message["To"] for message in smtp.sent] for smtp in pool.opened] == [
+            ["user0@example.com"],
+            ["user1@example.com", "user2@example.com"],
+        ]
+
+    def test_persistent_throttling_leaves_the_rest_for_a_retry(self):
+        throttled = {"user1@example.com"}
+        pool = FakePool([FakeSMTP(throttle=throttled), FakeSMTP(throttle=throttled)])
+
+        with pytest.raises(SMTPBatchError) as error:
+            asyncio.run(pool.send_many(messages(3)))
+
+        assert error.value.done == 1
+        assert error.value.failed == []
+
+    def test_failed_login_closes_the_connection(self, monkeypatch):
+        class RefusingSMTP(FakeSMTP):
+            instances = []
+
+            def __init__(self, **options):
+                super().__init__()
+                self.instances.append(self)
+
+            async def connect(self):
+                pass
+
+            async def login(self, username, password):
+                raise aiosmtplib.SMTPAuthenticationError(535, "bad credentials")
+
+        monkeypatch.setattr(mail.aiosmtplib, "SMTP", RefusingSMTP)
+
+        with pytest.raises(aiosmtplib.SMTPAuthenticationError):
+            asyncio.run(SMTPPool(config=mail_config, size=1, idle_timeout=60.0).send_many(messages(1)))
+
+        assert len(RefusingSMTP.instances) == 1
+        assert RefusingSMTP.instances[0].is_connected is False
@@ -0,0 +1,67 @@
+import asyncio
+
+from prometheus_client import REGISTRY
+
+from src.db.redis import TrackedConnectionPool
+from src.utils import metrics
+from src.utils.metrics import timed
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestMetrics:
+    def test_timed_sync_and_async(self):
+        @timed("test_sync")
+        def double(value):
+            return value * 2
+
+        @timed("test_async")
+        async def triple(value):
+            return value * 3
+
+        assert double(2) == 4
+        assert asyncio.run(triple(2)) == 6
+        assert sample("span_duration_seconds_count", span="test_sync") == 1
+        assert sample("span_duration_seconds_count", span="test_async") == 1
+
+    def test_route_timing_is_exported(self, monkeypatch, test_client):
+        monkeypatch.setattr(metrics.Config, "METRICS_TOKEN", "scrape")
+        labels = {"method": "GET", "route": "/api/v1/auth/.well-known/jwks.json"}
+        before = sample("http_request_duration_seconds_count", **labels)
+
+        test_client.get("/api/v1/auth/.well-known/jwks.json", headers={"host": "localhost"})
+        response = test_client.get("/metrics", headers={"host": "localhost", "authorization": "Bearer scrape"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "span_duration_seconds" in response.text
+        assert sample("http_request_duration_seconds_count", **labels) == before + 1
+
+    def test_metrics_require_the_token(self, monkeypatch, test_client):
+        headers = {"host": "localhost", "authorization": "Bearer guess"}
+
+        monkeypatch.setattr(metrics.Config, "METRICS_TOKEN", None)
+        assert test_client.get("/metrics", headers=headers).status_code == 401
+
+        monkeypatch.setattr(metrics.Config, "METRICS_TOKEN", "scrape")
+        response = test_client.get("/metrics", headers=headers)
+        assert response.status_code == 401
+        assert response.json()["error_code"] == "MetricsUnauthorized"
+        assert test_client.get("/metrics", headers={"host": "localhost"}).status_code == 401
+
+    def test_pool_tracks_checked_out_connections(self, monkeypatch):
+        async def run():
+            pool = TrackedConnectionPool(max_connections=2)
+            monkeypatch.setattr(pool, "ensure_connection", lambda connection: asyncio.sleep(0))
+
+            first = await pool.get_connection()
+            second = await pool.get_connection()
+            assert pool.in_use == 2
+
+            await pool.release(first)
+            await pool.release(second)
+            assert pool.in_use == 0
+
+        asyncio.run(run())
@@ -0,0 +1,81 @@
+import uuid
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from starlette_context import context
+
+from src.utils.middlewares import BodySizeLimitMiddleware, ContextMiddleware
+
+app = FastAPI()
+app.add_middleware(ContextMiddleware)
+
+
+@app.get("/context")
+async def read_context():
+    return {
+        "base_url": context.get("base_url"),
+        "user_agent": context.get("User-Agent"),
+        "request_id": context["X-Request-ID"],
+        "missing": context.get("missing", "default"),
+    }
+
+
+upload_app = FastAPI()
+upload_app.add_middleware(
+    BodySizeLimitMiddleware, paths=["/upload"], max_body=1024, error_code="TooLarge", message="Too large."
+)
+
+
+@upload_app.post("/upload")
+async def upload(file: UploadFile = File(...)):
+    return {"size": len(await file.read())}
+
+
+def chunked(data: bytes, size: int = 256):
+    for start in range(0, len(data), size):
+        end = start + size
+        yield data[start:end]
+
+
+class TestContextMiddleware:
+    def test_context_values(self):
+        response = TestClient(app).get("/context", headers={"User-Agent": "tests"})
+        body = response.json()
+
+        assert body["base_url"] == "http://testserver/"
+        assert body["user_agent"] == "tests"
+        assert body["missing"] == "default"
+        assert response.headers["X-Request-ID"] == body["request_id"]
+        assert uuid.UUID(response.headers["X-Correlation-ID"])
+
+    def test_incoming_ids(self):
+        correlation_id = uuid.uuid4().hex
+        response = TestClient(app).get(
+            "/context", headers={"X-Correlation-ID": correlation_id, "X-Request-ID": "not-a-uuid"}
+        )
+
+        assert response.headers["X-Correlation-ID"] == correlation_id
+        assert response.headers["X-Request-ID"] != "not-a-uuid"
+
+
+class TestBodySizeLimitMiddleware:
+    def test_small_upload_passes(self):
+        response = TestClient(upload_app).post("/upload", files={"file": ("a.csv", b"x" * 100)})
+
+        assert response.status_code == 200
+        assert response.json() == {"size": 100}
+
+    def test_content_length_over_limit(self):
+        response = TestClient(upload_app).post("/upload", files={"file": ("a.csv", b"x" * 2048)})
+
+        assert response.status_code == 413
+        assert response.json() == {"error_code": "TooLarge", "message": "Too large."}
+
+    def test_streamed_body_is_cut_off(self):
+        body = b"--b\r\nContent-Disposition: form-data; name=file; filename=a.csv\r\n\r\n" + b"x" * 4096
+        response = TestClient(upload_app).post(
+            "/upload", content=chunked(body), headers={"content-type": "multipart/form-data; boundary=b"}
+        )
+
+        assert response.status_code == 413
+        assert response.json()["error_code"] == "TooLarge"
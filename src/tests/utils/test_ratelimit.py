@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from redis.exceptions import ConnectionError, NoScriptError
+
+from src.auth import routers
+from src.misc.responses import server_response
+from src.utils import ratelimit
+from src.utils.exceptions import RateLimited
+from src.utils.ratelimit import LocalBuckets, Rate, RateLimiter, local_buckets
+
+auth_prefix = "/api/v1/auth"
+
+
+class FakeRequest:
+    def __init__(self, host: str = "10.0.0.1", body: dict = None):
+        self.client = type("Client", (), {"host": host})()
+        self._body = body or {}
+
+    async def json(self):
+        return self._body
+
+
+class ScriptRedis:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    async def evalsha(self, sha, numkeys, *keys_and_args):
+        self.calls.append("evalsha")
+        raise NoScriptError("NOSCRIPT")
+
+    async def eval(self, script, numkeys, *keys_and_args):
+        self.calls.append("eval")
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class TestRate:
+    def test_parse(self):
+        assert Rate.parse("5/minute") == Rate(5, 60)
+        assert Rate.parse("10/hour") == Rate(10, 3600)
+
+
+class TestLocalBuckets:
+    def test_burst_then_refill(self):
+        buckets = LocalBuckets(maxsize=10)
+        rate = Rate(2, 60)
+
+        for _ in range(2):
+            assert buckets.wait("k", rate, now=0.0) == 0
+            buckets.consume("k")
+
+        assert buckets.wait("k", rate, now=0.0) == pytest.approx(30.0)
+        assert buckets.wait("k", rate, now=30.0) == 0
+
+    def test_blocked_key_waits_until_redis_retry(self):
+        buckets = LocalBuckets(maxsize=10)
+        rate = Rate(100, 60)
+        buckets.wait("k", rate, now=0.0)
+        buckets.block("k", until=5.0)
+
+        assert buckets.wait("k", rate, now=1.0) == pytest.approx(4.0)
+        assert buckets.wait("k", rate, now=5.0) == 0
+
+    def test_bounded(self):
+        buckets = LocalBuckets(maxsize=2)
+        for key in "abc":
+            buckets.wait(key, Rate(1, 1), now=0.0)
+
+        assert len(buckets) == 2
+
+
+class TestRateLimiter:
+    def test_redis_refusal_is_remembered_locally(self, monkeypatch):
+        redis = ScriptRedis([2, 1500])
+        monkeypatch.setattr(ratelimit, "get_redis", lambda: redis)
+        limiter = RateLimiter("test", per_ip="100/minute", per_account="100/minute")
+        request = FakeRequest(body={"email": "User@Example.com"})
+
+        with pytest.raises(RateLimited) as refused:
+            asyncio.run(limiter(request))
+        assert refused.value.retry_after == pytest.approx(1.5)
+        assert redis.calls == ["evalsha", "eval"]
+
+        with pytest.raises(RateLimited):
+            asyncio.run(limiter(FakeRequest(host="10.0.0.2", body={"email": "user@example.com"})))
+        assert len(redis.calls) == 2
+
+        # Only the account was refused, so the IP can still be used for another account.
+        redis.result = [0, 0]
+        asyncio.run(limiter(FakeRequest(body={"email": "other@example.com"})))
+
+    def test_redis_outage_falls_back_to_local_limits(self, monkeypatch):
+        monkeypatch.setattr(ratelimit, "get_redis", lambda: ScriptRedis(ConnectionError("down")))
+        limiter = RateLimiter("test", per_ip="1/minute")
+
+        asyncio.run(limiter(FakeRequest()))
+        with pytest.raises(RateLimited):
+            asyncio.run(limiter(FakeRequest()))
+
+    def test_login_attempts_per_account(self, monkeypatch, test_client):
+        calls = []
+
+        async def login_user(login_data, session):
+            calls.append(login_data.email)
+            return server_response(data=True, message="ok")
+
+        monkeypatch.setattr(routers.auth_service, "login_user", login_user)
+        limit = routers.login_limiter.per_account.limit
+
+        responses = [
+            test_client.post(
+                f"{auth_prefix}/login",
+                json={"email": "user@example.com", "password": "guess"},
+                headers={"host": "localhost"},
+            )
+            for _ in range(limit + 1)
+        ]
+
+        assert [r.status_code for r in responses[:limit]] == [status.HTTP_200_OK] * limit
+        assert responses[-1].status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert responses[-1].json()["error_code"] == "RateLimited"
+        assert int(responses[-1].headers["retry-after"]) >= 1
+        assert len(calls) == limit
+        assert len(local_buckets) == 2
+
+    def test_non_json_body_is_still_validated(self, test_client):
+        response = test_client.post(
+            f"{auth_prefix}/login",
+            content="email=user@example.com",
+            headers={"host": "localhost", "content-type": "text/plain"},
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert len(local_buckets) == 1
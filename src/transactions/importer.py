@@ -0,0 +1,244 @@
+"""Streaming statement import: CSV/OFX rows -> validated batches -> COPY into `transactions`."""
+
+import csv
+import hashlib
+import os
+import re
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import Path
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from src.config import Config
+from src.db.main import AsyncSessionMaker
+from src.utils.exceptions import ImportTooLarge, UnsupportedImportFormat
+
+from .schemas import MAX_AMOUNT, CreateTransactionModel
+from .service import TransactionService
+
+IMPORT_FORMATS = {".csv": "csv", ".ofx": "ofx", ".qfx": "ofx"}
+CHUNK_SIZE = 64 * 1024
+
+# Accepted CSV header names for each field, compared case-insensitively.
+CSV_COLUMNS = {
+    "occurred_at": ("date", "occurred_at", "transaction date", "posted date", "booking date"),
+    "amount": ("amount", "value"),
+    "currency": ("currency",),
+    "category": ("category",),
+    "note": ("description", "note", "memo", "payee", "details"),
+}
+
+OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+rows_adapter = TypeAdapter(List[CreateTransactionModel])
+
+
+def import_format(filename: Optional[str]) -> str:
+    file_format = IMPORT_FORMATS.get(Path(filename or "").suffix.lower())
+    if file_format is None:
+        raise UnsupportedImportFormat()
+    return file_format
+
+
+def save_upload(source: IO[bytes], file_format: str) -> Path:
+    """Copy an uploaded file to `IMPORT_DIR` chunk by chunk, enforcing `IMPORT_MAX_BYTES`."""
+    os.makedirs(Config.IMPORT_DIR, exist_ok=True)
+    path = Path(Config.IMPORT_DIR) / f"{uuid.uuid4().hex}.{file_format}"
+    written = 0
+
+    try:
+        with open(path, "wb") as destination:
+            while chunk := source.read(CHUNK_SIZE):
+                written += len(chunk)
+                if written > Config.IMPORT_MAX_BYTES:
+                    raise ImportTooLarge()
+                destination.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+    return path
+
+
+def signed_amount(value: Optional[str]) -> Tuple[Optional[int], str]:
+    """Split a statement amount like "-12.50" into minor units and a kind.
+
+    Unparseable, non-finite ("NaN", "Infinity") and out-of-range amounts come back as None
+    so row validation rejects them.
+    """
+    try:
+        amount = Decimal((value or "").replace(",", "").strip())
+    except InvalidOperation:
+        return None, "expense"
+
+    if not amount.is_finite():
+        return None, "expense"
+
+    kind = "expense" if amount < 0 else "income"
+    minor_units = abs(amount) * 100
+    if minor_units > MAX_AMOUNT:
+        return None, kind
+
+    return int(minor_units.to_integral_value()), kind
+
+
+def iter_csv_rows(path: Path, currency: str) -> Iterator[Dict]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [name.strip().lower() for name in next(reader, [])]
+        columns = {
+            field: next((header.index(name) for name in names if name in header), None)
+            for field, names in CSV_COLUMNS.items()
+        }
+
+        def column(record: List[str], field: str) -> Optional[str]:
+            index = columns[field]
+            return record[index] if index is not None and index < len(record) else None
+
+        for record in reader:
+            if not record:
+                continue
+
+            amount, kind = signed_amount(column(record, "amount"))
+            yield {
+                "amount": amount,
+                "kind": kind,
+                "currency": column(record, "currency") or currency,
+                "category": column(record, "category") or "uncategorized",
+                "occurred_at": column(record, "occurred_at"),
+                "note": column(record, "note") or None,
+            }
+
+
+def iter_ofx_tags(f: IO[str]) -> Iterator[Tuple[bool, str, str]]:
+    """Yield `(closing, tag, value)` from an SGML or XML OFX file, reading it in chunks."""
+    buffer = ""
+    while chunk := f.read(CHUNK_SIZE):
+        buffer += chunk
+        # Only parse up to the last "<": the tag after it may continue in the next chunk.
+        cut = buffer.rfind("<")
+        if cut <= 0:
+            continue
+
+        for match in OFX_TAG.finditer(buffer, 0, cut):
+            yield match.group(1) == "/", match.group(2).upper(), match.group(3).strip()
+        buffer = buffer[cut:]
+
+    for match in OFX_TAG.finditer(buffer):
+        yield match.group(1) == "/", match.group(2).upper(), match.group(3).strip()
+
+
+def parse_ofx_date(value: str) -> Optional[datetime]:
+    # YYYYMMDD[HHMMSS[.XXX]][[offset:TZ]]; the offset is ignored and the time taken as UTC.
+    for length, fmt in ((14, "%Y%m%d%H%M%S"), (8, "%Y%m%d")):
+        try:
+            return datetime.strptime(value[:length], fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+def iter_ofx_rows(path: Path, currency: str) -> Iterator[Dict]:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        statement_currency = currency
+        fields: Optional[Dict[str, str]] = None
+
+        for closing, tag, value in iter_ofx_tags(f):
+            if tag == "CURDEF" and not closing and value:
+                statement_currency = value
+            elif tag == "STMTTRN":
+                if not closing:
+                    fields = {}
+                elif fields is not None:
+                    amount, kind = signed_amount(fields.get("TRNAMT"))
+                    yield {
+                        "amount": amount,
+                        "kind": kind,
+                        "currency": statement_currency,
+                        "category": "uncategorized",
+                        "occurred_at": parse_ofx_date(fields.get("DTPOSTED", "")),
+                        "note": fields.get("NAME") or fields.get("MEMO") or None,
+                        "fitid": fields.get("FITID"),
+                    }
+                    fields = None
+            elif fields is not None and not closing:
+                fields[tag] = value
+
+
+ROW_READERS: Dict[str, Callable[[Path, str], Iterator[Dict]]] = {"csv": iter_csv_rows, "ofx": iter_ofx_rows}
+
+
+def batched(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def validate_batch(batch: List[Dict]) -> Tuple[List[CreateTransactionModel], List[Dict]]:
+    """Validate a whole batch in one pydantic-core call, dropping the rows that fail.
+
+    Returns the valid models together with their raw rows (for the OFX `fitid`).
+    """
+    try:
+        return rows_adapter.validate_python(batch), batch
+    except ValidationError as e:
+        invalid = {error["loc"][0] for error in e.errors()}
+        valid_rows = [row for index, row in enumerate(batch) if index not in invalid]
+        return rows_adapter.validate_python(valid_rows), valid_rows
+
+
+def content_hashes(transactions: List[CreateTransactionModel], raw_rows: List[Dict], seen: Counter) -> List[str]:
+    """Hash each row's content, numbering identical rows within one file.
+
+    Two identical purchases on the same statement stay two transactions, while importing
+    the same statement again produces the same hashes and inserts nothing.
+    """
+    hashes = []
+    for transaction, raw in zip(transactions, raw_rows):
+        key = "|".join(
+            (
+                raw.get("fitid") or "",
+                transaction.occurred_at.isoformat(),
+                str(transaction.amount),
+                transaction.kind,
+                transaction.currency,
+                transaction.note or "",
+            )
+        )
+        seen[key] += 1
+        hashes.append(hashlib.sha256(f"{key}#{seen[key]}".encode()).hexdigest())
+    return hashes
+
+
+async def import_file(
+    user_id: int,
+    path: Path,
+    file_format: str,
+    currency: str,
+    batch_size: int = Config.IMPORT_BATCH_SIZE,
+    on_progress: Optional[Callable[[Dict[str, int]], None]] = None,
+) -> Dict[str, int]:
+    """Import a saved statement for `user_id`, committing one batch at a time."""
+    transaction_service = TransactionService()
+    stats = {"processed": 0, "inserted": 0, "duplicates": 0, "invalid": 0}
+    seen: Counter = Counter()
+
+    async with AsyncSessionMaker() as session:
+        for batch in batched(ROW_READERS[file_format](path, currency), batch_size):
+            transactions, raw_rows = validate_batch(batch)
+            hashes = content_hashes(transactions, raw_rows, seen)
+            inserted = await transaction_service.import_transactions(user_id, transactions, hashes, session)
+
+            stats["processed"] += len(batch)
+            stats["invalid"] += len(batch) - len(transactions)
+            stats["inserted"] += inserted
+            stats["duplicates"] += len(transactions) - inserted
+            if on_progress is not None:
+                on_progress(dict(stats))
+
+    return stats
@@ -0,0 +1,189 @@
+import uuid
+from typing import Optional
+
+from celery.result import AsyncResult
+from fastapi import APIRouter, Body, Depends, File, Form, Query, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth.dependencies import AccessTokenBearer
+from src.db.main import get_read_session, get_session
+from src.db.redis import get_import_owner, set_import_owner
+from src.misc.responses import resp_model, server_response
+from src.misc.schemas import CursorPaginatedResponse, CursorPagination
+from src.tasks import celery_app
+from src.tasks.import_tasks import import_transactions_task
+from src.utils.exceptions import ImportNotFound
+from src.utils.metrics import TimedRoute
+
+from .importer import import_format, save_upload
+from .schemas import (
+    CreateTransactionModel,
+    TransactionModel,
+    UpdateTransactionModel,
+    normalize_category,
+    normalize_currency,
+)
+from .service import TransactionService
+
+transaction_router = APIRouter(route_class=TimedRoute)
+transaction_service = TransactionService()
+
+
+def dump_transaction(transaction) -> TransactionModel:
+    return TransactionModel.model_validate(transaction, from_attributes=True)
+
+
+@transaction_router.post(
+    "",
+    status_code=status.HTTP_201_CREATED,
+    response_model=resp_model(TransactionModel),
+)
+async def create_transaction(
+    data: CreateTransactionModel = Body(...),
+    token_payload: dict = Depends(AccessTokenBearer()),
+    session: AsyncSession = Depends(get_session),
+):
+    transaction = await transaction_service.create_transaction(token_payload["user"]["id"], data.model_dump(), session)
+
+    return server_response(
+        data=dump_transaction(transaction),
+        message="transaction created.",
+        data_type=TransactionModel,
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+@transaction_router.get(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_model=resp_model(CursorPaginatedResponse[TransactionModel]),
+)
+async def list_transactions(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    category: Optional[str] = Query(None),
+    token_payload: dict = Depends(AccessTokenBearer()),
+    session: AsyncSession = Depends(get_read_session),
+):
+    transactions, next_cursor = await transaction_service.list_transactions(
+        token_payload["user"]["id"],
+        session,
+        limit=limit,
+        cursor=cursor,
+        category=None if category is None else normalize_category(category),
+    )
+
+    return server_response(
+        data=CursorPaginatedResponse[TransactionModel](
+            result=[dump_transaction(transaction) for transaction in transactions],
+            pagination=CursorPagination(limit=limit, next_cursor=next_cursor, has_more=next_cursor is not None),
+        ),
+        message="transactions retrieved.",
+        data_type=CursorPaginatedResponse[TransactionModel],
+    )
+
+
+@transaction_router.post(
+    "/import",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=resp_model(dict),
+)
+async def import_transactions(
+    file: UploadFile = File(...),
+    currency: str = Form(..., min_length=3, max_length=3),
+    token_payload: dict = Depends(AccessTokenBearer()),
+):
+    file_format = import_format(file.filename)
+    path = await run_in_threadpool(save_upload, file.file, file_format)
+    user_id = token_payload["user"]["id"]
+
+    # Recorded before the task is queued, so a status poll can never see it without its owner.
+    task_id = str(uuid.uuid4())
+    await set_import_owner(task_id, user_id)
+    import_transactions_task.apply_async(
+        kwargs={
+            "user_id": user_id,
+            "path": str(path),
+            "file_format": file_format,
+            "currency": normalize_currency(currency),
+        },
+        task_id=task_id,
+    )
+
+    return server_response(
+        data={"task_id": task_id},
+        message="import started.",
+        data_type=dict,
+        status_code=status.HTTP_202_ACCEPTED,
+    )
+
+
+@transaction_router.get(
+    "/import/{task_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=resp_model(dict),
+)
+async def get_import_status(task_id: str, token_payload: dict = Depends(AccessTokenBearer())):
+    if await get_import_owner(task_id) != token_payload["user"]["id"]:
+        raise ImportNotFound()
+
+    result = AsyncResult(task_id, app=celery_app)
+    state, info = await run_in_threadpool(lambda: (result.state, result.info))
+
+    progress = info if isinstance(info, dict) else None
+    return server_response(data={"state": state, "progress": progress}, message="import status.", data_type=dict)
+
+
+@transaction_router.get(
+    "/{uid}",
+    status_code=status.HTTP_200_OK,
+    response_model=resp_model(TransactionModel),
+)
+async def get_transaction(
+    uid: uuid.UUID,
+    token_payload: dict = Depends(AccessTokenBearer()),
+    session: AsyncSession = Depends(get_read_session),
+):
+    transaction = await transaction_service.get_transaction(token_payload["user"]["id"], uid, session)
+
+    return server_response(
+        data=dump_transaction(transaction), message="transaction retrieved.", data_type=TransactionModel
+    )
+
+
+@transaction_router.patch(
+    "/{uid}",
+    status_code=status.HTTP_200_OK,
+    response_model=resp_model(TransactionModel),
+)
+async def update_transaction(
+    uid: uuid.UUID,
+    data: UpdateTransactionModel = Body(...),
+    token_payload: dict = Depends(AccessTokenBearer()),
+    session: AsyncSession = Depends(get_session),
+):
+    transaction = await transaction_service.get_transaction(token_payload["user"]["id"], uid, session, for_update=True)
+    transaction = await transaction_service.update_transaction(
+        transaction, data.model_dump(exclude_unset=True), session
+    )
+
+    return server_response(
+        data=dump_transaction(transaction), message="transaction updated.", data_type=TransactionModel
+    )
+
+
+@transaction_router.delete(
+    "/{uid}",
+    status_code=status.HTTP_200_OK,
+    response_model=resp_model(bool),
+)
+async def delete_transaction(
+    uid: uuid.UUID,
+    token_payload: dict = Depends(AccessTokenBearer()),
+    session: AsyncSession = Depends(get_session),
+):
+    transaction = await transaction_service.get_transaction(token_payload["user"]["id"], uid, session, for_update=True)
+    await transaction_service.delete_transaction(transaction, session)
+
+    return server_response(data=True, message="transaction deleted.", data_type=bool)
@@ -0,0 +1,89 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, field_serializer, field_validator
+
+TransactionKind = Literal["expense", "income"]
+
+# Minor units; far below BIGINT so per-month rollup totals of many such rows still fit.
+MAX_AMOUNT = 10**15
+
+
+def normalize_currency(value: str) -> str:
+    return value.strip().upper()
+
+
+def normalize_category(value: str) -> str:
+    return value.strip().lower()
+
+
+def aware_datetime(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC so keyset comparisons never mix naive and aware values."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class CreateTransactionModel(BaseModel):
+    amount: int = Field(..., gt=0, le=MAX_AMOUNT, description="Amount in the currency's minor units, e.g. cents.")
+    currency: str = Field(..., min_length=3, max_length=3)
+    category: str = Field(..., min_length=1, max_length=64)
+    kind: TransactionKind = Field(default="expense")
+    occurred_at: datetime = Field(...)
+    note: Optional[str] = Field(default=None, max_length=500)
+
+    @field_validator("currency")
+    @classmethod
+    def validate_currency(cls, value):
+        return normalize_currency(value)
+
+    @field_validator("category")
+    @classmethod
+    def validate_category(cls, value):
+        return normalize_category(value)
+
+    @field_validator("occurred_at")
+    @classmethod
+    def validate_occurred_at(cls, value):
+        return aware_datetime(value)
+
+
+class UpdateTransactionModel(BaseModel):
+    amount: Optional[int] = Field(default=None, gt=0, le=MAX_AMOUNT)
+    currency: Optional[str] = Field(default=None, min_length=3, max_length=3)
+    category: Optional[str] = Field(default=None, min_length=1, max_length=64)
+    kind: Optional[TransactionKind] = None
+    occurred_at: Optional[datetime] = None
+    note: Optional[str] = Field(default=None, max_length=500)
+
+    @field_validator("currency")
+    @classmethod
+    def validate_currency(cls, value):
+        return value if value is None else normalize_currency(value)
+
+    @field_validator("category")
+    @classmethod
+    def validate_category(cls, value):
+        return value if value is None else normalize_category(value)
+
+    @field_validator("occurred_at")
+    @classmethod
+    def validate_occurred_at(cls, value):
+        return value if value is None else aware_datetime(value)
+
+
+class TransactionModel(BaseModel):
+    uid: uuid.UUID
+    amount: int
+    currency: str
+    category: str
+    kind: TransactionKind
+    occurred_at: datetime
+    note: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_serializer("uid")
+    def serialize_uid(self, value: uuid.UUID, _info):
+        return str(value)
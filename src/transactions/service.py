@@ -0,0 +1,207 @@
+import base64
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text, tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.budgets.service import ROLLUP_LOCK_CLASS, ROLLUP_MONTH_SQL, BudgetService, rollup_entry
+from src.db.models import Transaction
+from src.db.redis import bump_ledger_version
+from src.transactions.schemas import CreateTransactionModel
+from src.utils.exceptions import InvalidCursor, TransactionNotFound
+from src.utils.metrics import timed
+
+IMPORT_COLUMNS = ("uid", "amount", "currency", "category", "kind", "occurred_at", "note", "content_hash")
+
+CREATE_IMPORT_STAGING = text(
+    """
+    CREATE TEMP TABLE IF NOT EXISTS transactions_import (
+        uid uuid, amount bigint, currency varchar(3), category varchar, kind varchar,
+        occurred_at timestamptz, note varchar, content_hash varchar
+    ) ON COMMIT DELETE ROWS
+    """
+)
+
+# Moves the staged rows into `transactions` and adds the ones actually inserted to the budget
+# rollups, in one statement. Returns the number of rows inserted.
+INSERT_FROM_IMPORT_STAGING = text(
+    f"""
+    WITH rollup_lock AS (SELECT pg_advisory_xact_lock_shared(:lock_class, :user_id)),
+    inserted AS (
+        INSERT INTO transactions
+            (uid, user_id, amount, currency, category, kind, occurred_at, note, content_hash, created_at, updated_at)
+        SELECT uid, :user_id, amount, currency, category, kind, occurred_at, note, content_hash, now(), now()
+        FROM transactions_import, rollup_lock
+        ON CONFLICT (user_id, content_hash) DO NOTHING
+        RETURNING amount, currency, category, kind, occurred_at
+    ),
+    rolled_up AS (
+        INSERT INTO budget_rollups
+            (user_id, month, category, currency, expense_total, income_total, transaction_count)
+        SELECT :user_id, {ROLLUP_MONTH_SQL}, category, currency,
+            coalesce(sum(amount) FILTER (WHERE kind = 'expense'), 0),
+            coalesce(sum(amount) FILTER (WHERE kind = 'income'), 0),
+            count(*)
+        FROM inserted
+        GROUP BY 2, 3, 4
+        ON CONFLICT (user_id, month, category, currency) DO UPDATE SET
+            expense_total = budget_rollups.expense_total + excluded.expense_total,
+            income_total = budget_rollups.income_total + excluded.income_total,
+            transaction_count = budget_rollups.transaction_count + excluded.transaction_count
+    )
+    SELECT count(*) AS inserted FROM inserted
+    """
+)
+
+
+def encode_cursor(transaction: Transaction) -> str:
+    """Opaque cursor pointing just past `transaction` in (occurred_at DESC, id DESC) order."""
+    raw = f"{transaction.occurred_at.isoformat()}|{transaction.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        occurred_at, _, id = raw.partition("|")
+        return datetime.fromisoformat(occurred_at), int(id)
+    except ValueError:
+        raise InvalidCursor()
+
+
+budget_service = BudgetService()
+
+
+class TransactionService:
+    @timed("transaction_service.create_transaction")
+    async def create_transaction(self, user_id: int, transaction_data: dict, session: AsyncSession):
+        transaction = Transaction(user_id=user_id, **transaction_data)
+        session.add(transaction)
+        await budget_service.apply(session, added=[rollup_entry(transaction)])
+        await session.commit()
+        await session.refresh(transaction)
+        await bump_ledger_version(user_id)
+
+        return transaction
+
+    @timed("transaction_service.get_transaction")
+    async def get_transaction(self, user_id: int, uid: uuid.UUID, session: AsyncSession, for_update: bool = False):
+        """Load one of the user's transactions, raising TransactionNotFound if there is none.
+
+        Write paths pass `for_update` to lock the row until commit, so concurrent updates and deletes
+        compute their rollup deltas one after another from the current row.
+        """
+        statement = select(Transaction).where(Transaction.uid == uid, Transaction.user_id == user_id)
+        if for_update:
+            statement = statement.with_for_update()
+        result = await session.exec(statement)
+        transaction = result.first()
+
+        if transaction is None:
+            raise TransactionNotFound()
+
+        return transaction
+
+    @timed("transaction_service.list_transactions")
+    async def list_transactions(
+        self,
+        user_id: int,
+        session: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        category: Optional[str] = None,
+    ) -> Tuple[List[Transaction], Optional[str]]:
+        """Return one page of the user's transactions, newest first, and the cursor for the next page.
+
+        Pages are found by seeking past the last row of the previous page on the
+        (user_id, occurred_at DESC, id DESC) index, so every page costs the same however deep
+        it is. One extra row is fetched to tell whether another page exists, which
+        avoids a COUNT(*).
+        """
+        statement = select(Transaction).where(Transaction.user_id == user_id)
+
+        if category is not None:
+            statement = statement.where(Transaction.category == category)
+        if cursor is not None:
+            statement = statement.where(
+                tuple_(Transaction.occurred_at, Transaction.id) < tuple_(*decode_cursor(cursor))
+            )
+
+        statement = statement.order_by(Transaction.occurred_at.desc(), Transaction.id.desc()).limit(limit + 1)
+        transactions = list((await session.exec(statement)).all())
+
+        if len(transactions) > limit:
+            transactions = transactions[:limit]
+            return transactions, encode_cursor(transactions[-1])
+
+        return transactions, None
+
+    @timed("transaction_service.import_transactions")
+    async def import_transactions(
+        self, user_id: int, transactions: List[CreateTransactionModel], hashes: List[str], session: AsyncSession
+    ) -> int:
+        """Insert a batch of imported rows, skipping rows already imported, and commit it.
+
+        The batch is streamed into a session-local staging table with COPY and moved over in
+        one INSERT ... SELECT, so rows whose (user_id, content_hash) exists are skipped by the
+        unique index instead of failing the batch. The same statement adds the inserted rows to
+        the budget rollups. Returns the number of rows inserted.
+        """
+        if not transactions:
+            return 0
+
+        connection = await session.connection()
+        await connection.execute(CREATE_IMPORT_STAGING)
+
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            "transactions_import",
+            records=[
+                (
+                    uuid.uuid4(),
+                    transaction.amount,
+                    transaction.currency,
+                    transaction.category,
+                    transaction.kind,
+                    transaction.occurred_at,
+                    transaction.note,
+                    content_hash,
+                )
+                for transaction, content_hash in zip(transactions, hashes)
+            ],
+            columns=IMPORT_COLUMNS,
+        )
+
+        result = await connection.execute(
+            INSERT_FROM_IMPORT_STAGING, {"lock_class": ROLLUP_LOCK_CLASS, "user_id": user_id}
+        )
+        inserted = result.scalar_one()
+        await session.commit()
+        if inserted:
+            await bump_ledger_version(user_id)
+
+        return inserted
+
+    @timed("transaction_service.update_transaction")
+    async def update_transaction(self, transaction: Transaction, transaction_data: dict, session: AsyncSession):
+        previous = rollup_entry(transaction)
+        for field, value in transaction_data.items():
+            if value is not None:
+                setattr(transaction, field, value)
+        transaction.updated_at = datetime.now(timezone.utc)
+
+        await budget_service.apply(session, added=[rollup_entry(transaction)], removed=[previous])
+        await session.commit()
+        await session.refresh(transaction)
+        await bump_ledger_version(transaction.user_id)
+        return transaction
+
+    @timed("transaction_service.delete_transaction")
+    async def delete_transaction(self, transaction: Transaction, session: AsyncSession):
+        await session.delete(transaction)
+        await budget_service.apply(session, removed=[rollup_entry(transaction)])
+        await session.commit()
+        await bump_ledger_version(transaction.user_id)
@@ -0,0 +1,81 @@
+import logging
+import time
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.config import Config
+from src.db.redis import get_redis
+from src.utils.cache import TTLCache
+from src.utils.metrics import PROFILE_CACHE_LOOKUPS
+
+_LOCAL_HIT = PROFILE_CACHE_LOOKUPS.labels("local")
+_REDIS_HIT = PROFILE_CACHE_LOOKUPS.labels("redis")
+_MISS = PROFILE_CACHE_LOOKUPS.labels("miss")
+
+
+class ProfileCache:
+    """Pre-serialized profile responses keyed by user uid.
+
+    A short-lived in-process LRU sits in front of an optional Redis tier shared by all
+    workers. Writes invalidate both tiers; other workers' local copies age out within `ttl`.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, use_redis: bool, redis_ttl: int):
+        self.local = TTLCache(maxsize)
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self.redis_ttl = redis_ttl
+
+    @staticmethod
+    def _key(uid: str) -> str:
+        return f"profile:{uid}"
+
+    async def get(self, uid: str) -> Optional[bytes]:
+        body = self.local.get(uid)
+        if body is not None:
+            _LOCAL_HIT.inc()
+            return body
+
+        client = get_redis() if self.use_redis else None
+        if client is not None:
+            try:
+                body = await client.get(self._key(uid))
+            except RedisError as e:
+                logging.warning(f"Redis error while reading profile cache: {e}")
+
+            if body is not None:
+                _REDIS_HIT.inc()
+                self.local.set(uid, body, time.time() + self.ttl)
+                return body
+
+        _MISS.inc()
+        return None
+
+    async def set(self, uid: str, body: bytes) -> None:
+        self.local.set(uid, body, time.time() + self.ttl)
+
+        client = get_redis() if self.use_redis else None
+        if client is not None:
+            try:
+                await client.set(self._key(uid), body, ex=self.redis_ttl)
+            except RedisError as e:
+                logging.warning(f"Redis error while writing profile cache: {e}")
+
+    async def invalidate(self, uid: str) -> None:
+        self.local.pop(uid)
+
+        client = get_redis() if self.use_redis else None
+        if client is not None:
+            try:
+                await client.delete(self._key(uid))
+            except RedisError as e:
+                logging.warning(f"Redis error while invalidating profile cache: {e}")
+
+
+profile_cache = ProfileCache(
+    maxsize=Config.PROFILE_CACHE_SIZE,
+    ttl=Config.PROFILE_CACHE_TTL,
+    use_redis=Config.PROFILE_CACHE_REDIS,
+    redis_ttl=Config.PROFILE_CACHE_REDIS_TTL,
+)
@@ -1,18 +1,40 @@
+import uuid
+
+from sqlalchemy import Update, exists, func, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.db.models import User
+from src.users.cache import profile_cache
+from src.utils.exceptions import UserEmailExists, UserPhoneNumberExists
+from src.utils.metrics import timed
 from src.utils.validators import is_email
 
 
+def password_hash_swap(uid: uuid.UUID, old_hash: str, new_hash: str) -> Update:
+    """Replace the user's password hash only if it is still `old_hash`."""
+    return update(User).where(User.uid == uid, User.password == old_hash).values(password=new_hash)
+
+
 class UserService:
+    @timed("user_service.get_user_by_email")
     async def get_user_by_email(self, email: str, session: AsyncSession):
-        statement = select(User).where(User.email == email.lower())
+        statement = select(User).where(func.lower(User.email) == email.lower())
         result = await session.exec(statement=statement)
         user = result.first()
 
         return user
 
+    @timed("user_service.get_user_by_uid")
+    async def get_user_by_uid(self, uid: uuid.UUID, session: AsyncSession):
+        statement = select(User).where(User.uid == uid)
+        result = await session.exec(statement)
+        user = result.first()
+
+        return user
+
+    @timed("user_service.get_user_by_phone")
     async def get_user_by_phone(self, phone_number: str, session: AsyncSession):
         statement = select(User).where(User.phone_number == phone_number)
         result = await session.exec(statement)
@@ -29,6 +51,55 @@ class UserService:
 
         return False if user is None else True
 
+    @timed("user_service.create_user")
+    async def create_user(self, user_data: dict, session: AsyncSession, commit: bool = True):
+        """Insert a user in one round trip, reporting which unique column conflicted.
+
+        The INSERT runs in a CTE with ON CONFLICT DO NOTHING. The EXISTS checks in the outer
+        SELECT see the table as it was before the insert, so when nothing was inserted they
+        tell us whether the email or the phone number was already taken.
+
+        With `commit=False` the caller can add more work to the transaction and commit it.
+        """
+        user = User(**user_data)
+        inserted = (
+            insert(User)
+            .values(**user.model_dump(exclude={"id"}))
+            .on_conflict_do_nothing()
+            .returning(User.id)
+            .cte("inserted")
+        )
+        statement = select(
+            select(inserted.c.id).scalar_subquery().label("id"),
+            exists().where(func.lower(User.email) == user.email.lower()).label("email_taken"),
+            exists().where(User.phone_number == user.phone_number).label("phone_taken"),
+        )
+        result = (await session.exec(statement)).one()
+
+        if result.id is None:
+            await session.rollback()
+            if result.phone_taken and not result.email_taken:
+                raise UserPhoneNumberExists()
+            raise UserEmailExists()
+
+        if commit:
+            await session.commit()
+        user.id = result.id
+        return user
+
+    @timed("user_service.replace_password_hash")
+    async def replace_password_hash(self, uid: uuid.UUID, old_hash: str, new_hash: str, session: AsyncSession):
+        """Swap in a rehash of the same password in one conditional UPDATE.
+
+        Returns False, changing nothing, if the password was changed since `old_hash` was read:
+        a rehash of the old password must never overwrite a password change.
+        """
+        result = await session.exec(password_hash_swap(uid, old_hash, new_hash))
+        await session.commit()
+
+        return result.rowcount == 1
+
+    @timed("user_service.update_user")
     async def update_user(self, user: User, user_data: dict, session: AsyncSession):
         allowed_fields = ["first_name", "last_name", "password"]
 
@@ -39,4 +110,5 @@ class UserService:
 
         await session.commit()
         await session.refresh(user)
+        await profile_cache.invalidate(str(user.uid))
         return user
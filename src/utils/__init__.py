@@ -1,7 +1,9 @@
-from fastapi import Request
 from starlette_context import context
 
 
+def get_base_url() -> str:
+    return context.get("base_url")
+
+
 def build_link_from_base_url(path: str) -> str:
-    request: Request = context.get("base_url")
-    return f"{request.base_url}{path}"
+    return f"{get_base_url()}{path}"
@@ -1,3 +1,4 @@
+import math
 from typing import Any, Callable, Dict
 
 from fastapi import FastAPI, status
@@ -71,13 +72,94 @@ class InvalidLink(AppException):
     pass
 
 
+class HashingPoolSaturated(AppException):
+    """This handles a password hashing pool with no spare capacity."""
+
+    pass
+
+
+class RevocationCheckUnavailable(AppException):
+    """This handles token revocation checks that cannot be answered."""
+
+    pass
+
+
+class RevocationUnavailable(AppException):
+    """This handles token revocations that cannot be recorded."""
+
+    pass
+
+
+class MetricsUnauthorized(AppException):
+    """This handles scrapes of /metrics without the metrics token."""
+
+    pass
+
+
+class InsufficientPermission(AppException):
+    """This handles users without the role a route requires."""
+
+    pass
+
+
+class ProfilerBusy(AppException):
+    """This handles a profiling request while the worker is already being profiled."""
+
+    pass
+
+
+class ProfileNotFound(AppException):
+    """This handles a missing profile file."""
+
+    pass
+
+
+class TransactionNotFound(AppException):
+    """This handles no transaction."""
+
+    pass
+
+
+class InvalidCursor(AppException):
+    """This handles a malformed pagination cursor."""
+
+    pass
+
+
+class UnsupportedImportFormat(AppException):
+    """This handles uploaded statements that are neither CSV nor OFX."""
+
+    pass
+
+
+class ImportTooLarge(AppException):
+    """This handles uploaded statements over the size limit."""
+
+    pass
+
+
+class ImportNotFound(AppException):
+    """This handles no import task."""
+
+    pass
+
+
+class RateLimited(AppException):
+    """Too many requests for this client or account."""
+
+    def __init__(self, retry_after: float):
+        super().__init__()
+        self.retry_after = retry_after
+
+
 def create_exception_handler(
-    status_code: int, extra_content: Dict[str, Any] = None
+    status_code: int, extra_content: Dict[str, Any] = None, headers: Dict[str, str] = None
 ) -> Callable[[Request, Exception], JSONResponse]:
     async def exception_handler(req: Request, exc: AppException) -> JSONResponse:
         return JSONResponse(
             status_code=status_code,
             content={"error_code": exc.__class__.__name__, **extra_content},
+            headers=headers,
         )
 
     return exception_handler
@@ -123,6 +205,80 @@ def register_exceptions(app: FastAPI):
         InvalidLink,
         create_exception_handler(status.HTTP_403_FORBIDDEN, {"message": "Link is invalid. get a new one"}),
     )
+    app.add_exception_handler(
+        HashingPoolSaturated,
+        create_exception_handler(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            {"message": "Server is busy. Please retry shortly."},
+            headers={"Retry-After": "1"},
+        ),
+    )
+    app.add_exception_handler(
+        RevocationCheckUnavailable,
+        create_exception_handler(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            {"message": "Unable to verify token right now. Please retry shortly."},
+            headers={"Retry-After": "1"},
+        ),
+    )
+    app.add_exception_handler(
+        RevocationUnavailable,
+        create_exception_handler(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            {"message": "Unable to log out right now. Please retry shortly."},
+            headers={"Retry-After": "1"},
+        ),
+    )
+    app.add_exception_handler(
+        MetricsUnauthorized,
+        create_exception_handler(
+            status.HTTP_401_UNAUTHORIZED,
+            {"message": "A valid metrics token is required."},
+            headers={"WWW-Authenticate": "Bearer"},
+        ),
+    )
+    app.add_exception_handler(
+        InsufficientPermission,
+        create_exception_handler(status.HTTP_403_FORBIDDEN, {"message": "You are not allowed to do this."}),
+    )
+    app.add_exception_handler(
+        ProfilerBusy,
+        create_exception_handler(status.HTTP_409_CONFLICT, {"message": "A profile is already running on this worker."}),
+    )
+    app.add_exception_handler(
+        ProfileNotFound,
+        create_exception_handler(status.HTTP_404_NOT_FOUND, {"message": "Profile doesn't exist."}),
+    )
+    app.add_exception_handler(
+        TransactionNotFound,
+        create_exception_handler(status.HTTP_404_NOT_FOUND, {"message": "Transaction doesn't exist."}),
+    )
+    app.add_exception_handler(
+        InvalidCursor,
+        create_exception_handler(status.HTTP_400_BAD_REQUEST, {"message": "Pagination cursor is invalid."}),
+    )
+    app.add_exception_handler(
+        UnsupportedImportFormat,
+        create_exception_handler(
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, {"message": "Upload a .csv, .ofx or .qfx statement."}
+        ),
+    )
+    app.add_exception_handler(
+        ImportTooLarge,
+        create_exception_handler(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, {"message": "Statement file is too large."}),
+    )
+    app.add_exception_handler(
+        ImportNotFound,
+        create_exception_handler(status.HTTP_404_NOT_FOUND, {"message": "Import doesn't exist."}),
+    )
+
+    @app.exception_handler(RateLimited)
+    async def rate_limited(request: Request, exc: RateLimited):
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"error_code": "RateLimited", "message": "Too many attempts. Please retry later."},
+            headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+        )
 
     @app.exception_handler(status.HTTP_500_INTERNAL_SERVER_ERROR)
     async def internal_server_error(request: Request, exc):
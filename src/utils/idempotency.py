@@ -0,0 +1,225 @@
+import base64
+import hashlib
+import json
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.db.redis import get_redis
+from src.utils.metrics import IDEMPOTENT_REQUESTS
+
+IDEMPOTENCY_PREFIX = "idempotency:"
+MAX_KEY_LENGTH = 255
+
+_STORED = IDEMPOTENT_REQUESTS.labels("stored")
+_REPLAYED = IDEMPOTENT_REQUESTS.labels("replayed")
+_IN_FLIGHT = IDEMPOTENT_REQUESTS.labels("in_flight")
+_MISMATCH = IDEMPOTENT_REQUESTS.labels("mismatch")
+_BYPASS = IDEMPOTENT_REQUESTS.labels("bypass")
+
+
+def idempotency_redis_key(scope: Scope, key: str) -> str:
+    """Keys are scoped to the route and the caller, so clients cannot see each other's responses.
+
+    The caller is the Authorization header, or the client IP for anonymous routes like register.
+    """
+    authorization = Headers(scope=scope).get("authorization")
+    if authorization:
+        caller = f"auth:{authorization}"
+    else:
+        client = scope.get("client")
+        caller = f"ip:{client[0] if client else ''}"
+
+    digest = hashlib.sha256(caller.encode("latin-1")).hexdigest()[:16]
+    return f"{IDEMPOTENCY_PREFIX}{scope['path']}:{digest}:{key}"
+
+
+def replaying_receive(messages: List[Message], receive: Receive) -> Receive:
+    """Hand the already-read body messages to the app again, then fall back to the real `receive`."""
+    pending = list(messages)
+
+    async def receive_wrapper() -> Message:
+        if pending:
+            return pending.pop(0)
+        return await receive()
+
+    return receive_wrapper
+
+
+def encode_record(fingerprint: str, status: int, headers: Iterable[Tuple[bytes, bytes]], body: bytes) -> str:
+    return json.dumps(
+        {
+            "fingerprint": fingerprint,
+            "status": status,
+            "headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in headers],
+            "body": base64.b64encode(body).decode(),
+        }
+    )
+
+
+def error_response(status_code: int, error_code: str, message: str, headers: dict = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code, content={"error_code": error_code, "message": message}, headers=headers
+    )
+
+
+class IdempotencyMiddleware:
+    """Pure ASGI middleware that makes POSTs carrying an `Idempotency-Key` header safe to retry.
+
+    The first request claims the key in Redis with a short in-flight lock and its response is
+    stored for `ttl` seconds; retries with the same key and body are answered from Redis without
+    reaching the route. A retry while the first request is still running gets a 409, and reusing
+    a key for a different body gets a 422. Error responses release the key so the client can retry.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        paths: Iterable[str],
+        ttl: int,
+        lock_ttl: int,
+        max_body: int,
+        header: str = "idempotency-key",
+    ):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.max_body = max_body
+        self.header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        key = next((value for name, value in scope["headers"] if name == self.header), None)
+        redis_client = get_redis()
+        if key is None or redis_client is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = key.decode("latin-1")
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = error_response(
+                400, "InvalidIdempotencyKey", f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} chars."
+            )
+            await response(scope, receive, send)
+            return
+
+        messages, fingerprint = await self.read_body(scope, receive)
+        receive = replaying_receive(messages, receive)
+        if fingerprint is None:
+            _BYPASS.inc()
+            await self.app(scope, receive, send)
+            return
+
+        redis_key = idempotency_redis_key(scope, key)
+        try:
+            claimed = await redis_client.set(
+                redis_key, json.dumps({"fingerprint": fingerprint}), nx=True, ex=self.lock_ttl
+            )
+            record = None if claimed else await redis_client.get(redis_key)
+        except RedisError as e:
+            logging.warning(f"Redis error while claiming idempotency key, handling request normally: {e}")
+            _BYPASS.inc()
+            await self.app(scope, receive, send)
+            return
+
+        if not claimed:
+            await self.answer_duplicate(record, fingerprint, scope, receive, send)
+            return
+
+        await self.run_and_store(redis_key, fingerprint, scope, receive, send)
+
+    async def read_body(self, scope: Scope, receive: Receive) -> Tuple[List[Message], Optional[str]]:
+        """Read the request body, hashing it as it arrives. The fingerprint is None if the body is too large."""
+        digest = hashlib.sha256(f"{scope['method']} {scope['path']}?".encode("latin-1"))
+        digest.update(scope.get("query_string", b""))
+        digest.update(b"\n")
+
+        messages, size = [], 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                return messages, None
+
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body:
+                return messages, None
+            digest.update(chunk)
+
+            if not message.get("more_body", False):
+                return messages, digest.hexdigest()
+
+    async def answer_duplicate(
+        self, record: Optional[bytes], fingerprint: str, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        stored = json.loads(record) if record else {}
+
+        if stored and stored["fingerprint"] != fingerprint:
+            _MISMATCH.inc()
+            response = error_response(
+                422, "IdempotencyKeyReused", "This Idempotency-Key was already used for a different request."
+            )
+        elif "status" not in stored:
+            _IN_FLIGHT.inc()
+            response = error_response(
+                409,
+                "IdempotentRequestInProgress",
+                "A request with this Idempotency-Key is still being processed.",
+                headers={"Retry-After": "1"},
+            )
+        else:
+            _REPLAYED.inc()
+            headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in stored["headers"]]
+            headers.append((b"idempotent-replayed", b"true"))
+            await send({"type": "http.response.start", "status": stored["status"], "headers": headers})
+            await send({"type": "http.response.body", "body": base64.b64decode(stored["body"])})
+            return
+
+        await response(scope, receive, send)
+
+    async def run_and_store(self, redis_key: str, fingerprint: str, scope: Scope, receive: Receive, send: Send) -> None:
+        start: Optional[Message] = None
+        body = bytearray()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Copied before outer middlewares append their per-request headers.
+                start = {"status": message["status"], "headers": list(message.get("headers", []))}
+            elif message["type"] == "http.response.body":
+                body.extend(message.get("body", b""))
+            await send(message)
+
+        record = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+            # Only successes are replayed. Errors (validation, auth, rate limits, conflicts, 5xx)
+            # may come from before the route ran or be transient, so the key is released instead.
+            if start is not None and 200 <= start["status"] < 300:
+                record = encode_record(fingerprint, start["status"], start["headers"], bytes(body))
+        finally:
+            await self.store(redis_key, record)
+
+    async def store(self, redis_key: str, record: Optional[str]) -> None:
+        """Store the finished response, or release the key when there is nothing worth replaying."""
+        redis_client = get_redis()
+        if redis_client is None:
+            return
+
+        try:
+            if record is None:
+                await redis_client.delete(redis_key)
+            else:
+                await redis_client.set(redis_key, record, ex=self.ttl)
+                _STORED.inc()
+        except RedisError as e:
+            logging.warning(f"Redis error while storing idempotent response: {e}")
@@ -1,13 +1,23 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.message import Message
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import formataddr, formatdate, make_msgid
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
-from fastapi import UploadFile
-from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
-from pydantic import EmailStr
+import aiosmtplib
+from fastapi_mail import ConnectionConfig
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from markupsafe import Markup
 
 from src.auth.authentication import Authentication
 from src.config import Config
-from src.misc.schemas import EmailTypes
+from src.misc.schemas import EmailType, EmailTypes
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 
@@ -25,74 +35,212 @@ mail_config = ConnectionConfig(
     TEMPLATE_FOLDER=Path(ROOT_DIR, "templates"),
 )
 
-mail = FastMail(config=mail_config)
-
-
-def create_message(
-    recipients: List[EmailStr],
-    attachments: List[Union[UploadFile, Dict, str]] = [],
-    subject: str = "",
-    body: Optional[Union[List, str]] = None,
-    template_body: Optional[Union[List, str]] = None,
-) -> MessageSchema:
-    message = MessageSchema(
-        recipients=recipients,
-        attachments=attachments,
-        subject=subject,
-        body=body,
-        template_body=template_body,
-        subtype=MessageType.html,
+# Partials with no per-message data; rendered once and inlined into layout.html.
+STATIC_PARTIALS = ("header.html", "footer.html")
+
+
+def build_template_env() -> Environment:
+    """Compile every email template up front.
+
+    Compiled bytecode is kept in `MAIL_TEMPLATE_CACHE_DIR` (Jinja's per-user temp dir by
+    default) so restarted workers skip parsing, and the static partials are pre-rendered.
+    """
+    bytecode_cache = (
+        FileSystemBytecodeCache(Config.MAIL_TEMPLATE_CACHE_DIR)
+        if Config.MAIL_TEMPLATE_CACHE_DIR
+        else FileSystemBytecodeCache()
+    )
+    env = Environment(
+        loader=FileSystemLoader(mail_config.TEMPLATE_FOLDER),
+        bytecode_cache=bytecode_cache,
+        auto_reload=False,
+        cache_size=-1,
     )
+    env.globals["static_partials"] = {
+        name: Markup(env.get_template(name).render(year=datetime.now(timezone.utc).year)) for name in STATIC_PARTIALS
+    }
+
+    for name in env.list_templates(extensions=["html"]):
+        env.get_template(name)
+
+    return env
+
+
+# Errors that say nothing about the message itself: the batch is resumed over a new connection.
+CONNECTION_ERRORS = (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPTimeoutError, ConnectionError)
+# Replies refusing a message. 5xx refusals are permanent and the message is skipped; 4xx ones
+# (e.g. 421/450/451 throttling) are transient and handled like a dropped connection.
+REFUSAL_ERRORS = (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused)
+
+
+def is_permanent_refusal(error: Exception) -> bool:
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(recipient.code >= 500 for recipient in error.recipients)
+    return isinstance(error, aiosmtplib.SMTPResponseException) and error.code >= 500
+
+
+class SMTPBatchError(Exception):
+    """Raised when a batch loses its connection for good.
+
+    The first `done` messages were either sent or refused by the server (see `failed`); the
+    rest were not delivered and can be retried.
+    """
+
+    def __init__(self, done: int, failed: List[Tuple[str, str]]):
+        super().__init__(f"SMTP batch interrupted after {done} message(s)")
+        self.done = done
+        self.failed = failed
+
+
+class SMTPPool:
+    """Logged-in SMTP sessions reused across sends instead of a TLS handshake + login per email.
 
-    return message
+    Sessions idle for longer than `idle_timeout` are closed rather than reused, and a batch
+    interrupted by a dropped connection carries on over a fresh one. The pool is meant to be
+    used from a single event loop (one per worker process).
+    """
+
+    def __init__(self, config: ConnectionConfig, size: int, idle_timeout: float):
+        self.config = config
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self._idle: List[Tuple[aiosmtplib.SMTP, float]] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.config.MAIL_SERVER,
+            port=self.config.MAIL_PORT,
+            timeout=self.config.TIMEOUT,
+            use_tls=self.config.MAIL_SSL_TLS,
+            start_tls=self.config.MAIL_STARTTLS,
+            validate_certs=self.config.VALIDATE_CERTS,
+            local_hostname=self.config.LOCAL_HOSTNAME,
+        )
+        await smtp.connect()
+        if self.config.USE_CREDENTIALS:
+            try:
+                await smtp.login(self.config.MAIL_USERNAME, self.config.MAIL_PASSWORD.get_secret_value())
+            except BaseException:
+                await self._close(smtp)
+                raise
+
+        return smtp
+
+    @staticmethod
+    async def _close(smtp: aiosmtplib.SMTP) -> None:
+        try:
+            await smtp.quit()
+        except aiosmtplib.SMTPException:
+            smtp.close()
+
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            smtp, released_at = self._idle.pop()
+            if smtp.is_connected and time.monotonic() - released_at < self.idle_timeout:
+                return smtp
+            await self._close(smtp)
+
+        return await self._connect()
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+
+        async with self._slots:
+            smtp = await self._acquire()
+            try:
+                yield smtp
+            except BaseException:
+                await self._close(smtp)
+                raise
+            self._idle.append((smtp, time.monotonic()))
+
+    async def send_many(self, messages: Sequence[Message]) -> List[Tuple[str, str]]:
+        """Send `messages` in order over one session, reconnecting once if it drops.
+
+        A message the server refuses for good (a 5xx, e.g. an unknown mailbox) is skipped, not
+        retried: it is returned as a `(recipient, reason)` pair and the rest of the batch carries on.
+        A transient 4xx refusal stops the batch like a dropped connection, so that message is retried.
+        """
+        done = 0
+        failed: List[Tuple[str, str]] = []
+        for attempt in range(2):
+            try:
+                async with self.session() as smtp:
+                    for message in messages[done:]:
+                        try:
+                            await smtp.send_message(message)
+                        except REFUSAL_ERRORS as e:
+                            if not is_permanent_refusal(e):
+                                raise
+                            logging.warning(f"SMTP server refused message to {message['To']}: {e}")
+                            failed.append((message["To"], str(e)))
+                        done += 1
+                return failed
+            except CONNECTION_ERRORS + REFUSAL_ERRORS as e:
+                # Permanent refusals outside a send (e.g. a rejected login) are not worth resuming.
+                if isinstance(e, REFUSAL_ERRORS) and is_permanent_refusal(e):
+                    raise
+                if attempt:
+                    raise SMTPBatchError(done, failed) from e
+
+    async def close(self) -> None:
+        while self._idle:
+            smtp, _ = self._idle.pop()
+            await self._close(smtp)
 
 
 class Mailer:
-    mail = FastMail(config=mail_config)
+    templates = build_template_env()
+    pool = SMTPPool(config=mail_config, size=Config.SMTP_POOL_SIZE, idle_timeout=Config.SMTP_IDLE_TIMEOUT)
+    sender = formataddr((mail_config.MAIL_FROM_NAME, mail_config.MAIL_FROM))
+    # Passing a domain stops make_msgid() from resolving the host name for every message.
+    msgid_domain = mail_config.MAIL_FROM.split("@")[-1]
 
     @staticmethod
-    def _create_message(
-        recipients: List[EmailStr],
-        attachments: List[Union[UploadFile, Dict, str]] = [],
-        subject: str = "",
-        body: Optional[Union[List, str]] = None,
-        template_body: Optional[Union[List, str]] = None,
-    ) -> MessageSchema:
-        message = MessageSchema(
-            recipients=recipients,
-            attachments=attachments,
-            subject=subject,
-            body=body,
-            template_body=template_body,
-            subtype=MessageType.html,
+    def render_message(email_type: EmailType, email: str, first_name: str, base_url: str) -> Message:
+        """Render `email_type` for one recipient into a ready-to-send MIME message, without any I/O."""
+        email_token = Authentication.create_url_safe_token({"email": email})
+        link = f"{base_url}{email_type.link_path}/{email_token}"
+        html = Mailer.templates.get_template(email_type.template).render(
+            first_name=first_name, **{email_type.link_name: link}
         )
 
+        message = MIMEMultipart("mixed")
+        message.set_charset("utf-8")
+        message.attach(MIMEText(html, "html", "utf-8"))
+        message["Date"] = formatdate(time.time(), localtime=True)
+        message["Message-ID"] = make_msgid(domain=Mailer.msgid_domain)
+        message["To"] = email
+        message["From"] = Mailer.sender
+        message["Subject"] = email_type.subject
+
         return message
 
     @staticmethod
-    async def send_email_verification(email: str, first_name: str, base_url: str):
-        token_payload = {"email": email}
-        email_token = Authentication.create_url_safe_token(token_payload)
-        verification_url = f"{base_url}api/v1/auth/verify/{email_token}"
-
-        message = Mailer._create_message(
-            recipients=[email],
-            subject=EmailTypes.EMAIL_VERIFICATION.subject,
-            template_body={"first_name": first_name, "verification_url": verification_url},
-        )
+    async def send_many(messages: Sequence[Message]) -> List[Tuple[str, str]]:
+        return await Mailer.pool.send_many(messages)
 
-        await Mailer.mail.send_message(message=message, template_name=EmailTypes.EMAIL_VERIFICATION.template)
+    @staticmethod
+    async def send_batch(
+        email_type: EmailType, recipients: List[Dict[str, str]], base_url: str
+    ) -> List[Tuple[str, str]]:
+        """Send `email_type` to every `{"email", "first_name"}` in `recipients` over one session.
+
+        Returns the `(recipient, reason)` pairs the server refused.
+        """
+        messages = [
+            Mailer.render_message(email_type, recipient["email"], recipient["first_name"], base_url)
+            for recipient in recipients
+        ]
+        return await Mailer.send_many(messages)
 
     @staticmethod
-    async def send_password_reset(email: str, first_name: str, base_url: str):
-        token_payload = {"email": email}
-        email_token = Authentication.create_url_safe_token(token_payload)
-        reset_url = f"{base_url}api/v1/auth/pwd-reset/{email_token}"
-
-        message = Mailer._create_message(
-            recipients=[email],
-            subject=EmailTypes.PWD_RESET.subject,
-            template_body={"first_name": first_name, "reset_url": reset_url},
-        )
+    async def send_email_verification(email: str, first_name: str, base_url: str):
+        await Mailer.send_many([Mailer.render_message(EmailTypes.EMAIL_VERIFICATION, email, first_name, base_url)])
 
-        await Mailer.mail.send_message(message=message, template_name=EmailTypes.PWD_RESET.template)
+    @staticmethod
+    async def send_password_reset(email: str, first_name: str, base_url: str):
+        await Mailer.send_many([Mailer.render_message(EmailTypes.PWD_RESET, email, first_name, base_url)])
@@ -0,0 +1,166 @@
+import asyncio
+import functools
+import hmac
+import time
+from typing import Any, Callable, Dict
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from src.config import Config
+from src.utils.exceptions import MetricsUnauthorized
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request in the route handler (dependencies, endpoint and serialization).",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+SPAN_DURATION = Histogram(
+    "span_duration_seconds",
+    "Time spent in instrumented hot-path operations, by span.",
+    ["span"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+PWD_HASH_QUEUE_WAIT = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Time a password hash/verify job waited for a free hashing worker.",
+    ["operation"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+PWD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Time spent computing a password hash/verify on a hashing worker.",
+    ["operation"],
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0),
+)
+PWD_HASH_PENDING = Gauge(
+    "password_hash_pending_jobs",
+    "Password hash/verify jobs queued or running on the hashing pool.",
+)
+PWD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Password hash/verify jobs rejected because the hashing pool was saturated.",
+    ["operation"],
+)
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting to check a connection out of the database pool.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Database pool checkouts that timed out because the pool was saturated.",
+)
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Database connections currently checked out of the pool.")
+DB_POOL_CAPACITY = Gauge("db_pool_capacity", "Maximum number of connections the database pool may open.")
+DB_READ_SESSIONS = Counter(
+    "db_read_sessions_total",
+    "Read-only sessions by the database that served them (replica, or primary as fallback/sticky).",
+    ["target"],
+)
+DB_REPLICA_LAG_SECONDS = Gauge("db_replica_lag_seconds", "Replication lag of the read replica at the last check.")
+
+REVOCATION_CACHE_LOOKUPS = Counter(
+    "revocation_cache_lookups_total",
+    "Token revocation checks by outcome: hit/miss (answered locally), fallback (asked Redis), error.",
+    ["result"],
+)
+REVOCATION_CACHE_SIZE = Gauge("revocation_cache_entries", "Revoked JTIs held in the local revocation cache.")
+
+JWT_CACHE_LOOKUPS = Counter(
+    "jwt_verified_cache_lookups_total",
+    "Lookups in the verified-token cache, by result (hit skips signature verification).",
+    ["result"],
+)
+
+PROFILE_CACHE_LOOKUPS = Counter(
+    "profile_cache_lookups_total",
+    "Profile cache lookups by the tier that answered them (local, redis) or miss.",
+    ["result"],
+)
+
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total",
+    "Rate-limited requests by limiter and result: allowed, rejected_local (no Redis call), rejected or redis_error.",
+    ["limiter", "result"],
+)
+IDEMPOTENT_REQUESTS = Counter(
+    "idempotent_requests_total",
+    "Requests carrying an Idempotency-Key by result: stored, replayed, in_flight, mismatch or bypass.",
+    ["result"],
+)
+REPORT_SNAPSHOT_LOOKUPS = Counter(
+    "report_snapshot_lookups_total",
+    "Report snapshot loads by result: hit (file reused), miss (rebuilt) or bypass (no ledger version).",
+    ["result"],
+)
+
+REDIS_POOL_IN_USE = Gauge("redis_pool_in_use", "Redis connections currently checked out of the pool.")
+REDIS_POOL_CAPACITY = Gauge("redis_pool_capacity", "Maximum number of connections the Redis pool may open.")
+
+
+def timed(span: str) -> Callable:
+    """Decorate a sync or async function so each call is observed in `SPAN_DURATION`."""
+    observe = SPAN_DURATION.labels(span).observe
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    observe(time.perf_counter() - start)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+class TimedRoute(APIRoute):
+    """Route that records its handling time in `HTTP_REQUEST_DURATION`.
+
+    Label children are bound once per route and method, so a request only pays for one
+    dict lookup and one `observe`. The route label is the path template, not the raw path.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        durations: Dict[str, Any] = {
+            method: HTTP_REQUEST_DURATION.labels(method, self.path_format) for method in self.methods
+        }
+
+        async def timed_handler(request: Request) -> Response:
+            start = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                durations[request.method].observe(time.perf_counter() - start)
+
+        return timed_handler
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Prometheus scrape endpoint, served only to `Authorization: Bearer <METRICS_TOKEN>`; disabled without a token."""
+    expected = f"Bearer {Config.METRICS_TOKEN}" if Config.METRICS_TOKEN else None
+    provided = request.headers.get("authorization", "")
+    if expected is None or not hmac.compare_digest(provided.encode(), expected.encode()):
+        raise MetricsUnauthorized()
+
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,28 +1,219 @@
+import uuid
+from typing import Any, Iterable, Optional
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette_context import context, plugins
-from starlette_context.middleware import RawContextMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from starlette_context import _request_scope_context_storage
+from starlette_context.header_keys import HeaderKeys
+
+from src.config import Config
+from src.db.main import STICKY_COOKIE
+from src.utils.idempotency import IdempotencyMiddleware, error_response
+
+REQUEST_ID = HeaderKeys.request_id.value
+CORRELATION_ID = HeaderKeys.correlation_id.value
+USER_AGENT = HeaderKeys.user_agent.value
+BASE_URL = "base_url"
+
+IDEMPOTENT_PATHS = ("/api/v1/auth/register", "/api/v1/auth/pwd-reset", "/api/v1/transactions")
+IMPORT_PATHS = ("/api/v1/transactions/import",)
+# Room for the multipart boundaries and the other form fields around the statement file itself.
+IMPORT_FORM_OVERHEAD = 64 * 1024
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+class RequestContext(dict):
+    """starlette_context storage that only works out its standard keys when they are first read.
+
+    Request and correlation ids come from the incoming headers when they hold a valid UUID,
+    otherwise a new one is generated.
+    """
+
+    lazy_keys = (REQUEST_ID, CORRELATION_ID, USER_AGENT, BASE_URL)
+
+    def __init__(self, scope: Scope):
+        super().__init__()
+        self.scope = scope
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.lazy_keys or super().__contains__(key)
+
+    def __missing__(self, key: str) -> Any:
+        if key in (REQUEST_ID, CORRELATION_ID):
+            value = self._valid_uuid(self._header(key)) or uuid.uuid4().hex
+        elif key == USER_AGENT:
+            value = self._header(key)
+        elif key == BASE_URL:
+            value = str(HTTPConnection(self.scope).base_url)
+        else:
+            raise KeyError(key)
+
+        self[key] = value
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def _header(self, name: str) -> Optional[str]:
+        raw_name = name.lower().encode("latin-1")
+        for header, value in self.scope["headers"]:
+            if header == raw_name:
+                return value.decode("latin-1")
+        return None
+
+    @staticmethod
+    def _valid_uuid(value: Optional[str]) -> Optional[str]:
+        if not value:
+            return None
+        try:
+            uuid.UUID(value)
+        except ValueError:
+            return None
+        return value
+
+
+class ContextMiddleware:
+    """Pure ASGI middleware that opens a `starlette_context` context for each request.
+
+    The request and correlation ids are echoed back as response headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        request_context = RequestContext(scope)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(REQUEST_ID, request_context[REQUEST_ID])
+                headers.append(CORRELATION_ID, request_context[CORRELATION_ID])
+            await send(message)
 
+        token = _request_scope_context_storage.set(request_context)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_scope_context_storage.reset(token)
 
-async def custom_context_middleware(request, call_next):
-    context["base_url"] = str(request.base_url)
-    return await call_next(request)
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware that turns a write marked by `get_session` into a sticky cookie.
+
+    Reads from the same client then stay on the primary until the replica has caught up.
+    """
+
+    def __init__(self, app: ASGIApp, max_age: int):
+        self.app = app
+        self.max_age = max_age
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                until = scope.get("state", {}).get("primary_until")
+                if until is not None:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "set-cookie",
+                        f"{STICKY_COOKIE}={until}; Max-Age={self.max_age}; Path=/; HttpOnly; SameSite=Lax",
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class BodySizeLimitMiddleware:
+    """Pure ASGI middleware answering 413 once a request body to one of `paths` grows past `max_body`.
+
+    Form uploads are otherwise spooled to disk in full before the route can look at their size.
+    A too large Content-Length is refused before anything is read.
+    """
+
+    def __init__(self, app: ASGIApp, paths: Iterable[str], max_body: int, error_code: str, message: str):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_body = max_body
+        self.error_code = error_code
+        self.message = message
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        response = error_response(413, self.error_code, self.message)
+        content_length = Headers(scope=scope).get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.max_body:
+            await response(scope, receive, send)
+            return
+
+        received, too_large, started = 0, False, False
+
+        async def receive_wrapper() -> Message:
+            nonlocal received, too_large
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    too_large = True
+                    raise BodyTooLarge()
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal started
+            # Whatever the app made of the interrupted body is replaced by the 413.
+            if too_large:
+                return
+            started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except Exception:
+            # `BodyTooLarge` itself, or whatever the app wrapped it in.
+            if not too_large:
+                raise
+
+        if too_large and not started:
+            await response(scope, receive, send)
 
 
 def register_middlewares(app: FastAPI):
+    # Innermost, so replayed responses still get CORS, request-id and sticky-read handling.
     app.add_middleware(
-        CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"], allow_credentials=True
+        IdempotencyMiddleware,
+        paths=IDEMPOTENT_PATHS,
+        ttl=Config.IDEMPOTENCY_TTL,
+        lock_ttl=Config.IDEMPOTENCY_LOCK_TTL,
+        max_body=Config.IDEMPOTENCY_MAX_BODY,
+    )
+    app.add_middleware(
+        BodySizeLimitMiddleware,
+        paths=IMPORT_PATHS,
+        max_body=Config.IMPORT_MAX_BYTES + IMPORT_FORM_OVERHEAD,
+        error_code="ImportTooLarge",
+        message="Statement file is too large.",
     )
-    app.add_middleware(TrustedHostMiddleware, allowed_hosts=["localhost", "127.0.0.1"])
-    app.add_middleware(BaseHTTPMiddleware, dispatch=custom_context_middleware)
-
     app.add_middleware(
-        RawContextMiddleware,
-        plugins=(
-            plugins.RequestIdPlugin(),
-            plugins.CorrelationIdPlugin(),
-            plugins.UserAgentPlugin(),
-        ),
+        CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"], allow_credentials=True
     )
+    app.add_middleware(TrustedHostMiddleware, allowed_hosts=["localhost", "127.0.0.1"])
+    if Config.DATABASE_REPLICA_URL:
+        app.add_middleware(ReadYourWritesMiddleware, max_age=Config.DATABASE_STICKY_SECONDS)
+    app.add_middleware(ContextMiddleware)
@@ -0,0 +1,201 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Tuple
+
+from fastapi import Request
+from redis.exceptions import NoScriptError, RedisError
+
+from src.config import Config
+from src.db.redis import get_redis
+from src.utils.exceptions import RateLimited
+from src.utils.metrics import RATE_LIMIT_DECISIONS
+
+RATE_LIMIT_PREFIX = "ratelimit:"
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# GCRA over every key at once: each key stores its theoretical arrival time (TAT) in ms.
+# Either all keys accept the request and are advanced, or none is and the script returns
+# the 1-based index of the first key that refused it with the ms to wait.
+GCRA_SCRIPT = """
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local tats = {}
+for i, key in ipairs(KEYS) do
+    local interval = tonumber(ARGV[2 * i - 1])
+    local period = tonumber(ARGV[2 * i])
+    local tat = math.max(tonumber(redis.call('GET', key) or 0), now) + interval
+    local retry = tat - period - now
+    if retry > 0 then
+        return {i, math.ceil(retry)}
+    end
+    tats[i] = tat
+end
+for i, key in ipairs(KEYS) do
+    redis.call('SET', key, tats[i], 'PX', math.ceil(tats[i] - now))
+end
+return {0, 0}
+"""
+GCRA_SHA = hashlib.sha1(GCRA_SCRIPT.encode()).hexdigest()
+
+
+class Rate(NamedTuple):
+    limit: int
+    period: float
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """Parse `"<limit>/<second|minute|hour|day>"`, e.g. `"5/minute"`."""
+        limit, _, period = value.partition("/")
+        return cls(int(limit), PERIODS[period.strip()])
+
+
+class LocalBuckets:
+    """Per-process token buckets that turn most over-limit requests away before they reach Redis.
+
+    A process only sees part of the traffic, so an empty local bucket means the shared limit is
+    exhausted too. Keys Redis has refused are also remembered until their retry time.
+    Not thread-safe: it is meant to be used from the event loop only.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        # key -> [tokens, updated_at, blocked_until]
+        self._data: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _bucket(self, key: str, rate: Rate, now: float) -> List[float]:
+        bucket = self._data.get(key)
+        if bucket is None:
+            bucket = self._data[key] = [float(rate.limit), now, 0.0]
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        else:
+            self._data.move_to_end(key)
+            bucket[0] = min(rate.limit, bucket[0] + (now - bucket[1]) * rate.limit / rate.period)
+            bucket[1] = now
+
+        return bucket
+
+    def wait(self, key: str, rate: Rate, now: float) -> float:
+        """Seconds until `key` may be used again, 0 if it has a token available."""
+        tokens, _, blocked_until = self._bucket(key, rate, now)
+        if blocked_until > now:
+            return blocked_until - now
+        if tokens < 1:
+            return (1 - tokens) * rate.period / rate.limit
+        return 0.0
+
+    def consume(self, key: str) -> None:
+        bucket = self._data.get(key)
+        if bucket is not None:
+            bucket[0] -= 1
+
+    def block(self, key: str, until: float) -> None:
+        if key in self._data:
+            self._data[key][2] = until
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+async def run_gcra(redis_client, keys: List[str], args: List[float]) -> List[int]:
+    """Run `GCRA_SCRIPT` by hash, sending the script body only when Redis does not have it cached yet."""
+    try:
+        return await redis_client.evalsha(GCRA_SHA, len(keys), *keys, *args)
+    except NoScriptError:
+        return await redis_client.eval(GCRA_SCRIPT, len(keys), *keys, *args)
+
+
+local_buckets = LocalBuckets(maxsize=Config.RATE_LIMIT_LOCAL_MAX_KEYS)
+
+
+class RateLimiter:
+    """Route dependency limiting requests per client IP and/or per account named in the JSON body.
+
+    Checked first against `local_buckets`, then atomically against the shared GCRA counters in
+    Redis. Over-limit requests raise `RateLimited` before the route runs; if Redis is down only
+    the local limits apply.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        per_ip: Optional[str] = None,
+        per_account: Optional[str] = None,
+        account_field: str = "email",
+    ):
+        self.name = name
+        self.per_ip = Rate.parse(per_ip) if per_ip else None
+        self.per_account = Rate.parse(per_account) if per_account else None
+        self.account_field = account_field
+        self._allowed = RATE_LIMIT_DECISIONS.labels(name, "allowed")
+        self._rejected_locally = RATE_LIMIT_DECISIONS.labels(name, "rejected_local")
+        self._rejected = RATE_LIMIT_DECISIONS.labels(name, "rejected")
+        self._unchecked = RATE_LIMIT_DECISIONS.labels(name, "redis_error")
+
+    def _key(self, scope: str, value: str) -> str:
+        digest = hashlib.sha256(value.encode()).hexdigest()[:32]
+        return f"{RATE_LIMIT_PREFIX}{self.name}:{scope}:{digest}"
+
+    async def _limits(self, request: Request) -> List[Tuple[str, Rate]]:
+        limits = []
+        if self.per_ip is not None and request.client is not None:
+            limits.append((self._key("ip", request.client.host), self.per_ip))
+
+        if self.per_account is not None:
+            # Already parsed and cached on the request by FastAPI when the body was read. A body that
+            # is not JSON only gets the per-IP limit; FastAPI's validation answers it with a 422.
+            try:
+                body = await request.json()
+            except ValueError:
+                body = None
+            account = body.get(self.account_field) if isinstance(body, dict) else None
+            if isinstance(account, str):
+                limits.append((self._key("account", account.strip().lower()), self.per_account))
+
+        return limits
+
+    async def __call__(self, request: Request) -> None:
+        if not Config.RATE_LIMIT_ENABLED:
+            return
+
+        limits = await self._limits(request)
+        if not limits:
+            return
+
+        now = time.monotonic()
+        wait = max(local_buckets.wait(key, rate, now) for key, rate in limits)
+        if wait > 0:
+            self._rejected_locally.inc()
+            raise RateLimited(retry_after=wait)
+
+        for key, _ in limits:
+            local_buckets.consume(key)
+
+        redis_client = get_redis()
+        if redis_client is None:
+            self._allowed.inc()
+            return
+
+        args = []
+        for _, rate in limits:
+            args.extend((rate.period * 1000 / rate.limit, rate.period * 1000))
+
+        try:
+            refused, retry_ms = await run_gcra(redis_client, [key for key, _ in limits], args)
+        except RedisError as e:
+            logging.warning(f"Redis error while rate limiting {self.name}, applying local limits only: {e}")
+            self._unchecked.inc()
+            return
+
+        if refused:
+            retry_after = retry_ms / 1000
+            local_buckets.block(limits[refused - 1][0], now + retry_after)
+            self._rejected.inc()
+            raise RateLimited(retry_after=retry_after)
+
+        self._allowed.inc()
@@ -5,9 +5,10 @@ from pydantic import validate_email
 
 
 def email_validator(value: str):
+    """Validate `value` and return it normalized (trimmed, lower-cased) as stored in `users.email`."""
     try:
         validate_email(value)
-        return value
+        return value.strip().lower()
     except EmailNotValidError:
         raise EmailSyntaxError("Invalid Email format")
 